@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+AlertKey = Tuple[int, str]  # (pump_id, alert type)
+
+
+class AlertDispatcher:
+    """
+    Delivers alerts to callbacks without holding up the code raising them.
+
+    `publish` never waits. An alert whose (pump, type) was sent less than
+    `suppression_window` seconds ago is only counted, and the count goes out
+    with the next alert of that key once the window has passed, so a
+    flapping pump produces one alert per window instead of one per flap. An
+    alert whose key is still waiting in the queue replaces the waiting one
+    (coalescing). The queue holds at most `queue_size` keys; when it is full
+    the oldest waiting alert is dropped.
+
+    A small pool of worker tasks drains the queue. The callbacks of an alert
+    run concurrently: coroutine callbacks are awaited and plain callbacks run
+    in the default executor, each bounded by `callback_timeout`, so one slow
+    consumer holds up neither the other consumers nor the monitor.
+    """
+
+    def __init__(
+        self,
+        callbacks: List[Callable],
+        queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        suppression_window: Optional[float] = None,
+        callback_timeout: Optional[float] = None,
+    ):
+        self.callbacks = callbacks
+        self.queue_size = queue_size or Config.ALERT_QUEUE_SIZE
+        self.workers = workers or Config.ALERT_WORKERS
+        self.suppression_window = (
+            suppression_window
+            if suppression_window is not None
+            else Config.ALERT_SUPPRESSION_WINDOW
+        )
+        self.callback_timeout = callback_timeout or Config.ALERT_CALLBACK_TIMEOUT
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[AlertKey, Dict] = {}  # queued key -> latest alert
+        self._last_sent: Dict[AlertKey, float] = {}  # key -> monotonic time
+        self._suppressed: Dict[AlertKey, int] = {}  # key -> count since last sent
+        self._tasks: List[asyncio.Task] = []
+        self.sent = 0
+        self.suppressed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.logger = logging.getLogger("AlertDispatcher")
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"AlertWorker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Stop the worker tasks; alerts still queued are discarded"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+        self._queue = None
+
+    def publish(self, alert: Dict) -> bool:
+        """
+        Queue an alert for delivery; returns False if it was suppressed
+
+        Must be called from the event loop thread.
+        """
+        key = (alert["pump_id"], alert["type"])
+        now = time.monotonic()
+
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            # Still waiting for a worker: deliver the latest one only
+            alert["suppressed"] = waiting["suppressed"]
+            alert["coalesced"] = waiting.get("coalesced", 0) + 1
+            self._pending[key] = alert
+            self.coalesced += 1
+            return True
+
+        last_sent = self._last_sent.get(key)
+        if last_sent is not None and now - last_sent < self.suppression_window:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            self.suppressed += 1
+            self.logger.debug(f"Suppressed {key[1]} alert for pump {key[0]}")
+            return False
+
+        if self._queue is None:
+            return False
+
+        if len(self._pending) >= self.queue_size:
+            oldest = self._queue.get_nowait()
+            self._pending.pop(oldest, None)
+            # Never delivered, so it must not suppress the next one
+            self._last_sent.pop(oldest, None)
+            self.dropped += 1
+            self.logger.warning(
+                f"Alert queue full, dropped {oldest[1]} alert for pump {oldest[0]}"
+            )
+
+        alert["suppressed"] = self._suppressed.pop(key, 0)
+        self._last_sent[key] = now
+        self._pending[key] = alert
+        self._queue.put_nowait(key)
+        return True
+
+    async def _worker(self):
+        """Deliver queued alerts to every callback until cancelled"""
+        while True:
+            key = await self._queue.get()
+            alert = self._pending.pop(key, None)
+            if alert is None:
+                continue
+
+            self.logger.warning(f"ALERT: {alert['message']}")
+            await asyncio.gather(
+                *(self._deliver(callback, alert) for callback in list(self.callbacks))
+            )
+            self.sent += 1
+
+    async def _deliver(self, callback: Callable, alert: Dict):
+        """Run one callback for an alert, within the callback timeout"""
+        try:
+            if asyncio.iscoroutinefunction(callback):
+                await asyncio.wait_for(callback(alert), self.callback_timeout)
+            else:
+                loop = asyncio.get_running_loop()
+                await asyncio.wait_for(
+                    loop.run_in_executor(None, callback, alert),
+                    self.callback_timeout,
+                )
+        except asyncio.TimeoutError:
+            self.failed += 1
+            self.logger.error(
+                f"Alert callback timed out after {self.callback_timeout}s"
+            )
+        except Exception as e:
+            self.failed += 1
+            self.logger.error(f"Error in alert callback: {str(e)}")
+
+    def to_dict(self) -> Dict:
+        return {
+            "queued": len(self._pending),
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
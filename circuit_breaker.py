@@ -0,0 +1,102 @@
+import threading
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+from config import Config
+
+
+class BreakerState(str, Enum):
+    """State of an address circuit breaker"""
+
+    CLOSED = "CLOSED"  # Pump is answering, poll normally
+    OPEN = "OPEN"  # Pump is not answering, only re-probe on backoff
+
+
+class AddressBreaker:
+    """
+    Circuit breaker for a single pump address on a line.
+
+    Every poll to an address that never answers costs the full 68 ms response
+    timeout, which on a shared line is time taken from every other pump. After
+    `miss_threshold` consecutive misses the breaker opens: the address is
+    reported OFFLINE without touching the line and is only re-probed when its
+    backoff expires. Each failed probe doubles the backoff up to `max_backoff`;
+    any answer closes the breaker again.
+    """
+
+    def __init__(
+        self,
+        miss_threshold: Optional[int] = None,
+        base_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        if miss_threshold is None:
+            miss_threshold = Config.BREAKER_MISS_THRESHOLD
+        if base_backoff is None:
+            base_backoff = Config.BREAKER_BASE_BACKOFF
+        if max_backoff is None:
+            max_backoff = Config.BREAKER_MAX_BACKOFF
+        self.miss_threshold = miss_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = BreakerState.CLOSED
+        self.misses = 0
+        self.backoff = 0.0
+        self.next_probe = 0.0  # monotonic time
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the address is currently considered offline"""
+        return self.state == BreakerState.OPEN
+
+    def allow_request(self) -> bool:
+        """Whether a poll should go out on the line now"""
+        return not self.is_open or time.monotonic() >= self.next_probe
+
+    def time_until_probe(self) -> float:
+        """Seconds until the next re-probe is due (0 when closed)"""
+        if not self.is_open:
+            return 0.0
+        return max(0.0, self.next_probe - time.monotonic())
+
+    def record_success(self) -> bool:
+        """Record an answer; returns True if this closed an open breaker"""
+        with self._lock:
+            was_open = self.is_open
+            self.state = BreakerState.CLOSED
+            self.misses = 0
+            self.backoff = 0.0
+            return was_open
+
+    def record_miss(self) -> bool:
+        """Record a missed poll; returns True if this opened the breaker"""
+        with self._lock:
+            self.misses += 1
+
+            if self.is_open:
+                # Failed re-probe: back off further
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self.next_probe = time.monotonic() + self.backoff
+                return False
+
+            if self.misses >= self.miss_threshold:
+                self.state = BreakerState.OPEN
+                self.trips += 1
+                self.backoff = self.base_backoff
+                self.next_probe = time.monotonic() + self.backoff
+                return True
+
+            return False
+
+    def to_dict(self) -> Dict:
+        """Breaker state for the debug endpoints"""
+        return {
+            "state": self.state.value,
+            "consecutive_misses": self.misses,
+            "backoff": self.backoff,
+            "next_probe_in": self.time_until_probe(),
+            "trips": self.trips,
+        }
@@ -26,9 +26,67 @@ class Config:
     )
     DISCOVERY_TIMEOUT = float(os.getenv("DISCOVERY_TIMEOUT", "2.0"))
 
+    # Polling Settings
+    STATUS_POLLING = os.getenv("STATUS_POLLING", "True").lower() == "true"
+    ACTIVE_POLL_INTERVAL = float(os.getenv("ACTIVE_POLL_INTERVAL", "0.05"))
+    IDLE_POLL_INTERVAL = float(os.getenv("IDLE_POLL_INTERVAL", "0.25"))
+    RECENT_CHANGE_WINDOW = float(os.getenv("RECENT_CHANGE_WINDOW", "2.0"))
+
+    # Background Lane Settings
+    BACKGROUND_LINE_SHARE = float(os.getenv("BACKGROUND_LINE_SHARE", "0.25"))
+    BACKGROUND_BURST = float(os.getenv("BACKGROUND_BURST", "0.5"))
+
+    # Transaction Capture Settings
+    TRANSACTION_CAPTURE = os.getenv("TRANSACTION_CAPTURE", "True").lower() == "true"
+    TRANSACTION_STORE_PATH = os.getenv("TRANSACTION_STORE_PATH", "transactions.db")
+    TRANSACTION_MEMORY_SIZE = int(os.getenv("TRANSACTION_MEMORY_SIZE", "50"))
+
+    # Extended Status Settings
+    EXTENDED_STATUS = os.getenv("EXTENDED_STATUS", "True").lower() == "true"
+    EXTENDED_STATUS_INTERVAL = float(os.getenv("EXTENDED_STATUS_INTERVAL", "0.5"))
+    EXTENDED_STATUS_LINE_SHARE = float(os.getenv("EXTENDED_STATUS_LINE_SHARE", "0.1"))
+    EXTENDED_STATUS_BURST = float(os.getenv("EXTENDED_STATUS_BURST", "0.2"))
+
+    # Real-Time Money Settings
+    REAL_TIME_MONEY = os.getenv("REAL_TIME_MONEY", "True").lower() == "true"
+    REAL_TIME_MONEY_LINE_SHARE = float(os.getenv("REAL_TIME_MONEY_LINE_SHARE", "0.2"))
+    REAL_TIME_MONEY_BURST = float(os.getenv("REAL_TIME_MONEY_BURST", "0.1"))
+    REAL_TIME_STREAM_INTERVAL = float(os.getenv("REAL_TIME_STREAM_INTERVAL", "0.1"))
+
+    # Preset Settings
+    PRESET_MONEY_DIGITS = int(os.getenv("PRESET_MONEY_DIGITS", "5"))
+
+    # Special Function Cache Settings (seconds)
+    VERSION_CACHE_TTL = float(os.getenv("VERSION_CACHE_TTL", "86400"))
+    PUMP_DATA_CACHE_TTL = float(os.getenv("PUMP_DATA_CACHE_TTL", "86400"))
+    CONFIGURATION_CACHE_TTL = float(os.getenv("CONFIGURATION_CACHE_TTL", "3600"))
+
+    # Circuit Breaker Settings
+    BREAKER_MISS_THRESHOLD = int(os.getenv("BREAKER_MISS_THRESHOLD", "3"))
+    BREAKER_BASE_BACKOFF = float(os.getenv("BREAKER_BASE_BACKOFF", "1.0"))
+    BREAKER_MAX_BACKOFF = float(os.getenv("BREAKER_MAX_BACKOFF", "30.0"))
+
     # Monitoring Settings
     MONITOR_INTERVAL = int(os.getenv("MONITOR_INTERVAL", "30"))
     STATUS_HISTORY_SIZE = int(os.getenv("STATUS_HISTORY_SIZE", "100"))
+    STUCK_DISPENSING_TIMEOUT = float(os.getenv("STUCK_DISPENSING_TIMEOUT", "600"))
+    LONG_CALLING_TIMEOUT = float(os.getenv("LONG_CALLING_TIMEOUT", "120"))
+
+    # Alert Dispatch Settings
+    ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "100"))
+    ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "2"))
+    ALERT_SUPPRESSION_WINDOW = float(os.getenv("ALERT_SUPPRESSION_WINDOW", "300"))
+    ALERT_CALLBACK_TIMEOUT = float(os.getenv("ALERT_CALLBACK_TIMEOUT", "10"))
+
+    # Status History Store Settings
+    HISTORY_STORE_PATH = os.getenv("HISTORY_STORE_PATH", "status_history.db")
+    HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+    HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+    HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+    HISTORY_MINUTE_RETENTION_DAYS = float(
+        os.getenv("HISTORY_MINUTE_RETENTION_DAYS", "30")
+    )
+    HISTORY_HOUR_RETENTION_DAYS = float(os.getenv("HISTORY_HOUR_RETENTION_DAYS", "730"))
 
     # Logging Settings
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -72,7 +72,12 @@ def decode_frame(frame_bytes: bytes) -> Dict:
                     print(f"  {key}: {value}")
                 return result
             else:
-                result["errors"].append("Failed to parse transaction data")
+                decoder = GilbarcoTwoWireProtocol.transaction_decoder()
+                decoder.feed(frame_bytes)
+                result["errors"].append(
+                    f"Failed to parse transaction data: "
+                    f"{decoder.error or 'incomplete block'}"
+                )
         except Exception as e:
             result["errors"].append(f"Transaction data parsing error: {e}")
 
@@ -0,0 +1,388 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from models import PumpStatus
+
+# Rollup resolutions in seconds
+MINUTE = 60
+HOUR = 3600
+
+Location = Tuple[str, int]  # (com_port, address)
+
+
+class StatusHistoryStore:
+    """
+    Durable log of pump status transitions, with minute and hour rollups.
+
+    Pumps are kept by their location on the wire, (com_port, address), since
+    pump ids are handed out at discovery and may change on a restart or
+    rescan; callers map them to pump ids. Only transitions are stored: a
+    status equal to the pump's last recorded one is ignored. `record` just
+    appends to an in-memory batch; a writer thread commits the batch every
+    `flush_interval` seconds (or once it holds `batch_size` rows) in a single
+    transaction, to SQLite in WAL mode so reads are not blocked by the writer.
+
+    Each transition also closes the interval the pump spent in its previous
+    state. That time is split over minute and hour buckets, giving per-state
+    seconds and entry counts that stay small however long the history gets.
+    The state a pump is in now, and since when, is kept in its own table
+    (pump_states) and only shows up in the rollups once it ends. Raw
+    transitions, minute rollups and hour rollups are pruned after their own
+    retention periods; pump_states never is, so a state held for longer than
+    the raw retention is still charged in full.
+    """
+
+    # How often old rows are pruned
+    PRUNE_INTERVAL = 3600.0
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval or Config.HISTORY_FLUSH_INTERVAL
+        self.batch_size = batch_size or Config.HISTORY_BATCH_SIZE
+        self.retention = {
+            "transitions": Config.HISTORY_RETENTION_DAYS * 86400,
+            MINUTE: Config.HISTORY_MINUTE_RETENTION_DAYS * 86400,
+            HOUR: Config.HISTORY_HOUR_RETENTION_DAYS * 86400,
+        }
+        self._batch: List[Tuple[str, int, float, str, Optional[str]]] = []
+        # location -> (last recorded status, unix time it was entered)
+        self._current: Dict[Location, Tuple[str, float]] = {}
+        self._batch_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._last_prune = 0.0
+        self.written = 0
+        self.write_errors = 0
+        self.logger = logging.getLogger("StatusHistoryStore")
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._set_aside_pump_id_tables()
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS transitions ("
+            " com_port TEXT NOT NULL,"
+            " address INTEGER NOT NULL,"
+            " ts REAL NOT NULL,"
+            " status TEXT NOT NULL,"
+            " error_message TEXT);"
+            "CREATE INDEX IF NOT EXISTS transitions_location_ts"
+            " ON transitions (com_port, address, ts);"
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            " com_port TEXT NOT NULL,"
+            " address INTEGER NOT NULL,"
+            " resolution INTEGER NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " seconds REAL NOT NULL,"
+            " entries INTEGER NOT NULL,"
+            " PRIMARY KEY (com_port, address, resolution, bucket, status));"
+            "CREATE TABLE IF NOT EXISTS pump_states ("
+            " com_port TEXT NOT NULL,"
+            " address INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " since REAL NOT NULL,"
+            " PRIMARY KEY (com_port, address));"
+        )
+        self._db.commit()
+        self._load_current()
+
+        self._thread = threading.Thread(
+            target=self._run, name="StatusHistoryWriter", daemon=True
+        )
+        self._thread.start()
+
+    def _set_aside_pump_id_tables(self):
+        """
+        Rename tables of a file written when pumps were stored by pump id
+
+        Those ids cannot be mapped back to a location, so the rows are kept
+        for inspection but no longer read.
+        """
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(transitions)")]
+        if "pump_id" not in columns:
+            return
+        self.logger.warning(
+            "Status history was stored by pump id; keeping it aside as "
+            "transitions_by_pump_id and rollups_by_pump_id"
+        )
+        with self._db:
+            self._db.execute("DROP INDEX IF EXISTS transitions_pump_ts")
+            self._db.execute("ALTER TABLE transitions RENAME TO transitions_by_pump_id")
+            self._db.execute("ALTER TABLE rollups RENAME TO rollups_by_pump_id")
+
+    def _load_current(self):
+        """Resume each pump's open interval"""
+        if self._db.execute("SELECT 1 FROM pump_states LIMIT 1").fetchone() is None:
+            # Written before open states had their own table: start from each
+            # pump's last stored transition
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO pump_states"
+                    " SELECT t.com_port, t.address, t.status, t.ts FROM transitions t"
+                    " JOIN (SELECT com_port, address, MAX(ts) AS ts FROM transitions"
+                    " GROUP BY com_port, address) latest"
+                    " ON latest.com_port = t.com_port AND latest.address = t.address"
+                    " AND latest.ts = t.ts"
+                    " GROUP BY t.com_port, t.address"
+                )
+        rows = self._db.execute(
+            "SELECT com_port, address, status, since FROM pump_states"
+        ).fetchall()
+        for com_port, address, status, since in rows:
+            self._current[(com_port, address)] = (status, since)
+
+    def record(
+        self,
+        com_port: str,
+        address: int,
+        status: PumpStatus,
+        error_message: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """Queue a status for writing; returns False if it is not a transition"""
+        if timestamp is None:
+            timestamp = time.time()
+        location = (com_port, address)
+        with self._batch_lock:
+            current = self._current.get(location)
+            if current is not None and current[0] == status.value:
+                return False
+            self._current[location] = (status.value, timestamp)
+            self._batch.append(
+                (com_port, address, timestamp, status.value, error_message)
+            )
+            if len(self._batch) >= self.batch_size:
+                self._wake.set()
+        return True
+
+    def flush(self):
+        """Write the queued transitions and their rollups in one transaction"""
+        # Held from the swap to the commit, so batches land in the order they
+        # were collected and _rollups always sees the previous state
+        with self._db_lock:
+            with self._batch_lock:
+                batch, self._batch = self._batch, []
+            if not batch:
+                return
+
+            try:
+                rollups, states = self._rollups(batch)
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO transitions VALUES (?, ?, ?, ?, ?)", batch
+                    )
+                    self._db.executemany(
+                        "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?)"
+                        " ON CONFLICT (com_port, address, resolution, bucket, status)"
+                        " DO UPDATE"
+                        " SET seconds = seconds + excluded.seconds,"
+                        " entries = entries + excluded.entries",
+                        [(*key, *value) for key, value in rollups.items()],
+                    )
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO pump_states VALUES (?, ?, ?, ?)",
+                        [
+                            (*location, status, since)
+                            for location, (since, status) in states.items()
+                        ],
+                    )
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                self.write_errors += 1
+                self.logger.error(
+                    f"Failed to write {len(batch)} status transitions: {str(e)}"
+                )
+
+    def _rollups(
+        self, batch: List[Tuple[str, int, float, str, Optional[str]]]
+    ) -> Tuple[
+        Dict[Tuple[str, int, int, int, str], List], Dict[Location, Tuple[float, str]]
+    ]:
+        """
+        Rollup increments for a batch: (com_port, address, resolution, bucket,
+        status) -> [seconds, entries], and each pump's state after the batch
+        as location -> (since, status). Runs under the DB lock, so the state
+        each pump was in before the batch can be read from pump_states.
+        """
+        rollups: Dict[Tuple[str, int, int, int, str], List] = defaultdict(
+            lambda: [0.0, 0]
+        )
+        previous: Dict[Location, Tuple[float, str]] = {}
+        for com_port, address, ts, status, _ in batch:
+            location = (com_port, address)
+            if location not in previous:
+                row = self._db.execute(
+                    "SELECT since, status FROM pump_states"
+                    " WHERE com_port = ? AND address = ?",
+                    location,
+                ).fetchone()
+                previous[location] = row
+            last = previous[location]
+
+            for resolution in (MINUTE, HOUR):
+                entered = int(ts // resolution) * resolution
+                rollups[(*location, resolution, entered, status)][1] += 1
+                if last is None:
+                    continue
+                start, last_status = last
+                # Spread the time spent in the previous state over its buckets,
+                # skipping those already past retention (a pump left for months)
+                start = max(start, ts - self.retention[resolution])
+                bucket = int(start // resolution) * resolution
+                while bucket < ts:
+                    seconds = min(ts, bucket + resolution) - max(start, bucket)
+                    if seconds > 0:
+                        key = (*location, resolution, bucket, last_status)
+                        rollups[key][0] += seconds
+                    bucket += resolution
+            previous[location] = (ts, status)
+        return rollups, previous
+
+    def prune(self, now: Optional[float] = None):
+        """Delete transitions and rollups older than their retention"""
+        now = now or time.time()
+        with self._db_lock:
+            try:
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM transitions WHERE ts < ?",
+                        (now - self.retention["transitions"],),
+                    )
+                    for resolution in (MINUTE, HOUR):
+                        self._db.execute(
+                            "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                            (resolution, now - self.retention[resolution]),
+                        )
+            except sqlite3.Error as e:
+                self.logger.error(f"Failed to prune status history: {str(e)}")
+
+    def get_transitions(
+        self,
+        com_port: str,
+        address: int,
+        since: float,
+        until: Optional[float] = None,
+    ) -> List[Dict]:
+        """A pump's transitions between two unix times, oldest first"""
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT ts, status, error_message FROM transitions"
+                " WHERE com_port = ? AND address = ? AND ts >= ? AND ts <= ?"
+                " ORDER BY ts",
+                (
+                    com_port,
+                    address,
+                    since,
+                    until if until is not None else time.time(),
+                ),
+            ).fetchall()
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(ts),
+                "status": PumpStatus(status),
+                "error_message": error_message,
+            }
+            for ts, status, error_message in rows
+        ]
+
+    def get_rollups(
+        self,
+        com_port: str,
+        address: int,
+        resolution: int,
+        since: float,
+        until: Optional[float] = None,
+    ) -> List[Dict]:
+        """Seconds spent in, and entries into, each status per bucket"""
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT bucket, status, seconds, entries FROM rollups"
+                " WHERE com_port = ? AND address = ? AND resolution = ?"
+                " AND bucket >= ? AND bucket <= ? ORDER BY bucket, status",
+                (
+                    com_port,
+                    address,
+                    resolution,
+                    int(since // resolution) * resolution,
+                    until if until is not None else time.time(),
+                ),
+            ).fetchall()
+        return [
+            {
+                "bucket": datetime.fromtimestamp(bucket),
+                "status": PumpStatus(status),
+                "seconds": seconds,
+                "entries": entries,
+            }
+            for bucket, status, seconds, entries in rows
+        ]
+
+    async def async_get_transitions(
+        self,
+        com_port: str,
+        address: int,
+        since: float,
+        until: Optional[float] = None,
+    ) -> List[Dict]:
+        """Awaitable version of get_transitions, run on a worker thread"""
+        return await asyncio.to_thread(
+            self.get_transitions, com_port, address, since, until
+        )
+
+    async def async_get_rollups(
+        self,
+        com_port: str,
+        address: int,
+        resolution: int,
+        since: float,
+        until: Optional[float] = None,
+    ) -> List[Dict]:
+        """Awaitable version of get_rollups, run on a worker thread"""
+        return await asyncio.to_thread(
+            self.get_rollups, com_port, address, resolution, since, until
+        )
+
+    def _run(self):
+        """Writer loop: flush batches and prune until closed"""
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            if time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                self.prune()
+
+    def close(self):
+        """Write what is queued and close the database"""
+        self._stop_event.set()
+        self._wake.set()
+        self._thread.join(self.flush_interval + 1.0)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def to_dict(self) -> Dict:
+        with self._batch_lock:
+            queued = len(self._batch)
+        return {
+            "path": self.path,
+            "queued": queued,
+            "written": self.written,
+            "write_errors": self.write_errors,
+        }
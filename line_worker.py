@@ -0,0 +1,335 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+
+
+class Lane(IntEnum):
+    """
+    Priority lanes on a line, highest priority first.
+
+    Jobs are taken from the highest non-empty lane, FIFO within a lane. A job
+    that is already on the wire is never interrupted, so the wait for an
+    EMERGENCY job is bounded by the longest single exchange.
+    """
+
+    EMERGENCY = 0  # Pump stop and all-stop
+    CONTROL = 1  # Authorize, presets, transaction reads, connect/disconnect
+    POLL = 2  # Status polls
+    BACKGROUND = 3  # Totals, version and other bulk reads
+
+
+class LaneStats:
+    """Queue-wait statistics for one lane"""
+
+    # Number of recent waits kept for percentiles
+    SAMPLE_SIZE = 512
+
+    def __init__(self):
+        self.jobs = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent: deque = deque(maxlen=self.SAMPLE_SIZE)
+
+    def record(self, wait: float):
+        """Record how long a job waited for the line"""
+        self.jobs += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._recent.append(wait)
+
+    def to_dict(self) -> Dict:
+        """Wait times in milliseconds"""
+        recent = sorted(self._recent)
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000
+
+        return {
+            "jobs": self.jobs,
+            "avg_wait_ms": (self.total_wait / self.jobs * 1000) if self.jobs else 0.0,
+            "p50_wait_ms": percentile(0.50),
+            "p99_wait_ms": percentile(0.99),
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class LineBudget:
+    """
+    Token bucket limiting how much line time a class of jobs may use.
+
+    Tokens are seconds of line time. They refill at `share` seconds per second
+    up to `burst`; each job is charged its actual duration, and a job only
+    starts while the bucket is positive. The worker uses one for the BACKGROUND
+    lane; higher lanes are never limited by it.
+    """
+
+    def __init__(self, share: float, burst: float):
+        self.share = share
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self.used = 0.0
+        self.deferrals = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.share
+        )
+        self._updated = now
+
+    def time_until_available(self) -> float:
+        """Seconds until a job may start (0 if it may start now)"""
+        with self._lock:
+            self._refill()
+            if self._tokens > 0:
+                return 0.0
+            if self.share <= 0:
+                return float("inf")
+            # Wait until the bucket is just above empty
+            return -self._tokens / self.share + 0.001
+
+    def defer(self):
+        """Count a job held back because the bucket is empty"""
+        with self._lock:
+            self.deferrals += 1
+
+    def charge(self, duration: float):
+        """Charge a job's line time against the bucket"""
+        with self._lock:
+            self._refill()
+            self._tokens -= duration
+            self.used += duration
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            self._refill()
+            return {
+                "line_share": self.share,
+                "burst_seconds": self.burst,
+                "available_seconds": self._tokens,
+                "used_seconds": self.used,
+                "deferrals": self.deferrals,
+            }
+
+
+class _JobQueue:
+    """Priority queue of line jobs, ordered by lane and then submission order"""
+
+    def __init__(self, budget: Optional[LineBudget] = None):
+        self.budget = budget
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._deferred: Optional[int] = None  # last job counted as deferred
+
+    def put(self, lane: Lane, job: tuple):
+        with self._cond:
+            heapq.heappush(self._heap, (lane, next(self._counter), job))
+            self._cond.notify()
+
+    def get(self) -> Optional[tuple]:
+        """
+        Next job as (lane, job), or None once closed and drained
+
+        A BACKGROUND job is only handed out when nothing else is queued and the
+        line budget allows it; otherwise the worker sleeps until either the
+        budget refills or a higher-priority job arrives.
+        """
+        with self._cond:
+            while True:
+                if self._heap:
+                    lane, sequence, _ = self._heap[0]
+                    if lane != Lane.BACKGROUND or self.budget is None or self._closed:
+                        break
+                    wait = self.budget.time_until_available()
+                    if wait <= 0:
+                        break
+                    if sequence != self._deferred:
+                        # Count each held-back job once, not every wake-up
+                        self._deferred = sequence
+                        self.budget.defer()
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+            lane, _, job = heapq.heappop(self._heap)
+            return lane, job
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def lane_sizes(self) -> Dict[Lane, int]:
+        with self._cond:
+            sizes = {lane: 0 for lane in Lane}
+            for lane, _, _ in self._heap:
+                sizes[lane] += 1
+            return sizes
+
+
+class LineWorker:
+    """
+    Owns all I/O on a single serial line.
+
+    The Two-Wire line is half-duplex and shared by every pump on it, so only one
+    exchange can be in flight at a time. Instead of having callers contend for
+    locks, every exchange is submitted to this worker as a job and executed on a
+    dedicated thread, highest priority lane first. Callers get a Future back and
+    may wait on it, attach callbacks, or wrap it for asyncio.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        background_share: Optional[float] = None,
+        background_burst: Optional[float] = None,
+    ):
+        self.name = name
+        if background_share is None:
+            background_share = Config.BACKGROUND_LINE_SHARE
+        if background_burst is None:
+            background_burst = Config.BACKGROUND_BURST
+        self.background_budget = LineBudget(background_share, background_burst)
+        self._queue = _JobQueue(self.background_budget)
+        self._thread: Optional[threading.Thread] = None
+        self._state_lock = threading.Lock()
+        self.lane_stats: Dict[Lane, LaneStats] = {lane: LaneStats() for lane in Lane}
+        self.logger = logging.getLogger(f"LineWorker-{name}")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the worker thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_worker_thread(self) -> bool:
+        """Whether the caller is running on this worker's thread"""
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._state_lock:
+            if not self.is_running:
+                self._start_locked()
+
+    def _start_locked(self):
+        """Start a new worker thread (caller holds the state lock)"""
+        # Each thread gets its own queue so a worker being stopped can
+        # never pick up jobs meant for its replacement
+        self._queue = _JobQueue(self.background_budget)
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._queue,),
+            name=f"LineWorker-{self.name}",
+            daemon=True,
+        )
+        self._thread.start()
+        self.logger.debug(f"[{self.name}] Line worker started")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker thread after the jobs already queued have run"""
+        with self._state_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.close()
+            self._thread = None
+
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+        self.logger.debug(f"[{self.name}] Line worker stopped")
+
+    def submit(
+        self, fn: Callable, *args, lane: Lane = Lane.CONTROL, **kwargs
+    ) -> Future:
+        """
+        Queue a job for the line in the given lane and return a Future for its
+        result.
+
+        Jobs submitted from the worker thread itself (e.g. a job that needs a
+        follow-up status poll) run inline, since queueing them would deadlock.
+        """
+        future: Future = Future()
+
+        if self.in_worker_thread():
+            self._execute(future, fn, args, kwargs)
+            return future
+
+        with self._state_lock:
+            if not self.is_running:
+                self._start_locked()
+            self._queue.put(lane, (time.monotonic(), future, fn, args, kwargs))
+        return future
+
+    def call(
+        self,
+        fn: Callable,
+        *args,
+        lane: Lane = Lane.CONTROL,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """Run a job on the line and wait for its result"""
+        return self.submit(fn, *args, lane=lane, **kwargs).result(timeout)
+
+    def pending(self) -> int:
+        """Approximate number of jobs waiting for the line"""
+        return self._queue.qsize()
+
+    def get_background_stats(self) -> Dict:
+        """Line-time budget of the BACKGROUND lane"""
+        return self.background_budget.to_dict()
+
+    def get_lane_stats(self) -> Dict[str, Dict]:
+        """Queue depth and wait-time statistics per lane"""
+        sizes = self._queue.lane_sizes()
+        return {
+            lane.name: {"pending": sizes[lane], **self.lane_stats[lane].to_dict()}
+            for lane in Lane
+        }
+
+    def _run(self, jobs: _JobQueue):
+        """Worker loop: execute jobs one at a time until stopped"""
+        while True:
+            item = jobs.get()
+            if item is None:
+                break
+
+            lane, (enqueued_at, future, fn, args, kwargs) = item
+            started_at = time.monotonic()
+            self.lane_stats[lane].record(started_at - enqueued_at)
+            self._execute(future, fn, args, kwargs)
+
+            if lane == Lane.BACKGROUND:
+                self.background_budget.charge(time.monotonic() - started_at)
+
+    def _execute(self, future: Future, fn: Callable, args: tuple, kwargs: dict):
+        """Run a single job and complete its future"""
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.logger.error(f"[{self.name}] Line job failed: {str(e)}")
+            future.set_exception(e)
+        else:
+            future.set_result(result)
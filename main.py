@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, Query, Path
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from typing import List, Optional, Dict
@@ -14,8 +14,20 @@ from models import (
     CommandRequest,
     CommandResponse,
     TransactionData,
+    PumpTotals,
+    PumpTotalsDelta,
+    RealTimeMoney,
+    GradePrice,
+    PriceChangeRequest,
+    PriceChangeResult,
+    PresetRequest,
+    PresetResponse,
+    PumpVersion,
+    PumpMiscData,
+    PumpConfiguration,
 )
 from pump_manager import PumpManager
+from pump_controller import TwoWireManagerRegistry
 
 COMPORT = "/dev/ttyS0"
 
@@ -176,7 +188,8 @@ async def discover_pumps(
                 detail="address_range_start must be less than or equal to address_range_end",
             )
 
-        result = pump_manager.auto_discover_and_manage(
+        result = await pump_manager.run_blocking(
+            pump_manager.auto_discover_and_manage,
             com_ports=[COMPORT],
             address_range=(address_range_start, address_range_end),
             timeout=timeout,
@@ -212,6 +225,91 @@ async def get_all_pumps():
     return pump_manager.get_pump_list()
 
 
+@app.get(
+    "/api/pumps/status",
+    response_model=Dict[int, PumpStatusResponse],
+    tags=["Pump Information"],
+    summary="Get All Pump Statuses",
+    description="Get the current status of all managed pumps in parallel.",
+)
+async def get_all_pump_statuses():
+    """
+    Get the current status of all managed pumps.
+
+    This endpoint queries all pumps in parallel for better performance.
+    Returns a dictionary mapping pump IDs to their status information.
+    """
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    return await pump_manager.async_get_all_pump_statuses()
+
+
+@app.get(
+    "/api/pumps/totals",
+    response_model=Dict[int, PumpTotals],
+    tags=["Pump Information"],
+    summary="Get All Pump Totals",
+    description="Get the last electronic totals snapshot of every pump, from memory.",
+)
+async def get_all_pump_totals():
+    """Get the last totals snapshot of every pump that has one"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    return pump_manager.get_all_totals()
+
+
+@app.post(
+    "/api/pumps/totals/collect",
+    response_model=Dict[int, PumpTotals],
+    tags=["Pump Information"],
+    summary="Collect All Pump Totals",
+    description="""
+         Read the electronic totals of every pump (e.g. at shift close).
+
+         Reads run in each line's background lane, within its line-time budget,
+         so status polling is not degraded. Pumps that are busy or do not answer
+         are left out of the result.
+         """,
+)
+async def collect_all_pump_totals():
+    """Read the totals of every pump and store them as the latest snapshots"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    return await pump_manager.async_collect_all_totals()
+
+
+def _money_event_stream(pump_ids: Optional[List[int]] = None) -> StreamingResponse:
+    """Server-sent events of real-time money readings"""
+
+    async def events():
+        async for reading in pump_manager.stream_real_time_money(pump_ids):
+            yield f"data: {reading.model_dump_json()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get(
+    "/api/pumps/money/stream",
+    tags=["Pump Information"],
+    summary="Stream Real-Time Money",
+    description="""
+         Server-sent events with the running sale amount of every dispensing pump.
+
+         Only the latest amount per pump is sent; a slow client skips
+         intermediate amounts rather than falling behind.
+         """,
+)
+async def stream_all_real_time_money():
+    """Stream real-time money for all pumps"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    return _money_event_stream()
+
+
 @app.get(
     "/api/pumps/{pump_id}",
     response_model=PumpInfo,
@@ -259,7 +357,7 @@ async def get_pump_status(pump_id: int = Path(..., description="Pump ID", ge=1))
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    status = pump_manager.get_pump_status(pump_id)
+    status = await pump_manager.async_get_pump_status(pump_id)
     if not status:
         raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
 
@@ -272,8 +370,12 @@ async def get_pump_status(pump_id: int = Path(..., description="Pump ID", ge=1))
     tags=["Pump Information"],
     summary="Get Pump Transaction Data",
     description="""
-         Get transaction data from a specific pump.
-         
+         Get the latest sale of a specific pump.
+
+         Sales are captured automatically when a pump reaches COMPLETE and
+         served from the transaction store; set `refresh` to read the
+         transaction from the pump instead.
+
          Returns:
          - Volume dispensed
          - Price per unit
@@ -285,11 +387,15 @@ async def get_pump_status(pump_id: int = Path(..., description="Pump ID", ge=1))
          Some pumps may only provide transaction data after a sale is completed.
          """,
 )
-async def get_pump_transaction(pump_id: int = Path(..., description="Pump ID", ge=1)):
+async def get_pump_transaction(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    refresh: bool = Query(False, description="Read the transaction from the pump"),
+):
     """
-    Get transaction data from a specific pump.
+    Get the latest sale of a specific pump.
 
-    This endpoint sends a transaction data request to the pump and returns:
+    Served from the transaction store unless `refresh` is set or no sale has
+    been captured yet, in which case the pump is asked and this returns:
     - Volume dispensed
     - Price per unit
     - Total money amount
@@ -299,7 +405,9 @@ async def get_pump_transaction(pump_id: int = Path(..., description="Pump ID", g
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    transaction_data = pump_manager.get_transaction_data(pump_id)
+    transaction_data = await pump_manager.async_get_transaction_data(
+        pump_id, refresh=refresh
+    )
     if not transaction_data:
         raise HTTPException(
             status_code=404,
@@ -311,23 +419,258 @@ async def get_pump_transaction(pump_id: int = Path(..., description="Pump ID", g
 
 
 @app.get(
-    "/api/pumps/status",
-    response_model=Dict[int, PumpStatusResponse],
+    "/api/pumps/{pump_id}/transactions",
+    response_model=List[TransactionData],
     tags=["Pump Information"],
-    summary="Get All Pump Statuses",
-    description="Get the current status of all managed pumps in parallel.",
+    summary="Get Captured Pump Transactions",
+    description="""
+         Get the sales captured from a specific pump, newest first.
+
+         Each sale is read once when the pump reaches COMPLETE and kept under
+         a per-pump sequence number, so it is still available after the pump
+         has been re-authorized. No line traffic is generated.
+         """,
 )
-async def get_all_pump_statuses():
-    """
-    Get the current status of all managed pumps.
+async def get_pump_transactions(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    limit: int = Query(10, description="Number of sales to return", ge=1, le=1000),
+):
+    """Get the captured sales of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    This endpoint queries all pumps in parallel for better performance.
-    Returns a dictionary mapping pump IDs to their status information.
-    """
+    transactions = pump_manager.get_transactions(pump_id, limit)
+    if transactions is None:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    return transactions
+
+
+@app.get(
+    "/api/pumps/{pump_id}/version",
+    response_model=PumpVersion,
+    tags=["Pump Information"],
+    summary="Get Pump Version",
+    description="""
+         Get the pump's software version, release date, operation time and
+         power-up count (special function 001).
+
+         Served from cache unless `refresh` is set; the cache is cleared when
+         the pump goes OFFLINE.
+         """,
+)
+async def get_pump_version(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    refresh: bool = Query(False, description="Read the data from the pump"),
+):
+    """Get the software version data of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    version = await pump_manager.async_get_pump_version(pump_id, refresh=refresh)
+    if not version:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No version data available for pump {pump_id}. "
+            f"Pump may not support special functions or be busy.",
+        )
+
+    return version
+
+
+@app.get(
+    "/api/pumps/{pump_id}/pump-data",
+    response_model=PumpMiscData,
+    tags=["Pump Information"],
+    summary="Get Pump Data",
+    description="""
+         Get the pump's unit type, volume unit, money digits and push-to-start
+         mode (special function 00E). Served from cache unless `refresh` is set.
+         """,
+)
+async def get_pump_misc_data(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    refresh: bool = Query(False, description="Read the data from the pump"),
+):
+    """Get the miscellaneous data of a specific pump"""
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    return pump_manager.get_all_pump_statuses()
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    pump_data = await pump_manager.async_get_pump_misc_data(pump_id, refresh=refresh)
+    if not pump_data:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No pump data available for pump {pump_id}. "
+            f"Pump may not support special functions or be busy.",
+        )
+
+    return pump_data
+
+
+@app.get(
+    "/api/pumps/{pump_id}/configuration/{code}",
+    response_model=PumpConfiguration,
+    tags=["Pump Information"],
+    summary="Get Pump Configuration",
+    description="""
+         Get one configuration item of a pump (special function 00F). Served
+         from cache unless `refresh` is set.
+         """,
+)
+async def get_pump_configuration(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    code: int = Path(..., description="Configuration command code", ge=0, le=99),
+    refresh: bool = Query(False, description="Read the data from the pump"),
+):
+    """Get a configuration item of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    configuration = await pump_manager.async_get_pump_configuration(
+        pump_id, code, refresh=refresh
+    )
+    if not configuration:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No configuration {code} available for pump {pump_id}",
+        )
+
+    return configuration
+
+
+@app.delete(
+    "/api/pumps/{pump_id}/special-functions",
+    tags=["Pump Information"],
+    summary="Clear Pump Data Cache",
+    description="Forget the cached version, pump data and configuration of a pump.",
+)
+async def invalidate_special_functions(
+    pump_id: int = Path(..., description="Pump ID", ge=1)
+):
+    """Clear the special function cache of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    dropped = pump_manager.invalidate_special_functions(pump_id)
+    if dropped is None:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    return {"message": f"Cleared {dropped} cached item(s) for pump {pump_id}"}
+
+
+@app.get(
+    "/api/pumps/{pump_id}/money",
+    response_model=RealTimeMoney,
+    tags=["Pump Information"],
+    summary="Get Real-Time Money",
+    description="""
+         Get the running sale amount of a dispensing pump.
+
+         Served from the latest reading taken by the status poller.
+         """,
+)
+async def get_real_time_money(pump_id: int = Path(..., description="Pump ID", ge=1)):
+    """Get the running sale amount of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    reading = await pump_manager.run_blocking(pump_manager.get_real_time_money, pump_id)
+    if not reading:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No real-time money available for pump {pump_id}. "
+            f"Pump may not be dispensing.",
+        )
+
+    return reading
+
+
+@app.get(
+    "/api/pumps/{pump_id}/money/stream",
+    tags=["Pump Information"],
+    summary="Stream Pump Real-Time Money",
+    description="Server-sent events with the running sale amount of a dispensing pump.",
+)
+async def stream_real_time_money(pump_id: int = Path(..., description="Pump ID", ge=1)):
+    """Stream real-time money for a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    return _money_event_stream([pump_id])
+
+
+@app.get(
+    "/api/pumps/{pump_id}/totals",
+    response_model=PumpTotals,
+    tags=["Pump Information"],
+    summary="Get Pump Totals",
+    description="""
+         Get the electronic volume and money totals per grade of a pump.
+
+         Served from the last snapshot unless `refresh` is set. Totals can only
+         be read while the pump is not authorized or dispensing.
+         """,
+)
+async def get_pump_totals(
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+    refresh: bool = Query(False, description="Read the totals from the pump"),
+):
+    """Get the electronic totals of a specific pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    totals = await pump_manager.async_get_pump_totals(pump_id, refresh=refresh)
+    if not totals:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No totals available for pump {pump_id}. "
+            f"Pump may be busy or not responding.",
+        )
+
+    return totals
+
+
+@app.get(
+    "/api/pumps/{pump_id}/totals/delta",
+    response_model=PumpTotalsDelta,
+    tags=["Pump Information"],
+    summary="Get Pump Totals Delta",
+    description="Volume and money dispensed per grade between the last two totals snapshots.",
+)
+async def get_pump_totals_delta(pump_id: int = Path(..., description="Pump ID", ge=1)):
+    """Get the difference between a pump's last two totals snapshots"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    if pump_id not in pump_manager.pumps:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    delta = pump_manager.get_totals_delta(pump_id)
+    if not delta:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Pump {pump_id} needs two totals snapshots for a delta",
+        )
+
+    return delta
 
 
 @app.post(
@@ -343,7 +686,7 @@ async def connect_port(
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    success = pump_manager.connect_port(com_port)
+    success = await pump_manager.run_blocking(pump_manager.connect_port, com_port)
     if not success:
         raise HTTPException(
             status_code=400, detail=f"Failed to connect to COM port {com_port}"
@@ -365,7 +708,7 @@ async def disconnect_port(
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    success = pump_manager.disconnect_port(com_port)
+    success = await pump_manager.run_blocking(pump_manager.disconnect_port, com_port)
     if not success:
         raise HTTPException(
             status_code=404, detail=f"COM port {com_port} not found or not connected"
@@ -385,7 +728,7 @@ async def connect_all_ports():
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    results = pump_manager.connect_all_ports()
+    results = await pump_manager.run_blocking(pump_manager.connect_all_ports)
 
     return {
         "message": "Connection attempt completed for all COM ports",
@@ -406,7 +749,7 @@ async def disconnect_all_ports():
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
 
-    pump_manager.disconnect_all_ports()
+    await pump_manager.run_blocking(pump_manager.disconnect_all_ports)
 
     return {"message": "Successfully disconnected from all COM ports"}
 
@@ -427,6 +770,80 @@ async def get_connected_ports():
     return {"connected_ports": connected_ports, "total_connected": len(connected_ports)}
 
 
+@app.post(
+    "/api/pumps/{pump_id}/preset",
+    response_model=PresetResponse,
+    tags=["Pump Control"],
+    summary="Preset and Authorize Pump",
+    description="""
+         Send a money or volume preset to a pump and authorize it.
+
+         The preset, the authorization and the status check run back to back
+         on the line. A money preset may name the allowed grades; a volume
+         preset needs a grade and a price level.
+         """,
+)
+async def preset_pump(
+    preset: PresetRequest,
+    pump_id: int = Path(..., description="Pump ID", ge=1),
+):
+    """Preset and authorize a pump"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    try:
+        result = await pump_manager.async_preset_pump(pump_id, preset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    return result
+
+
+@app.get(
+    "/api/prices",
+    response_model=List[GradePrice],
+    tags=["Pump Control"],
+    summary="Get Price Book",
+    description="Get the prices last pushed to the pumps, per grade and price level.",
+)
+async def get_price_book():
+    """Get the current price book"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    return pump_manager.get_price_book()
+
+
+@app.put(
+    "/api/prices",
+    response_model=PriceChangeResult,
+    tags=["Pump Control"],
+    summary="Change Prices",
+    description="""
+         Push new prices per grade and price level to the pumps.
+
+         Only pumps whose prices differ are sent a price change, and all COM
+         ports are updated in parallel. Pumps that are not IDLE or CALLING are
+         skipped and reported as such.
+         """,
+)
+async def change_prices(price_change: PriceChangeRequest):
+    """Push a price change to the pumps"""
+    if not pump_manager:
+        raise HTTPException(status_code=500, detail="Pump manager not initialized")
+
+    for pump_id in price_change.pump_ids or []:
+        if pump_id not in pump_manager.pumps:
+            raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
+
+    return await pump_manager.async_change_prices(
+        price_change.prices, price_change.pump_ids
+    )
+
+
 # Future command endpoints (placeholder for extensibility)
 @app.post(
     "/api/pumps/{pump_id}/commands",
@@ -443,7 +860,9 @@ async def execute_command(
     Execute a custom command on a pump.
 
     This endpoint provides extensibility for future command implementations.
-    Currently supported commands can be added here.
+    Currently supported commands:
+    - authorize: Authorize the pump and verify it reaches AUTHORIZED/DISPENSING
+    - stop: Stop the pump and verify it reaches STOPPED/IDLE
     """
     if not pump_manager:
         raise HTTPException(status_code=500, detail="Pump manager not initialized")
@@ -451,6 +870,25 @@ async def execute_command(
     if pump_id not in pump_manager.pumps:
         raise HTTPException(status_code=404, detail=f"Pump {pump_id} not found")
 
+    command_handlers = {
+        "authorize": pump_manager.async_authorize_pump,
+        "stop": pump_manager.async_stop_pump,
+    }
+
+    handler = command_handlers.get(command_request.command.lower())
+    if handler:
+        success = await handler(pump_id)
+        return CommandResponse(
+            success=bool(success),
+            message=(
+                f"Command '{command_request.command}' executed on pump {pump_id}"
+                if success
+                else f"Command '{command_request.command}' could not be confirmed on pump {pump_id}"
+            ),
+            data=None,
+            timestamp=datetime.now(),
+        )
+
     # Placeholder for future command implementations
     return CommandResponse(
         success=False,
@@ -525,6 +963,18 @@ async def set_logging_level(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/debug/lines", tags=["Debug"])
+async def get_lines_debug():
+    """Get connection and polling info for every COM port line"""
+    return {
+        "lines": TwoWireManagerRegistry.get_manager_info(),
+        "transaction_store": (
+            pump_manager.transactions.to_dict() if pump_manager else None
+        ),
+        "timestamp": datetime.now(),
+    }
+
+
 @app.get("/debug/communication/{pump_id}", tags=["Debug"])
 async def get_communication_debug(pump_id: int):
     """Get detailed communication debug info for a pump"""
@@ -546,6 +996,14 @@ async def get_communication_debug(pump_id: int):
                 "com_port": manager.connection.com_port,
                 "baudrate": manager.connection.baudrate,
                 "timeout": manager.connection.timeout,
+                "is_polling": manager.is_polling,
+                "poll_interval": manager.poller.poll_interval(pump_info.address),
+                "next_poll_in": manager.poller.get_schedule().get(pump_info.address),
+                "breaker": (
+                    manager.breakers[pump_info.address].to_dict()
+                    if pump_info.address in manager.breakers
+                    else None
+                ),
             }
 
         return {
@@ -36,6 +36,16 @@ class PumpInfo(BaseModel):
     is_connected: bool = Field(False, description="Connection status")
 
 
+class ExtendedPumpStatus(BaseModel):
+    """What the customer has done at the pump so far (special function 010)"""
+    price_level_needed: bool = Field(..., description="Price level still has to be selected")
+    grade_needed: bool = Field(..., description="Grade still has to be selected")
+    nozzle_out: bool = Field(..., description="Pump handle is on / nozzle is out")
+    push_to_start_needed: bool = Field(..., description="Push-To-Start still has to be pressed")
+    selected_grade: Optional[int] = Field(None, description="Grade digit selected at the pump (None if unknown)")
+    timestamp: datetime = Field(..., description="When the extended status was read")
+
+
 class PumpStatusResponse(BaseModel):
     """
     Pump status response with detailed protocol information
@@ -56,11 +66,13 @@ class PumpStatusResponse(BaseModel):
     error_message: Optional[str] = Field(None, description="Error details if status is ERROR")
     raw_status_code: Optional[str] = Field(None, description="Raw protocol status code (hex)")
     wire_format: Optional[str] = Field(None, description="Complete wire format byte (hex)")
+    extended: Optional[ExtendedPumpStatus] = Field(None, description="Extended status, for CALLING and AUTHORIZED pumps that support it")
     
     
 class TransactionData(BaseModel):
     """Transaction data from pump"""
     pump_id: int = Field(..., description="Pump identifier")
+    sequence: Optional[int] = Field(None, description="Per-pump sequence number of a captured sale (None for a direct read)")
     volume: Optional[float] = Field(None, description="Dispensed volume")
     price_per_unit: Optional[float] = Field(None, description="Price per unit")
     total_amount: Optional[float] = Field(None, description="Total transaction amount")
@@ -97,3 +109,131 @@ class PumpDiscoveryResult(BaseModel):
     total_found: int = Field(..., description="Total number of pumps found")
     scan_duration: float = Field(..., description="Discovery scan duration in seconds")
     timestamp: datetime = Field(..., description="Discovery timestamp")
+
+
+class GradeTotals(BaseModel):
+    """Electronic totals stored in the pump for one grade"""
+    grade: int = Field(..., description="Fuel grade (protocol grade nibble, 0 = grade 1)")
+    volume: float = Field(..., description="Volume totals")
+    money: float = Field(..., description="Money totals")
+    ppu_level_1: Optional[float] = Field(None, description="Level 1 price per unit")
+    ppu_level_2: Optional[float] = Field(None, description="Level 2 price per unit")
+
+
+class PumpTotals(BaseModel):
+    """Snapshot of a pump's electronic totals"""
+    pump_id: int = Field(..., description="Pump identifier")
+    grades: List[GradeTotals] = Field(..., description="Totals per grade")
+    timestamp: datetime = Field(..., description="When the totals were read")
+
+
+class GradeTotalsDelta(BaseModel):
+    """Volume and money dispensed on one grade between two totals snapshots"""
+    grade: int = Field(..., description="Fuel grade (protocol grade nibble, 0 = grade 1)")
+    volume: float = Field(..., description="Volume dispensed")
+    money: float = Field(..., description="Money taken")
+
+
+class PumpTotalsDelta(BaseModel):
+    """Difference between two totals snapshots of a pump"""
+    pump_id: int = Field(..., description="Pump identifier")
+    grades: List[GradeTotalsDelta] = Field(..., description="Delta per grade")
+    from_timestamp: datetime = Field(..., description="Timestamp of the older snapshot")
+    to_timestamp: datetime = Field(..., description="Timestamp of the newer snapshot")
+
+
+class RealTimeMoney(BaseModel):
+    """Running sale amount of a dispensing pump (latest reading only)"""
+    pump_id: int = Field(..., description="Pump identifier")
+    money: float = Field(..., description="Current money display")
+    timestamp: datetime = Field(..., description="When the amount was read")
+
+
+class GradePrice(BaseModel):
+    """Price per unit of one grade at one price level"""
+    grade: int = Field(..., ge=0, le=15, description="Fuel grade (protocol grade nibble, 0 = grade 1)")
+    level: int = Field(1, ge=1, le=2, description="Price level (1 or 2)")
+    price: float = Field(..., ge=0, lt=10, description="Price per unit (up to 9.999)")
+
+
+class PriceChangeRequest(BaseModel):
+    """Prices to push to the pumps"""
+    prices: List[GradePrice] = Field(..., description="New prices per grade and level")
+    pump_ids: Optional[List[int]] = Field(None, description="Pumps to update (all pumps if omitted)")
+
+
+class PriceChangeStatus(str, Enum):
+    """Outcome of a price change on one pump"""
+    UPDATED = "UPDATED"        # Every changed price was accepted
+    UNCHANGED = "UNCHANGED"    # The pump already had these prices
+    FAILED = "FAILED"          # Some prices were not accepted
+    SKIPPED = "SKIPPED"        # Pump was not in a state that allows price changes
+
+
+class PumpPriceChange(BaseModel):
+    """Result of a price change on one pump"""
+    pump_id: int = Field(..., description="Pump identifier")
+    status: PriceChangeStatus = Field(..., description="Outcome")
+    changed: List[GradePrice] = Field(default_factory=list, description="Prices accepted by the pump")
+    failed: List[GradePrice] = Field(default_factory=list, description="Prices not accepted by the pump")
+    message: Optional[str] = Field(None, description="Details when not updated")
+
+
+class PriceChangeResult(BaseModel):
+    """Result of a price change across pumps"""
+    pumps: List[PumpPriceChange] = Field(..., description="Result per pump")
+    duration: float = Field(..., description="Time taken in seconds")
+    timestamp: datetime = Field(..., description="When the price change finished")
+
+
+class PresetType(str, Enum):
+    """Kind of preset sent to a pump"""
+    MONEY = "MONEY"
+    VOLUME = "VOLUME"
+
+
+class PresetRequest(BaseModel):
+    """Preset to send to a pump before authorizing it"""
+    preset_type: PresetType = Field(..., description="Money or volume preset")
+    amount: float = Field(..., gt=0, description="Preset money amount or volume")
+    grades: Optional[List[int]] = Field(None, description="Allowed grades (protocol grade nibbles, 0 = grade 1); required for a volume preset")
+    level: Optional[int] = Field(None, ge=1, le=2, description="Price level; required for a volume preset")
+
+
+class PresetResponse(BaseModel):
+    """Result of a preset and authorize"""
+    pump_id: int = Field(..., description="Pump identifier")
+    success: bool = Field(..., description="Whether the pump accepted the preset and was authorized")
+    status: Optional[PumpStatus] = Field(None, description="Pump status read back at the end")
+    message: str = Field(..., description="Result details")
+    duration: float = Field(..., description="Time on the line in seconds")
+    timestamp: datetime = Field(..., description="When the preset finished")
+
+
+class PumpVersion(BaseModel):
+    """Software version data of a pump (special function 001)"""
+    pump_id: int = Field(..., description="Pump identifier")
+    version: str = Field(..., description="Software version number")
+    release_date: str = Field(..., description="Software release date (MM/DD/YY)")
+    operation_hours: int = Field(..., description="Hours of operation since the last cold start")
+    operation_minutes: int = Field(..., description="Minutes past operation_hours")
+    warm_starts: int = Field(..., description="Number of warm starts (power-ups)")
+    timestamp: datetime = Field(..., description="When the data was read from the pump")
+
+
+class PumpMiscData(BaseModel):
+    """Miscellaneous pump data (special function 00E)"""
+    pump_id: int = Field(..., description="Pump identifier")
+    unit_type_code: int = Field(..., description="Unit type code (protocol section 6)")
+    conversion_factor_code: int = Field(..., description="Volume unit code (1 US gal, 2 UK gal, 3 litres)")
+    six_digit_money: bool = Field(..., description="Whether the pump uses 6 digit money")
+    push_to_start: bool = Field(..., description="Whether the pump is Auto-On/Push-To-Start")
+    timestamp: datetime = Field(..., description="When the data was read from the pump")
+
+
+class PumpConfiguration(BaseModel):
+    """One configuration item of a pump (special function 00F)"""
+    pump_id: int = Field(..., description="Pump identifier")
+    code: int = Field(..., description="Configuration command code")
+    data: str = Field(..., description="Configuration data as hex digits, most significant first")
+    timestamp: datetime = Field(..., description="When the data was read from the pump")
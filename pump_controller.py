@@ -1,18 +1,62 @@
 import serial
 import time
+import asyncio
 import logging
 import threading
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 from abc import ABC, abstractmethod
 
-from models import PumpStatus, PumpInfo, TransactionData, PumpStatusResponse
+from models import (
+    PumpStatus,
+    PumpInfo,
+    TransactionData,
+    GradeTotals,
+    PumpTotals,
+    GradeTotalsDelta,
+    PumpTotalsDelta,
+    GradePrice,
+    PriceChangeStatus,
+    PumpPriceChange,
+    PresetResponse,
+    PumpVersion,
+    PumpMiscData,
+    PumpConfiguration,
+)
+from line_worker import Lane, LineBudget, LineWorker
+from pump_poller import PumpPoller
+from circuit_breaker import AddressBreaker
+from pump_state import (
+    ExtendedStatusRecord,
+    PumpStateMachine,
+    RealTimeMoneyRecord,
+    StatusRecord,
+    TransitionKind,
+)
+from ttl_cache import TTLCache
+from transaction_store import TransactionStore
+from config import Config
+
+
+class StatusWord(NamedTuple):
+    """A received status word, fully decoded"""
+
+    pump_id: int  # Pump address (1-16)
+    status_code: int  # Protocol status nibble
+    status: PumpStatus
+    raw_status_code: str  # e.g. "0x6"
+    wire_format: str  # e.g. "0x61"
 
 
 class GilbarcoTwoWireProtocol:
     """
     Gilbarco Two-Wire Protocol implementation for SK700-II dispensers
     Based on TWOTP-IS-IS2.26-P specification
+
+    Single-word commands and status decoding are served from tables built once
+    at import (see _build_tables), so the polling hot path does no branching,
+    allocation or formatting per word.
     """
 
     # Command codes (hexadecimal)
@@ -46,12 +90,76 @@ class GilbarcoTwoWireProtocol:
     DCW_PPU_NEXT = 0xF7  # PPU data next
     DCW_VOLUME_NEXT = 0xF9  # Volume data next
     DCW_MONEY_NEXT = 0xFA  # Money data next
+    DCW_LEVEL_1 = 0xF4  # Price level 1
+    DCW_LEVEL_2 = 0xF5  # Price level 2
+    DCW_VOLUME_PRESET = 0xF1  # Volume preset (to pump)
+    DCW_MONEY_PRESET = 0xF2  # Money preset (to pump)
+    DCW_PRESET_AMOUNT_NEXT = 0xF8  # Preset quantity next (to pump)
+    DCW_SPECIAL_FUNCTION = 0xFE  # Special function command next (to pump)
+
+    # Special function codes X3X2X1 (section 4.9, table 6)
+    SF_VERSION = 0x001  # Version number, release date, operation time
+    SF_MISC_PUMP_DATA = 0x00E  # Unit type, volume unit, money digits
+    SF_CONFIGURATION = 0x00F  # Configuration data
+    SF_EXTENDED_STATUS = 0x010  # Extended pump status
+
+    # Data words following each DCW in a transaction data block (section 4.5).
+    # F1-F3 is the obsolete preset type, F4/F5 the transaction type.
+    TRANSACTION_FIELDS = {
+        0xF1: 0,
+        0xF2: 0,
+        0xF3: 0,
+        DCW_PUMP_ID_NEXT: 5,
+        DCW_GRADE_NEXT: 1,
+        DCW_LEVEL_1: 0,
+        DCW_LEVEL_2: 0,
+        DCW_PPU_NEXT: 4,
+        DCW_VOLUME_NEXT: 6,
+        DCW_MONEY_NEXT: 6,
+    }
+    TRANSACTION_BLOCK_LENGTHS = (33,)
+
+    # Data words following each DCW in a pump totals block (section 4.6). The
+    # F6 grade group repeats once per grade, 30 words each, for 1 to 6 grades.
+    TOTALS_FIELDS = {
+        DCW_GRADE_NEXT: 1,
+        DCW_VOLUME_NEXT: 8,
+        DCW_MONEY_NEXT: 8,
+        DCW_LEVEL_1: 4,
+        DCW_LEVEL_2: 4,
+    }
+    TOTALS_BLOCK_LENGTHS = tuple(4 + 30 * grades for grades in range(1, 7))
+
+    # Real-time money response: 6 BCD data words, no framing (section 4.7)
+    REAL_TIME_MONEY_LENGTH = 6
+
+    # PPU digits in a price change block (section 4.8.3), 3 decimals
+    PPU_DIGITS = 4
+    PPU_SCALE = 1000
+
+    # Preset amounts are sent in hundredths (sections 4.8.1, 4.8.2). Volume
+    # presets always use 5 digits; money presets 5 or 6 depending on the pump.
+    PRESET_DIGITS = 5
+    PRESET_SCALE = 100
+    PRESET_MINIMUM = 10
+    # Grades a range-of-grades preset can name (G1-G8)
+    GRADE_GROUP_SIZE = 8
 
     # Protocol constants
     BAUDRATE = 9600  # Standard two-wire baud rate
     WORD_BITS = 11  # Start + 8 data + parity + stop
     PARITY = serial.PARITY_EVEN
     TIMEOUT_MS = 68  # Maximum response time
+    TURNAROUND_MS = 5  # Minimum gap after a response before the next transmission
+    DATA_BLOCK_SETTLE_MS = (
+        68  # Minimum gap after a data block before its status request
+    )
+
+    # Lookup tables, filled in once by _build_tables() below the class
+    STATUS_CODES: Dict[int, PumpStatus] = {}
+    COMMANDS: Dict[int, Tuple[Optional[bytes], ...]] = {}
+    ALL_STOP_COMMAND: bytes = b""
+    STATUS_WORDS: Tuple[StatusWord, ...] = ()
 
     @staticmethod
     def pump_id_to_nibble(pump_id: int) -> int:
@@ -76,35 +184,253 @@ class GilbarcoTwoWireProtocol:
     @staticmethod
     def build_status_command(pump_id: int) -> bytes:
         """Build status poll command: '0' '<p>'"""
-        pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
-        command = (GilbarcoTwoWireProtocol.CMD_STATUS << 4) | pump_nibble
-        return bytes([command])
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_STATUS, pump_id
+        )
 
     @staticmethod
     def build_authorize_command(pump_id: int) -> bytes:
         """Build authorize command: '1' '<p>'"""
-        pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
-        command = (GilbarcoTwoWireProtocol.CMD_AUTHORIZE << 4) | pump_nibble
-        return bytes([command])
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_AUTHORIZE, pump_id
+        )
 
     @staticmethod
     def build_stop_command(pump_id: int) -> bytes:
         """Build pump stop command: '3' '<p>'"""
-        pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
-        command = (GilbarcoTwoWireProtocol.CMD_STOP << 4) | pump_nibble
-        return bytes([command])
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_STOP, pump_id
+        )
+
+    @staticmethod
+    def build_totals_request(pump_id: int) -> bytes:
+        """Build pump totals request: '5' '<p>'"""
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_TOTALS, pump_id
+        )
+
+    @staticmethod
+    def build_real_time_money_request(pump_id: int) -> bytes:
+        """Build real-time money request: '6' '<p>'"""
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_REAL_TIME, pump_id
+        )
+
+    @staticmethod
+    def parse_real_time_money(response: bytes) -> float:
+        """Parse the 6 BCD data words of a real-time money response (section 4.7)"""
+        if len(response) != GilbarcoTwoWireProtocol.REAL_TIME_MONEY_LENGTH:
+            raise ValueError(
+                f"Real-time money response is {len(response)} words, expected "
+                f"{GilbarcoTwoWireProtocol.REAL_TIME_MONEY_LENGTH}"
+            )
+        for word in response:
+            if word & 0xF0 != 0xE0 or word & 0xF > 9:
+                raise ValueError(f"Invalid real-time money word 0x{word:02X}")
+        return GilbarcoTwoWireProtocol.parse_bcd_money(response)
+
+    @staticmethod
+    def build_data_next_command(pump_id: int) -> bytes:
+        """Build data next command: '2' '<p>' (pump answers 'D' '<p>')"""
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_SEND_DATA, pump_id
+        )
+
+    @staticmethod
+    def send_data_word(pump_id: int) -> int:
+        """The 'D' '<p>' word a pump sends when it is ready to receive data"""
+        return (
+            GilbarcoTwoWireProtocol.STATUS_SEND_DATA << 4
+        ) | GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
+
+    @staticmethod
+    def encode_bcd(value: int, digits: int) -> List[int]:
+        """Encode a value as BCD data words, least significant digit first"""
+        if not 0 <= value < 10**digits:
+            raise ValueError(f"{value} does not fit in {digits} BCD digits")
+        return [0xE0 | (value // 10**i) % 10 for i in range(digits)]
+
+    @staticmethod
+    def build_data_block(message: List[int]) -> bytes:
+        """
+        Frame a console-to-pump message as a data block (sections 3.4.3, 3.5)
+
+        Adds <STX>, the data length, <LRCn>, the LRC and <ETX> around the
+        message words.
+        """
+        protocol = GilbarcoTwoWireProtocol
+        # DL counts every word after itself: message, LRCn, LRC and ETX
+        data_length = 0xE0 | (-(len(message) + 3) & 0xF)
+        words = [protocol.DCW_STX, data_length, *message, protocol.DCW_LRC_NEXT]
+        words.append(0xE0 | protocol.calculate_lrc(words))
+        words.append(protocol.DCW_ETX)
+        return bytes(words)
+
+    @staticmethod
+    def build_price_change_block(grade: int, price: float, level: int = 1) -> bytes:
+        """
+        Build a price change data block (section 4.8.3)
+
+        `grade` is the protocol grade nibble (0 = grade 1) and `level` the price
+        level (1 or 2).
+        """
+        protocol = GilbarcoTwoWireProtocol
+        if not 0 <= grade <= 0xF:
+            raise ValueError(f"Invalid grade: {grade}")
+        if level not in (1, 2):
+            raise ValueError(f"Invalid price level: {level}")
+
+        level_dcw = protocol.DCW_LEVEL_1 if level == 1 else protocol.DCW_LEVEL_2
+        ppu = protocol.encode_bcd(
+            round(price * protocol.PPU_SCALE), protocol.PPU_DIGITS
+        )
+        return protocol.build_data_block(
+            [level_dcw, protocol.DCW_GRADE_NEXT, 0xE0 | grade, protocol.DCW_PPU_NEXT]
+            + ppu
+        )
+
+    @staticmethod
+    def build_preset_block(
+        volume: bool,
+        amount: float,
+        grades: Optional[List[int]] = None,
+        level: Optional[int] = None,
+        money_digits: int = PRESET_DIGITS,
+    ) -> bytes:
+        """
+        Build a preset data block (sections 4.8.1, 4.8.2)
+
+        Without grades, or with a single grade on a volume preset, the standard
+        preset format is used; otherwise the range-of-grades format. A volume
+        preset requires a grade and a price level.
+        """
+        protocol = GilbarcoTwoWireProtocol
+        if volume and (not grades or level is None):
+            raise ValueError("A volume preset requires a grade and a price level")
+        if level not in (None, 1, 2):
+            raise ValueError(f"Invalid price level: {level}")
+
+        digits = protocol.PRESET_DIGITS if volume else money_digits
+        value = round(amount * protocol.PRESET_SCALE)
+        if value < protocol.PRESET_MINIMUM:
+            raise ValueError(f"Preset amount {amount} is below the pump minimum")
+
+        message = [protocol.DCW_VOLUME_PRESET if volume else protocol.DCW_MONEY_PRESET]
+        if level is not None:
+            message.append(protocol.DCW_LEVEL_1 if level == 1 else protocol.DCW_LEVEL_2)
+        if grades:
+            message.append(protocol.DCW_GRADE_NEXT)
+            if volume and len(grades) == 1:
+                if not 0 <= grades[0] <= 0xF:
+                    raise ValueError(f"Invalid grade: {grades[0]}")
+                message.append(0xE0 | grades[0])
+            else:
+                group = 0
+                for grade in grades:
+                    if not 0 <= grade < protocol.GRADE_GROUP_SIZE:
+                        raise ValueError(f"Grade {grade} cannot be in a grade group")
+                    group |= 1 << grade
+                message += [0xE0 | (group & 0xF), 0xE0 | (group >> 4)]
+        message.append(protocol.DCW_PRESET_AMOUNT_NEXT)
+        message += protocol.encode_bcd(value, digits)
+        return protocol.build_data_block(message)
+
+    @staticmethod
+    def build_special_function_block(code: int, message: bytes = b"") -> bytes:
+        """Build a special function command data block (section 4.9.1)"""
+        protocol = GilbarcoTwoWireProtocol
+        return protocol.build_data_block(
+            [protocol.DCW_SPECIAL_FUNCTION]
+            + [0xE0 | (code >> shift) & 0xF for shift in (8, 4, 0)]
+            + list(message)
+        )
+
+    @staticmethod
+    def special_function_decoder(pump_id: int, code: int) -> "SpecialFunctionDecoder":
+        """Create a decoder for the response to a special function command"""
+        return SpecialFunctionDecoder(pump_id, code)
+
+    @staticmethod
+    def parse_version(digits: List[int]) -> Dict:
+        """Parse a version number response (special function 001)"""
+        if len(digits) < 22:
+            raise ValueError(f"Version response has {len(digits)} digits, expected 22")
+
+        def number(start: int, end: int) -> int:
+            return int("".join(str(digit) for digit in digits[start:end]))
+
+        return {
+            # 0xF (C6) is a blank in the version number
+            "version": "".join(f"{digit:X}" for digit in digits[0:4] if digit != 0xF),
+            "release_date": "{}{}/{}{}/{}{}".format(*digits[4:10]),
+            "operation_hours": number(10, 16),
+            "operation_minutes": number(16, 18),
+            "warm_starts": number(18, 22),
+        }
+
+    @staticmethod
+    def parse_misc_pump_data(digits: List[int]) -> Dict:
+        """Parse a miscellaneous pump data response (special function 00E)"""
+        if len(digits) < 14:
+            raise ValueError(
+                f"Pump data response has {len(digits)} digits, expected 14"
+            )
+        return {
+            "unit_type_code": digits[0] * 10 + digits[1],
+            "conversion_factor_code": digits[2] * 10 + digits[3],
+            "six_digit_money": digits[10] * 10 + digits[11] == 1,
+            "push_to_start": digits[12] * 10 + digits[13] == 1,
+        }
+
+    @staticmethod
+    def parse_configuration(digits: List[int]) -> Dict:
+        """Parse a configuration response (special function 00F)"""
+        if len(digits) < 2:
+            raise ValueError("Configuration response has no command code")
+        return {
+            "code": digits[0] * 10 + digits[1],
+            "data": "".join(f"{digit:X}" for digit in digits[2:]),
+        }
+
+    @staticmethod
+    def parse_extended_status(digits: List[int]) -> Dict:
+        """Parse an extended pump status response (special function 010)"""
+        if len(digits) < 6:
+            raise ValueError(
+                f"Extended status response has {len(digits)} digits, expected 6"
+            )
+        # digits[0] tells standard from More-Buttons pumps; flags are 0 = needed
+        return {
+            "price_level_needed": digits[1] == 0,
+            "grade_needed": digits[2] == 0,
+            "nozzle_out": digits[3] == 1,
+            "push_to_start_needed": digits[4] == 0,
+            "selected_grade": digits[5] or None,
+        }
 
     @staticmethod
     def build_transaction_request(pump_id: int) -> bytes:
         """Build transaction data request: '4' '<p>'"""
-        pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
-        command = (GilbarcoTwoWireProtocol.CMD_TRANSACTION << 4) | pump_nibble
-        return bytes([command])
+        return GilbarcoTwoWireProtocol.command_for(
+            GilbarcoTwoWireProtocol.CMD_TRANSACTION, pump_id
+        )
 
     @staticmethod
     def build_all_stop_command() -> bytes:
         """Build all stop command: 'F' 'C'"""
-        return bytes([0xFC])  # F=15, C=12 combined
+        return GilbarcoTwoWireProtocol.ALL_STOP_COMMAND
+
+    @staticmethod
+    def command_for(command_code: int, pump_id: int) -> bytes:
+        """Look up the precomputed single-word command for a pump address"""
+        if not 1 <= pump_id <= 16:
+            raise ValueError(f"Invalid pump ID: {pump_id}")
+        return GilbarcoTwoWireProtocol.COMMANDS[command_code][pump_id]
+
+    @staticmethod
+    def decode_status_word(word: int) -> StatusWord:
+        """Decode a received status word with a single table lookup"""
+        return GilbarcoTwoWireProtocol.STATUS_WORDS[word]
 
     @staticmethod
     def parse_status_response(response: bytes) -> Tuple[int, int]:
@@ -112,101 +438,108 @@ class GilbarcoTwoWireProtocol:
         if len(response) != 1:
             raise ValueError("Invalid status response length")
 
-        word = response[0]
-        status = (word >> 4) & 0xF
-        pump_nibble = word & 0xF
-        pump_id = GilbarcoTwoWireProtocol.nibble_to_pump_id(pump_nibble)
-
-        return pump_id, status
+        decoded = GilbarcoTwoWireProtocol.STATUS_WORDS[response[0]]
+        return decoded.pump_id, decoded.status_code
 
     @staticmethod
     def status_code_to_enum(status_code: int) -> PumpStatus:
         """Convert two-wire status code to PumpStatus enum"""
-        status_map = {
-            GilbarcoTwoWireProtocol.STATUS_DATA_ERROR: PumpStatus.ERROR,
-            GilbarcoTwoWireProtocol.STATUS_OFF: PumpStatus.IDLE,
-            GilbarcoTwoWireProtocol.STATUS_CALL: PumpStatus.CALLING,
-            GilbarcoTwoWireProtocol.STATUS_AUTH: PumpStatus.AUTHORIZED,
-            GilbarcoTwoWireProtocol.STATUS_BUSY: PumpStatus.DISPENSING,
-            GilbarcoTwoWireProtocol.STATUS_PEOT: PumpStatus.COMPLETE,
-            GilbarcoTwoWireProtocol.STATUS_FEOT: PumpStatus.COMPLETE,
-            GilbarcoTwoWireProtocol.STATUS_STOP: PumpStatus.STOPPED,
-            GilbarcoTwoWireProtocol.STATUS_SEND_DATA: PumpStatus.ERROR,  # Special state
-        }
-        return status_map.get(status_code, PumpStatus.OFFLINE)
+        return GilbarcoTwoWireProtocol.STATUS_CODES.get(status_code, PumpStatus.OFFLINE)
 
     @staticmethod
     def calculate_lrc(data: List[int]) -> int:
-        """Calculate LRC checksum for data block"""
-        lrc = 0
-        for byte in data:
-            lrc ^= byte
-        return lrc & 0xF  # 4-bit LRC
-
-    @staticmethod
-    def parse_transaction_data(data_block: bytes) -> Optional[Dict]:
-        """Parse transaction data block from pump response"""
-        try:
-            if len(data_block) < 10:  # Minimum expected length
-                return None
+        """
+        Calculate the LRC check character for a data block (section 3.6)
 
-            pos = 0
-            result = {}
+        `data` runs from <STX> up to and including <LRCn>. The LRC is the 4-bit
+        two's complement of the sum of the least significant nibbles.
+        """
+        return -sum(word & 0xF for word in data) & 0xF
 
-            # Should start with STX
-            if data_block[pos] != GilbarcoTwoWireProtocol.DCW_STX:
-                return None
-            pos += 1
+    @staticmethod
+    def transaction_decoder() -> "DataBlockDecoder":
+        """Create a decoder for a transaction data block (command 4 response)"""
+        return DataBlockDecoder(
+            GilbarcoTwoWireProtocol.TRANSACTION_FIELDS,
+            GilbarcoTwoWireProtocol.TRANSACTION_BLOCK_LENGTHS,
+        )
 
-            # Parse each section based on DCW
-            while pos < len(data_block):
-                if pos >= len(data_block):
-                    break
+    @staticmethod
+    def totals_decoder() -> "DataBlockDecoder":
+        """Create a decoder for a pump totals data block (command 5 response)"""
+        return DataBlockDecoder(
+            GilbarcoTwoWireProtocol.TOTALS_FIELDS,
+            GilbarcoTwoWireProtocol.TOTALS_BLOCK_LENGTHS,
+        )
 
-                dcw = data_block[pos]
-                pos += 1
+    @staticmethod
+    def parse_transaction_data(data_block: bytes) -> Optional[Dict]:
+        """
+        Parse a transaction data block from a pump response
+
+        Returns None unless the block is complete, well formed and passes its
+        LRC check.
+        """
+        decoder = GilbarcoTwoWireProtocol.transaction_decoder()
+        decoder.feed(data_block)
+        if not decoder.is_complete:
+            return None
+        return GilbarcoTwoWireProtocol.parse_transaction_fields(decoder.fields)
 
-                if dcw == GilbarcoTwoWireProtocol.DCW_ETX:
-                    break
-                elif dcw == GilbarcoTwoWireProtocol.DCW_PUMP_ID_NEXT:
-                    # Next 5 bytes are pump ID data
-                    if pos + 5 <= len(data_block):
-                        result["pump_data"] = data_block[pos : pos + 5]
-                        pos += 5
-                elif dcw == GilbarcoTwoWireProtocol.DCW_GRADE_NEXT:
-                    # Next byte is grade
-                    if pos < len(data_block):
-                        result["grade"] = data_block[pos] & 0xF
-                        pos += 1
-                elif dcw == GilbarcoTwoWireProtocol.DCW_VOLUME_NEXT:
-                    # Next 6 bytes are volume (BCD)
-                    if pos + 6 <= len(data_block):
-                        result["volume"] = GilbarcoTwoWireProtocol.parse_bcd_volume(
-                            data_block[pos : pos + 6]
-                        )
-                        pos += 6
-                elif dcw == GilbarcoTwoWireProtocol.DCW_MONEY_NEXT:
-                    # Next 6 bytes are money (BCD)
-                    if pos + 6 <= len(data_block):
-                        result["money"] = GilbarcoTwoWireProtocol.parse_bcd_money(
-                            data_block[pos : pos + 6]
-                        )
-                        pos += 6
-                elif dcw == GilbarcoTwoWireProtocol.DCW_PPU_NEXT:
-                    # Next 4 bytes are price per unit (BCD)
-                    if pos + 4 <= len(data_block):
-                        result["ppu"] = GilbarcoTwoWireProtocol.parse_bcd_ppu(
-                            data_block[pos : pos + 4]
-                        )
-                        pos += 4
-                else:
-                    # Skip unknown DCW + 1 data byte
-                    pos += 1
+    @staticmethod
+    def parse_transaction_fields(fields: List[Tuple[int, bytes]]) -> Dict:
+        """Build transaction data from the fields of a decoded data block"""
+        protocol = GilbarcoTwoWireProtocol
+        result = {}
+
+        for dcw, data in fields:
+            if dcw == protocol.DCW_PUMP_ID_NEXT:
+                result["pump_data"] = data
+            elif dcw == protocol.DCW_GRADE_NEXT:
+                result["grade"] = data[0] & 0xF
+            elif dcw == protocol.DCW_LEVEL_1:
+                result["price_level"] = 1
+            elif dcw == protocol.DCW_LEVEL_2:
+                result["price_level"] = 2
+            elif dcw == protocol.DCW_PPU_NEXT:
+                result["ppu"] = protocol.parse_bcd_ppu(data)
+            elif dcw == protocol.DCW_VOLUME_NEXT:
+                result["volume"] = protocol.parse_bcd_volume(data)
+            elif dcw == protocol.DCW_MONEY_NEXT:
+                result["money"] = protocol.parse_bcd_money(data)
+
+        return result
 
-            return result
+    @staticmethod
+    def parse_totals_fields(fields: List[Tuple[int, bytes]]) -> List[Dict]:
+        """Build per-grade totals from the fields of a decoded totals block"""
+        protocol = GilbarcoTwoWireProtocol
+        grades = []
+
+        for dcw, data in fields:
+            if dcw == protocol.DCW_GRADE_NEXT:
+                grades.append({"grade": data[0] & 0xF})
+            elif not grades:
+                raise ValueError(f"DCW 0x{dcw:02X} before the first grade")
+            elif dcw == protocol.DCW_VOLUME_NEXT:
+                grades[-1]["volume"] = protocol.parse_bcd_volume_totals(data)
+            elif dcw == protocol.DCW_MONEY_NEXT:
+                grades[-1]["money"] = protocol.parse_bcd_money(data)
+            elif dcw == protocol.DCW_LEVEL_1:
+                grades[-1]["ppu_level_1"] = protocol.parse_bcd_ppu(data)
+            elif dcw == protocol.DCW_LEVEL_2:
+                grades[-1]["ppu_level_2"] = protocol.parse_bcd_ppu(data)
+
+        return grades
 
-        except Exception:
-            return None
+    @staticmethod
+    def parse_bcd_volume_totals(bcd_bytes: bytes) -> float:
+        """Parse BCD volume totals data (XXXXXX.XX format)"""
+        volume = 0
+        for i, byte in enumerate(bcd_bytes):
+            digit = byte & 0xF
+            volume += digit * (10**i)
+        return volume / 100.0
 
     @staticmethod
     def parse_bcd_volume(bcd_bytes: bytes) -> float:
@@ -237,6 +570,348 @@ class GilbarcoTwoWireProtocol:
         return ppu / 1000.0  # Assume 3 decimal places
 
 
+def _build_tables():
+    """Precompute the protocol's command and status decode tables"""
+    protocol = GilbarcoTwoWireProtocol
+
+    protocol.STATUS_CODES = {
+        protocol.STATUS_DATA_ERROR: PumpStatus.ERROR,
+        protocol.STATUS_OFF: PumpStatus.IDLE,
+        protocol.STATUS_CALL: PumpStatus.CALLING,
+        protocol.STATUS_AUTH: PumpStatus.AUTHORIZED,
+        protocol.STATUS_BUSY: PumpStatus.DISPENSING,
+        protocol.STATUS_PEOT: PumpStatus.COMPLETE,
+        protocol.STATUS_FEOT: PumpStatus.COMPLETE,
+        protocol.STATUS_STOP: PumpStatus.STOPPED,
+        protocol.STATUS_SEND_DATA: PumpStatus.ERROR,  # Special state
+    }
+
+    # COMMANDS[command_code][pump_id] -> command word; index 0 is unused
+    protocol.COMMANDS = {
+        command_code: (None,)
+        + tuple(
+            bytes([(command_code << 4) | protocol.pump_id_to_nibble(pump_id)])
+            for pump_id in range(1, 17)
+        )
+        for command_code in (
+            protocol.CMD_STATUS,
+            protocol.CMD_AUTHORIZE,
+            protocol.CMD_SEND_DATA,
+            protocol.CMD_STOP,
+            protocol.CMD_TRANSACTION,
+            protocol.CMD_TOTALS,
+            protocol.CMD_REAL_TIME,
+        )
+    }
+    protocol.ALL_STOP_COMMAND = bytes(
+        [(protocol.CMD_ALL_STOP_1 << 4) | protocol.CMD_ALL_STOP_2]
+    )
+
+    # STATUS_WORDS[received word] -> StatusWord
+    protocol.STATUS_WORDS = tuple(
+        StatusWord(
+            pump_id=protocol.nibble_to_pump_id(word & 0xF),
+            status_code=word >> 4,
+            status=protocol.STATUS_CODES.get(word >> 4, PumpStatus.OFFLINE),
+            raw_status_code=f"0x{word >> 4:X}",
+            wire_format=f"0x{word:02X}",
+        )
+        for word in range(256)
+    )
+
+
+_build_tables()
+
+
+class DataBlockDecoder:
+    """
+    Resumable decoder for a data-to-console block.
+
+    Words are fed in as they come off the wire, in chunks of any size. The
+    decoder checks each word as it arrives:
+    - the block opens with <STX>;
+    - every DCW is one this block type may contain;
+    - every field carries exactly its expected number of data words;
+    - the LRC matches;
+    - the block closes with <ETX> at the expected length.
+    The first violation puts the decoder in the ERROR state with a reason, so
+    a reader can stop waiting on a corrupt frame straight away instead of
+    running out its read window.
+    """
+
+    WAIT_STX = "WAIT_STX"
+    FIELDS = "FIELDS"
+    LRC = "LRC"
+    ETX = "ETX"
+    COMPLETE = "COMPLETE"
+    ERROR = "ERROR"
+
+    def __init__(
+        self,
+        field_lengths: Dict[int, int],
+        block_lengths: Optional[Tuple[int, ...]] = None,
+        max_length: int = 256,
+    ):
+        self.field_lengths = field_lengths
+        self.block_lengths = block_lengths
+        self.max_length = max(block_lengths) if block_lengths else max_length
+        self.reset()
+
+    def reset(self):
+        """Discard all state and wait for a new block"""
+        self.state = self.WAIT_STX
+        self.error: Optional[str] = None
+        self.block = bytearray()
+        self.fields: List[Tuple[int, bytes]] = []
+        self._dcw: Optional[int] = None
+        self._data = bytearray()
+        self._nibble_sum = 0
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether a valid block has been received"""
+        return self.state == self.COMPLETE
+
+    @property
+    def is_error(self) -> bool:
+        """Whether the block was found to be corrupt"""
+        return self.state == self.ERROR
+
+    @property
+    def done(self) -> bool:
+        """Whether no more words are needed"""
+        return self.state in (self.COMPLETE, self.ERROR)
+
+    def feed(self, data: bytes) -> int:
+        """
+        Consume received words, returning how many were used
+
+        Decoding stops at the end of the block or at the first error; any words
+        after that are left unconsumed.
+        """
+        for consumed, word in enumerate(data):
+            if self.done:
+                return consumed
+            self._feed_word(word)
+        return len(data)
+
+    def _fail(self, reason: str):
+        self.state = self.ERROR
+        self.error = f"{reason} at word {len(self.block) - 1}"
+
+    def _close_field(self) -> bool:
+        """Check the length of the field being collected and store it"""
+        if self._dcw is None:
+            return True
+
+        expected = self.field_lengths[self._dcw]
+        if len(self._data) != expected:
+            self._fail(
+                f"DCW 0x{self._dcw:02X} carried {len(self._data)} data words, "
+                f"expected {expected}"
+            )
+            return False
+
+        self.fields.append((self._dcw, bytes(self._data)))
+        self._dcw = None
+        self._data = bytearray()
+        return True
+
+    def _feed_word(self, word: int):
+        self.block.append(word)
+        if len(self.block) > self.max_length:
+            self._fail(f"Block longer than {self.max_length} words")
+            return
+
+        kind = word & 0xF0
+        state = self.state
+
+        if state == self.FIELDS:
+            self._nibble_sum += word & 0xF
+            if kind == 0xE0:
+                if self._dcw is None:
+                    self._fail(f"Data word 0x{word:02X} without a DCW")
+                    return
+                self._data.append(word)
+                if len(self._data) > self.field_lengths[self._dcw]:
+                    self._fail(f"DCW 0x{self._dcw:02X} field too long")
+            elif kind == 0xF0:
+                if not self._close_field():
+                    return
+                if word == GilbarcoTwoWireProtocol.DCW_LRC_NEXT:
+                    self.state = self.LRC
+                elif word in self.field_lengths:
+                    self._dcw = word
+                else:
+                    self._fail(f"Unexpected DCW 0x{word:02X}")
+            else:
+                self._fail(f"Invalid word 0x{word:02X}")
+
+        elif state == self.WAIT_STX:
+            if word != GilbarcoTwoWireProtocol.DCW_STX:
+                self._fail(f"Expected STX, got 0x{word:02X}")
+                return
+            self._nibble_sum = word & 0xF
+            self.state = self.FIELDS
+
+        elif state == self.LRC:
+            expected = -self._nibble_sum & 0xF
+            if kind != 0xE0 or (word & 0xF) != expected:
+                self._fail(f"LRC mismatch: expected 0xE{expected:X}, got 0x{word:02X}")
+                return
+            self.state = self.ETX
+
+        elif state == self.ETX:
+            if word != GilbarcoTwoWireProtocol.DCW_ETX:
+                self._fail(f"Expected ETX, got 0x{word:02X}")
+                return
+            if self.block_lengths and len(self.block) not in self.block_lengths:
+                self._fail(
+                    f"Block is {len(self.block)} words, expected "
+                    f"{' or '.join(str(length) for length in self.block_lengths)}"
+                )
+                return
+            self.state = self.COMPLETE
+
+
+class SpecialFunctionDecoder:
+    """
+    Resumable decoder for a special function response (section 4.9.2.1).
+
+    Responses are sent in modified ASCII: every word but the framing is a hex
+    digit with the top bit set (B0-B9, C1-C6). Each block is
+        BA <length:2> <pump> <code:3> <remaining:2> <message> <checksum:2> 8D 8A
+    with a message of 2 x length digits, and blocks follow one another until
+    the remaining count reaches 0. Words are checked as they arrive, like
+    DataBlockDecoder, and the message digits of all blocks are collected in
+    `digits`. A Null block (no message) means the function is not supported.
+    """
+
+    COMPLETE = "COMPLETE"
+    ERROR = "ERROR"
+    RECEIVING = "RECEIVING"
+
+    BLOCK_LENGTH_NEXT = 0xBA
+    CARRIAGE_RETURN = 0x8D
+    LINE_FEED = 0x8A
+    # Words around the message: BA, length, pump, code, remaining, checksum, CR LF
+    OVERHEAD = 13
+
+    def __init__(self, pump_id: int, code: int, max_blocks: int = 16):
+        self.pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(pump_id)
+        self.code_digits = [(code >> shift) & 0xF for shift in (8, 4, 0)]
+        self.max_blocks = max_blocks
+        self.reset()
+
+    def reset(self):
+        """Discard all state and wait for a new response"""
+        self.state = self.RECEIVING
+        self.error: Optional[str] = None
+        self.block = bytearray()
+        self.digits: List[int] = []
+        self.blocks = 0
+        self._current: List[int] = []  # digit values of the block being received
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether a valid response has been received"""
+        return self.state == self.COMPLETE
+
+    @property
+    def is_error(self) -> bool:
+        """Whether the response was found to be corrupt"""
+        return self.state == self.ERROR
+
+    @property
+    def done(self) -> bool:
+        """Whether no more words are needed"""
+        return self.state in (self.COMPLETE, self.ERROR)
+
+    @property
+    def is_null(self) -> bool:
+        """Whether the pump answered with a Null block (no message)"""
+        return self.is_complete and not self.digits
+
+    def feed(self, data: bytes) -> int:
+        """Consume received words, returning how many were used"""
+        for consumed, word in enumerate(data):
+            if self.done:
+                return consumed
+            self._feed_word(word)
+        return len(data)
+
+    def _fail(self, reason: str):
+        self.state = self.ERROR
+        self.error = f"{reason} at word {len(self.block) - 1}"
+
+    @staticmethod
+    def _digit(word: int) -> Optional[int]:
+        """Hex digit of a modified ASCII word, or None if it is not one"""
+        if 0xB0 <= word <= 0xB9:
+            return word - 0xB0
+        if 0xC1 <= word <= 0xC6:
+            return word - 0xC1 + 10
+        return None
+
+    def _feed_word(self, word: int):
+        self.block.append(word)
+        position = len(self._current)
+
+        if position == 0:
+            if word != self.BLOCK_LENGTH_NEXT:
+                self._fail(f"Expected block length next, got 0x{word:02X}")
+                return
+            self._current.append(0)
+            return
+
+        if position >= 3:
+            message_length = 2 * (self._current[1] * 16 + self._current[2])
+            total = self.OVERHEAD + message_length
+            if position == total - 2:
+                if word != self.CARRIAGE_RETURN:
+                    self._fail(f"Expected carriage return, got 0x{word:02X}")
+                    return
+                self._current.append(0)
+                return
+            if position == total - 1:
+                if word != self.LINE_FEED:
+                    self._fail(f"Expected line feed, got 0x{word:02X}")
+                    return
+                self._close_block(message_length)
+                return
+
+        digit = self._digit(word)
+        if digit is None:
+            self._fail(f"Invalid word 0x{word:02X}")
+            return
+        self._current.append(digit)
+
+        if position == 3 and digit != self.pump_nibble:
+            self._fail(f"Response from pump nibble {digit:X}")
+        elif 4 <= position <= 6 and digit != self.code_digits[position - 4]:
+            self._fail("Response to a different special function")
+
+    def _close_block(self, message_length: int):
+        """Check a complete block's checksum and collect its message"""
+        digits = self._current[1:-1]  # length through checksum
+        values = [digits[i] * 16 + digits[i + 1] for i in range(0, len(digits), 2)]
+        expected = -sum(values[:-1]) & 0xFF
+        if values[-1] != expected:
+            self._fail(
+                f"Checksum mismatch: expected {expected:02X}, got {values[-1]:02X}"
+            )
+            return
+
+        self.digits.extend(digits[8 : 8 + message_length])
+        self.blocks += 1
+        remaining = digits[6] * 16 + digits[7]
+        self._current = []
+        if remaining == 0:
+            self.state = self.COMPLETE
+        elif self.blocks >= self.max_blocks:
+            self._fail(f"More than {self.max_blocks} blocks")
+
+
 # Legacy alias for compatibility
 GilbarcoProtocol = GilbarcoTwoWireProtocol
 
@@ -245,6 +920,9 @@ class SerialConnection:
     """
     Manages serial connection to a pump using Gilbarco Two-Wire Protocol
     Note: Real two-wire uses current loop interface, this is RS232/485 adapter version
+
+    Exchanges are not serialised here; callers sharing a connection must run
+    them one at a time (TwoWireManager does this through its LineWorker).
     """
 
     def __init__(self, com_port: str, baudrate: int = None, timeout: float = 0.068):
@@ -258,6 +936,7 @@ class SerialConnection:
         self.connection: Optional[serial.Serial] = None
         self.is_connected = False
         self.lock = threading.Lock()
+        self._last_rx_time = 0.0
         self.logger = logging.getLogger(f"SerialConnection-{com_port}")
 
     def connect(self) -> bool:
@@ -349,10 +1028,69 @@ class SerialConnection:
         finally:
             self.is_connected = False
 
+    def _wait_for_turnaround(self):
+        """Honour the minimum line turnaround (t2) after the last pump response"""
+        remaining = (
+            self._last_rx_time
+            + GilbarcoTwoWireProtocol.TURNAROUND_MS / 1000.0
+            - time.monotonic()
+        )
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _set_read_timeout(self, timeout: float):
+        """Set the port's read timeout, skipping the reconfiguration if unchanged"""
+        if self.connection.timeout != timeout:
+            self.connection.timeout = timeout
+
+    def _read_response(self, size: int, timeout: float) -> bytes:
+        """
+        Read up to `size` bytes, returning as soon as they arrive.
+
+        Gives up once `timeout` seconds have elapsed since the call, so a fast
+        pump is answered immediately and a silent one costs at most the deadline.
+        """
+        deadline = time.monotonic() + timeout
+        response = bytearray()
+
+        # Setting the timeout reconfigures the port, so it is set once per
+        # exchange (and not at all when unchanged), and only again after a
+        # short read
+        self._set_read_timeout(timeout)
+        while True:
+            chunk = self.connection.read(size - len(response))
+            if chunk:
+                response += chunk
+            if len(response) >= size:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._set_read_timeout(remaining)
+
+        if response:
+            self._last_rx_time = time.monotonic()
+        return bytes(response)
+
     def send_command(
-        self, command: bytes, expect_response: bool = True
+        self,
+        command: bytes,
+        expect_response: bool = True,
+        response_timeout: Optional[float] = None,
+        response_length: int = 1,
     ) -> Optional[bytes]:
-        """Send two-wire command and receive response"""
+        """
+        Send two-wire command and receive response
+
+        Args:
+            command: Command bytes to write
+            expect_response: Whether a response is expected back
+            response_timeout: Maximum wait for the response in seconds.
+                Defaults to the 68 ms protocol no-response timer plus the
+                transmission time of any words after the first.
+            response_length: Number of words in the response (1 for a
+                status word)
+        """
         if not self.is_connected:
             self.logger.info(
                 f"Port {self.com_port} not connected, attempting to connect..."
@@ -364,68 +1102,55 @@ class SerialConnection:
                 return None
 
         try:
-            with self.lock:
-                if not self.connection or not self.connection.is_open:
-                    self.logger.error(f"Serial connection {self.com_port} is not open")
-                    return None
+            if not self.connection or not self.connection.is_open:
+                self.logger.error(f"Serial connection {self.com_port} is not open")
+                return None
 
-                cmd_hex = command.hex().upper()
-                self.logger.info(
-                    f"[{self.com_port}] Sending command: {cmd_hex} ({len(command)} bytes)"
-                )
+            # Formatting per-exchange debug output costs more than the exchange
+            # bookkeeping itself, so skip it entirely unless DEBUG is enabled
+            debug = self.logger.isEnabledFor(logging.DEBUG)
+            if debug:
                 self.logger.debug(
-                    f"[{self.com_port}] Command breakdown: {' '.join([f'0x{b:02X}' for b in command])}"
+                    f"[{self.com_port}] Sending command: {command.hex().upper()} ({len(command)} bytes)"
                 )
 
-                self.connection.reset_input_buffer()
-                self.logger.debug(f"[{self.com_port}] Input buffer cleared")
-
-                bytes_written = self.connection.write(command)
-                self.connection.flush()
-                self.logger.debug(
-                    f"[{self.com_port}] Wrote {bytes_written} bytes to serial port"
-                )
+            self._wait_for_turnaround()
+            self.connection.reset_input_buffer()
 
-                if not expect_response:
-                    self.logger.info(
-                        f"[{self.com_port}] Command sent successfully (no response expected)"
-                    )
-                    return b""
+            self.connection.write(command)
+            self.connection.flush()
 
-                # Wait for response with proper timing
-                timeout_seconds = GilbarcoTwoWireProtocol.TIMEOUT_MS / 1000.0
-                self.logger.debug(
-                    f"[{self.com_port}] Waiting {timeout_seconds}s for response..."
+            if not expect_response:
+                self.logger.info(
+                    f"[{self.com_port}] Command sent successfully (no response expected)"
                 )
-                time.sleep(timeout_seconds)
+                return b""
+
+            # Wait for the response, giving up at the protocol deadline
+            if response_timeout is None:
+                response_timeout = GilbarcoTwoWireProtocol.TIMEOUT_MS / 1000.0
+                if response_length > 1:
+                    response_timeout += (
+                        (response_length - 1)
+                        * GilbarcoTwoWireProtocol.WORD_BITS
+                        / self.baudrate
+                    )
 
-                # Read response (typically 1 byte for status)
-                response = self.connection.read(1)
+            # Read response (typically 1 byte for status)
+            response = self._read_response(response_length, response_timeout)
 
-                if response:
-                    resp_hex = response.hex().upper()
-                    self.logger.info(
-                        f"[{self.com_port}] Received response: {resp_hex} ({len(response)} bytes)"
-                    )
+            if response:
+                if debug:
                     self.logger.debug(
-                        f"[{self.com_port}] Response breakdown: {' '.join([f'0x{b:02X}' for b in response])}"
+                        f"[{self.com_port}] Received response: {response.hex().upper()} ({len(response)} bytes)"
                     )
-
-                    # Decode response for logging
-                    if len(response) == 1:
-                        word = response[0]
-                        status = (word >> 4) & 0xF
-                        pump_nibble = word & 0xF
-                        self.logger.debug(
-                            f"[{self.com_port}] Decoded: Status=0x{status:X}, Pump={pump_nibble:X}"
-                        )
-
-                    return response
-                else:
-                    self.logger.warning(
-                        f"[{self.com_port}] No response received to command: {cmd_hex}"
+                return response
+            else:
+                if debug:
+                    self.logger.debug(
+                        f"[{self.com_port}] No response received to command: {command.hex().upper()}"
                     )
-                    return None
+                return None
 
         except serial.SerialException as e:
             self.logger.error(f"[{self.com_port}] Serial communication error: {str(e)}")
@@ -439,9 +1164,25 @@ class SerialConnection:
             return None
 
     def send_command_with_data_response(
-        self, command: bytes, max_response_length: int = 50
+        self,
+        command: bytes,
+        decoder: Optional[DataBlockDecoder] = None,
+        max_duration: float = 1.0,
     ) -> Optional[bytes]:
-        """Send command expecting a data block response (transaction data, totals, etc.)"""
+        """
+        Send command expecting a data block response (transaction data, totals, etc.)
+
+        The response is validated word by word as it arrives by `decoder`
+        (the transaction block layout by default). The raw block is returned
+        only once it is complete and valid; on a corrupt or truncated block the
+        reason is logged, `decoder` keeps it in `error`, and None is returned as
+        soon as the problem is seen.
+        """
+        if decoder is None:
+            decoder = GilbarcoTwoWireProtocol.transaction_decoder()
+        else:
+            decoder.reset()
+
         if not self.is_connected:
             self.logger.info(
                 f"Port {self.com_port} not connected, attempting to connect..."
@@ -453,76 +1194,49 @@ class SerialConnection:
                 return None
 
         try:
-            with self.lock:
-                if not self.connection or not self.connection.is_open:
-                    self.logger.error(f"Serial connection {self.com_port} is not open")
-                    return None
-
-                cmd_hex = command.hex().upper()
-                self.logger.info(
-                    f"[{self.com_port}] Sending data request command: {cmd_hex}"
-                )
-                self.logger.debug(
-                    f"[{self.com_port}] Expecting data block response (max {max_response_length} bytes)"
-                )
-
-                self.connection.reset_input_buffer()
-                self.logger.debug(f"[{self.com_port}] Input buffer cleared")
+            if not self.connection or not self.connection.is_open:
+                self.logger.error(f"Serial connection {self.com_port} is not open")
+                return None
 
-                bytes_written = self.connection.write(command)
-                self.connection.flush()
-                self.logger.debug(
-                    f"[{self.com_port}] Wrote {bytes_written} bytes to serial port"
-                )
+            cmd_hex = command.hex().upper()
+            self.logger.debug(
+                f"[{self.com_port}] Sending data request command: {cmd_hex}"
+            )
 
-                timeout_seconds = GilbarcoTwoWireProtocol.TIMEOUT_MS / 1000.0
-                time.sleep(timeout_seconds)
+            self._wait_for_turnaround()
+            self.connection.reset_input_buffer()
 
-                response = b""
-                start_time = time.time()
-                bytes_read = 0
+            self.connection.write(command)
+            self.connection.flush()
 
-                self.logger.debug(f"[{self.com_port}] Starting data block read...")
+            self._read_data_block(decoder, max_duration)
 
-                while (
-                    len(response) < max_response_length
-                    and (time.time() - start_time) < 1.0
-                ):
-                    chunk = self.connection.read(1)
-                    if chunk:
-                        response += chunk
-                        bytes_read += 1
-                        self.logger.debug(
-                            f"[{self.com_port}] Read byte {bytes_read}: 0x{chunk[0]:02X}"
-                        )
-
-                        # Check for ETX (end of data block)
-                        if chunk[0] == GilbarcoTwoWireProtocol.DCW_ETX:
-                            self.logger.debug(
-                                f"[{self.com_port}] Found ETX, data block complete"
-                            )
-                            break
-                    else:
-                        time.sleep(0.001)
-
-                if response:
-                    resp_hex = response.hex().upper()
-                    self.logger.info(
-                        f"[{self.com_port}] Received data block: {resp_hex} ({len(response)} bytes)"
-                    )
+            if decoder.is_complete:
+                response = bytes(decoder.block)
+                if self.logger.isEnabledFor(logging.DEBUG):
                     self.logger.debug(
-                        f"[{self.com_port}] Data block breakdown: {' '.join([f'0x{b:02X}' for b in response])}"
+                        f"[{self.com_port}] Received data block: {response.hex().upper()} ({len(response)} bytes)"
                     )
-
-                    # Log data block structure
                     self._log_data_block_structure(response)
+                return response
 
-                    return response
-                else:
-                    self.logger.warning(
-                        f"[{self.com_port}] No data block response to command: {cmd_hex}"
-                    )
-                    return None
+            if decoder.is_error:
+                self.logger.warning(
+                    f"[{self.com_port}] Corrupt data block in response to {cmd_hex}: "
+                    f"{decoder.error} ({decoder.block.hex().upper()})"
+                )
+            elif decoder.block:
+                decoder.error = f"Incomplete data block ({len(decoder.block)} words)"
+                self.logger.warning(
+                    f"[{self.com_port}] {decoder.error} in response to {cmd_hex}: "
+                    f"{decoder.block.hex().upper()}"
+                )
+            else:
+                decoder.error = "No response"
+                self.logger.warning(
+                    f"[{self.com_port}] No data block response to command: {cmd_hex}"
+                )
+            return None
 
         except serial.SerialException as e:
             self.logger.error(
@@ -537,6 +1251,124 @@ class SerialConnection:
             self.is_connected = False
             return None
 
+    def send_data_to_pump(self, pump_id: int, block: bytes) -> bool:
+        """
+        Send a data block to a pump (section 3.4.3)
+
+        Sends the data next command and, once the pump answers 'D' '<p>',
+        the block itself. Returns False if the pump did not enter the data
+        state. Whether the pump accepted the block is only known from its next
+        status, which must not be requested until DATA_BLOCK_SETTLE_MS later.
+        """
+        command = GilbarcoTwoWireProtocol.build_data_next_command(pump_id)
+        response = self.send_command(command)
+        expected = GilbarcoTwoWireProtocol.send_data_word(pump_id)
+        if not response or response[0] != expected:
+            received = response.hex().upper() if response else "nothing"
+            self.logger.warning(
+                f"[{self.com_port}] Pump {pump_id} did not accept data next: "
+                f"expected {expected:02X}, received {received}"
+            )
+            return False
+
+        try:
+            self._wait_for_turnaround()
+            self.connection.write(block)
+            self.connection.flush()
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    f"[{self.com_port}] Sent data block to pump {pump_id}: {block.hex().upper()}"
+                )
+            return True
+
+        except serial.SerialException as e:
+            self.logger.error(
+                f"[{self.com_port}] Serial communication error during data transfer: {str(e)}"
+            )
+            self.is_connected = False
+            return False
+
+    def send_special_function(
+        self,
+        pump_id: int,
+        block: bytes,
+        decoder: "SpecialFunctionDecoder",
+        max_duration: float = 1.0,
+    ) -> bool:
+        """
+        Send a special function command block and decode the response (section 4.9)
+
+        Returns True once `decoder` holds a complete response; otherwise the
+        reason is left in `decoder.error`.
+        """
+        decoder.reset()
+        if not self.send_data_to_pump(pump_id, block):
+            decoder.error = "Pump did not accept data next"
+            return False
+
+        self._read_data_block(decoder, max_duration)
+        if decoder.is_complete:
+            return True
+
+        if not decoder.is_error:
+            decoder.error = (
+                f"Incomplete response ({len(decoder.block)} words)"
+                if decoder.block
+                else "No response"
+            )
+        self.logger.warning(
+            f"[{self.com_port}] Special function response from pump {pump_id} "
+            f"failed: {decoder.error}"
+        )
+        return False
+
+    def _read_data_block(self, decoder: DataBlockDecoder, max_duration: float = 1.0):
+        """
+        Read a data-to-console block into `decoder`, draining the UART in bulk.
+
+        The read ends as soon as the decoder has a complete block or has found
+        it corrupt. It also ends when the pump falls silent for longer than
+        the 68 ms word timer (section 3.4.4), or when `max_duration` has
+        passed. After a corrupt block, the rest of the pump's transmission is
+        drained so the line is quiet before the next command.
+        """
+        word_timeout = GilbarcoTwoWireProtocol.TIMEOUT_MS / 1000.0
+        now = time.monotonic()
+        overall_deadline = now + max_duration
+        word_deadline = now + word_timeout
+
+        try:
+            while not decoder.done:
+                remaining = min(word_deadline, overall_deadline) - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                self.connection.timeout = remaining
+                chunk = self.connection.read(max(self.connection.in_waiting, 1))
+                if not chunk:
+                    continue
+
+                self._last_rx_time = time.monotonic()
+                word_deadline = self._last_rx_time + word_timeout
+                decoder.feed(chunk)
+
+            if decoder.is_error:
+                self._drain_line(overall_deadline)
+        finally:
+            self.connection.timeout = self.timeout
+
+    def _drain_line(self, deadline: float):
+        """Discard incoming words until the line has been quiet for t2"""
+        quiet = GilbarcoTwoWireProtocol.TURNAROUND_MS / 1000.0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self.connection.timeout = min(quiet, remaining)
+            if not self.connection.read(max(self.connection.in_waiting, 1)):
+                return
+            self._last_rx_time = time.monotonic()
+
     def _log_data_block_structure(self, data_block: bytes):
         """Log the structure of a received data block for debugging"""
         if not data_block:
@@ -586,115 +1418,394 @@ class TwoWireManager:
     4. One serial connection handles multiple pumps
     """
 
+    # Delay before reading back the status after a single-word command
+    COMMAND_VERIFY_DELAY = 0.1
+    # Tries for a data block request before giving up on a corrupt response
+    DATA_REQUEST_ATTEMPTS = 2
+    # Volume and money totals are 8 BCD digits with 2 decimals, so they roll
+    # over at 1,000,000.00
+    TOTALS_ROLLOVER = 1_000_000.0
+    # Statuses after which the last real-time money reading is stale
+    SALE_RESET_STATUSES = (PumpStatus.IDLE, PumpStatus.CALLING, PumpStatus.AUTHORIZED)
+    # Data blocks (prices, presets) may only be sent in OFF and CALL (section 4.8)
+    DATA_BLOCK_STATUSES = (PumpStatus.IDLE, PumpStatus.CALLING)
+    # Tries for a data block before giving up (section 3.4.3 recommends 5)
+    DATA_BLOCK_ATTEMPTS = 5
+    # Tries to capture the transaction of a pump that has reached COMPLETE
+    TRANSACTION_CAPTURE_ATTEMPTS = 3
+    # Statuses that end a pending preset transaction (section 3.4.3)
+    PRESET_END_STATUSES = (PumpStatus.COMPLETE, PumpStatus.STOPPED)
+    # Special functions requesting data are answered in every state but BUSY
+    # (section 4.9.1)
+    SPECIAL_FUNCTION_STATUSES = (
+        PumpStatus.IDLE,
+        PumpStatus.CALLING,
+        PumpStatus.AUTHORIZED,
+        PumpStatus.STOPPED,
+        PumpStatus.COMPLETE,
+    )
+    # Statuses in which the poller reads the extended status
+    EXTENDED_STATUS_STATUSES = (PumpStatus.CALLING, PumpStatus.AUTHORIZED)
+    # Unanswered extended status reads before a pump is taken not to support it
+    EXTENDED_STATUS_ATTEMPTS = 3
+    # Special function -> (response parser, result model)
+    SPECIAL_FUNCTIONS = {
+        GilbarcoTwoWireProtocol.SF_VERSION: (
+            GilbarcoTwoWireProtocol.parse_version,
+            PumpVersion,
+        ),
+        GilbarcoTwoWireProtocol.SF_MISC_PUMP_DATA: (
+            GilbarcoTwoWireProtocol.parse_misc_pump_data,
+            PumpMiscData,
+        ),
+        GilbarcoTwoWireProtocol.SF_CONFIGURATION: (
+            GilbarcoTwoWireProtocol.parse_configuration,
+            PumpConfiguration,
+        ),
+    }
+
     def __init__(self, com_port: str, baudrate: int = None, timeout: float = 0.068):
         self.com_port = com_port
         self.connection = SerialConnection(com_port, baudrate, timeout)
         self.logger = logging.getLogger(f"TwoWireManager-{com_port}")
-        self.pump_last_status: Dict[int, PumpStatus] = {}
-        self.pump_last_update: Dict[int, datetime] = {}
-        self.lock = threading.Lock()
+        self.pumps: Dict[int, int] = {}  # address -> pump_id
+        self.live_status: Dict[int, StatusRecord] = {}
+        self.status_changed_at: Dict[int, float] = {}  # address -> monotonic time
+        self.breakers: Dict[int, AddressBreaker] = {}
+        self.totals: Dict[int, PumpTotals] = {}  # address -> latest snapshot
+        self.previous_totals: Dict[int, PumpTotals] = {}
+        self.real_time_money: Dict[int, RealTimeMoneyRecord] = {}  # latest per address
+        # address -> (grade, level) -> PPU, as last confirmed or read from totals
+        self.prices: Dict[int, Dict[Tuple[int, int], float]] = {}
+        self.data_verify_pending: Set[int] = set()  # addresses awaiting a block check
+        self.preset_pending: Set[int] = set()  # addresses with an unfinished preset
+        # (address, function, message) -> result, or None if not supported
+        self.special_functions = TTLCache()
+        self.extended_status: Dict[int, ExtendedStatusRecord] = {}
+        self.extended_status_at: Dict[int, float] = {}  # address -> monotonic time
+        self.extended_status_unsupported: Set[int] = set()
+        self.extended_status_silent: Dict[int, int] = {}  # address -> reads unanswered
+        # address -> failed attempts, for sales completed but not yet captured
+        self.transaction_capture_pending: Dict[int, int] = {}
+        self.transaction_captured: Set[int] = set()  # current sale already stored
+        self.transaction_catch_up: Set[int] = set()  # sale may have ended unseen
+        self.state_machines: Dict[int, PumpStateMachine] = {}
+        # Called with (pump_id, status record) on every status change
+        self.status_listeners: List[Callable[[int, StatusRecord], None]] = []
+        # Replaced by the pump manager's shared (durable) store
+        self.transaction_store = TransactionStore()
+        self.real_time_budget = LineBudget(
+            Config.REAL_TIME_MONEY_LINE_SHARE, Config.REAL_TIME_MONEY_BURST
+        )
+        self.extended_status_budget = LineBudget(
+            Config.EXTENDED_STATUS_LINE_SHARE, Config.EXTENDED_STATUS_BURST
+        )
+        self.worker = LineWorker(com_port)
+        self.poller = PumpPoller(self)
 
     def connect(self) -> bool:
         """Connect to the COM port"""
-        return self.connection.connect()
+        return self.worker.call(self.connection.connect)
 
     def disconnect(self):
-        """Disconnect from the COM port"""
-        self.connection.disconnect()
+        """Stop polling, disconnect from the COM port and stop its line worker"""
+        self.poller.stop()
+        self.worker.call(self.connection.disconnect)
+        self.worker.stop()
+
+    def add_pump(self, pump_address: int, pump_id: int):
+        """Register a pump address on this line for continuous polling"""
+        self.pumps[pump_address] = pump_id
+        self.breakers.setdefault(pump_address, AddressBreaker())
+        self.state_machines.setdefault(pump_address, PumpStateMachine())
+
+    def remove_pump(self, pump_address: int):
+        """Stop polling a pump address and drop its live status"""
+        self.pumps.pop(pump_address, None)
+        self.live_status.pop(pump_address, None)
+        self.status_changed_at.pop(pump_address, None)
+        self.totals.pop(pump_address, None)
+        self.previous_totals.pop(pump_address, None)
+        self.real_time_money.pop(pump_address, None)
+        self.prices.pop(pump_address, None)
+        self.preset_pending.discard(pump_address)
+        self.special_functions.invalidate(pump_address)
+        self.extended_status.pop(pump_address, None)
+        self.extended_status_at.pop(pump_address, None)
+        self.extended_status_unsupported.discard(pump_address)
+        self.extended_status_silent.pop(pump_address, None)
+        self.transaction_capture_pending.pop(pump_address, None)
+        self.transaction_captured.discard(pump_address)
+        self.transaction_catch_up.discard(pump_address)
+        self.state_machines.pop(pump_address, None)
+        self.breakers.pop(pump_address, None)
+
+    def start_polling(self):
+        """Start the background poller that keeps the live status table fresh"""
+        self.poller.start()
+
+    def stop_polling(self):
+        """Stop the background poller"""
+        self.poller.stop()
+
+    @property
+    def is_polling(self) -> bool:
+        """Whether the live status table is being kept fresh by the poller"""
+        return self.poller.is_running
+
+    def get_live_status(self, pump_address: int) -> Optional[StatusRecord]:
+        """Get the latest polled status for an address without touching the line"""
+        return self.live_status.get(pump_address)
+
+    def submit_pump_status(
+        self, pump_address: int, pump_id: int, lane: Lane = Lane.POLL
+    ) -> Future:
+        """
+        Queue a status poll on the line and return a Future for the response
+
+        Verification polls after a command are queued in the command's own lane
+        so they are not stuck behind routine polling.
+        """
+        if lane == Lane.POLL:
+            return self.worker.submit(
+                self._poll_pump_status, pump_address, pump_id, lane=lane
+            )
+        return self.worker.submit(
+            self.get_pump_status, pump_address, pump_id, lane=lane
+        )
+
+    def _poll_pump_status(self, pump_address: int, pump_id: int) -> StatusRecord:
+        """
+        Routine status poll
+
+        A pump that has just been sent a data block reports a bad block only on
+        its next status request, which belongs to the sender's check, so such
+        a pump is answered from the live table instead.
+        """
+        if pump_address in self.data_verify_pending:
+            live_status = self.live_status.get(pump_address)
+            if live_status:
+                return live_status
+        return self.get_pump_status(pump_address, pump_id)
+
+    def submit_background(self, fn, *args, **kwargs) -> Future:
+        """
+        Queue a long, non-urgent read (totals, special functions) on the line
+
+        Background jobs only run when no stop, control or poll job is waiting,
+        and within the line-time budget set by BACKGROUND_LINE_SHARE, so bulk
+        collection never degrades status freshness.
+        """
+        return self.worker.submit(fn, *args, lane=Lane.BACKGROUND, **kwargs)
+
+    def get_pump_status(self, pump_address: int, pump_id: int) -> StatusRecord:
+        """
+        Poll a specific pump by address and update the live status table
+
+        Registered addresses go through their circuit breaker: while it is open
+        the last OFFLINE status is returned without using the line, until the
+        next re-probe is due. Called from any other thread, the poll is queued
+        on the line worker, so the live table is only updated and status
+        listeners only run there.
+        """
+        if not self.worker.in_worker_thread():
+            return self.worker.call(
+                self.get_pump_status, pump_address, pump_id, lane=Lane.POLL
+            )
 
-    def get_pump_status(self, pump_address: int, pump_id: int) -> PumpStatusResponse:
-        """Get status for a specific pump by address"""
-        try:
-            self.logger.info(
-                f"Requesting status for pump {pump_id} (address {pump_address})"
+        breaker = self.breakers.get(pump_address)
+        if breaker and not breaker.allow_request():
+            cached = self.live_status.get(pump_address)
+            if cached:
+                return cached
+
+        status_response = self._read_pump_status(pump_address, pump_id)
+
+        if breaker:
+            self._update_breaker(breaker, pump_id, status_response)
+
+        previous = self.live_status.get(pump_address)
+        if previous is None or previous.status != status_response.status:
+            # The customer's selections belong to the previous state
+            self.extended_status.pop(pump_address, None)
+        elif pump_address in self.extended_status:
+            status_response.extended = self.extended_status[pump_address]
+        self.live_status[pump_address] = status_response
+
+        if previous is None or previous.status != status_response.status:
+            self.status_changed_at[pump_address] = time.monotonic()
+            if status_response.status in self.SALE_RESET_STATUSES:
+                # A new sale starts from here; drop the last running amount
+                self.real_time_money.pop(pump_address, None)
+            if status_response.status in self.PRESET_END_STATUSES:
+                self.preset_pending.discard(pump_address)
+            if status_response.status == PumpStatus.COMPLETE:
+                if pump_address not in self.transaction_captured:
+                    # Picked up by the poller straight after this poll
+                    self.transaction_capture_pending.setdefault(pump_address, 0)
+            elif status_response.status not in (PumpStatus.OFFLINE, PumpStatus.ERROR):
+                # A missed poll does not end the sale; anything else does
+                self.transaction_captured.discard(pump_address)
+                if (
+                    self.transaction_capture_pending.pop(pump_address, None) is not None
+                    and pump_address not in self.transaction_catch_up
+                ):
+                    self.logger.warning(
+                        f"Pump {pump_id} left COMPLETE before its transaction was captured"
+                    )
+                self.transaction_catch_up.discard(pump_address)
+            self._check_transition(pump_address, pump_id, status_response.status)
+            if status_response.status == PumpStatus.OFFLINE:
+                # The pump may come back power-cycled or replaced
+                self.special_functions.invalidate(pump_address)
+                self.extended_status_unsupported.discard(pump_address)
+                self.extended_status_silent.pop(pump_address, None)
+            log = (
+                self.logger.warning
+                if status_response.status in (PumpStatus.OFFLINE, PumpStatus.ERROR)
+                else self.logger.info
+            )
+            log(
+                f"Pump {pump_id} status: {status_response.status.value}"
+                + (
+                    f" ({status_response.error_message})"
+                    if status_response.error_message
+                    else ""
+                )
             )
+            self._notify_status_change(pump_id, status_response)
+
+        return status_response
+
+    def add_status_listener(self, listener: Callable[[int, StatusRecord], None]):
+        """
+        Call `listener(pump_id, status)` whenever a pump's status changes
+
+        Listeners run on the line worker thread straight after the poll that
+        saw the change, so they must return quickly (e.g. hand the event to
+        an event loop with call_soon_threadsafe).
+        """
+        if listener not in self.status_listeners:
+            self.status_listeners.append(listener)
+
+    def remove_status_listener(self, listener: Callable[[int, StatusRecord], None]):
+        """Stop calling a status change listener"""
+        if listener in self.status_listeners:
+            self.status_listeners.remove(listener)
+
+    def _notify_status_change(self, pump_id: int, status_response: StatusRecord):
+        for listener in list(self.status_listeners):
+            try:
+                listener(pump_id, status_response)
+            except Exception as e:
+                self.logger.error(f"Error in status listener: {str(e)}")
+
+    def _check_transition(self, pump_address: int, pump_id: int, status: PumpStatus):
+        """
+        Check a status change against the protocol's transition table
+
+        A SKIPPED or INVALID transition means a state was polled past. When
+        it leaves a sale without COMPLETE having been seen, the transaction is
+        read straight away as a catch-up, so the sale is not lost.
+        """
+        machine = self.state_machines.get(pump_address)
+        if machine is None:
+            return
 
-            # Build and send status command
-            command = GilbarcoTwoWireProtocol.build_status_command(pump_address)
+        transition = machine.observe(status)
+        if transition is None or transition.kind == TransitionKind.EXPECTED:
+            return
+
+        self.logger.warning(
+            f"Pump {pump_id} went {transition.previous.value} -> "
+            f"{transition.status.value} ({transition.kind.value}), "
+            f"status polling missed a state"
+        )
+        if transition.may_hide_sale:
+            self.transaction_capture_pending.setdefault(pump_address, 0)
+            self.transaction_catch_up.add(pump_address)
+
+    def _update_breaker(
+        self,
+        breaker: AddressBreaker,
+        pump_id: int,
+        status_response: StatusRecord,
+    ):
+        """Feed a poll result into an address breaker"""
+        if status_response.status != PumpStatus.OFFLINE:
+            if breaker.record_success():
+                self.logger.info(f"Pump {pump_id} answering again, breaker closed")
+            return
+
+        if breaker.record_miss():
+            self.logger.warning(
+                f"Pump {pump_id} missed {breaker.misses} polls, breaker open; "
+                f"re-probing in {breaker.backoff:.1f}s"
+            )
+        elif breaker.is_open:
             self.logger.debug(
-                f"Built status command for pump {pump_address}: {command.hex().upper()}"
+                f"Pump {pump_id} re-probe missed, next in {breaker.backoff:.1f}s"
             )
 
-            with self.lock:
-                response = self.connection.send_command(command)
+    def _read_pump_status(self, pump_address: int, pump_id: int) -> StatusRecord:
+        """Send a status poll to a specific pump and decode the response"""
+        try:
+            command = GilbarcoTwoWireProtocol.build_status_command(pump_address)
+            response = self.worker.call(
+                self.connection.send_command, command, lane=Lane.POLL
+            )
 
             if response and len(response) >= 1:
                 try:
-                    response_pump_id, status_code = (
-                        GilbarcoTwoWireProtocol.parse_status_response(response)
-                    )
-                    self.logger.debug(
-                        f"Parsed status response: pump_id={response_pump_id}, status_code=0x{status_code:X}"
-                    )
+                    if len(response) != 1:
+                        raise ValueError("Invalid status response length")
 
-                    if response_pump_id != pump_address:
-                        self.logger.warning(
-                            f"Pump ID mismatch: expected {pump_address}, got {response_pump_id}"
+                    decoded = GilbarcoTwoWireProtocol.STATUS_WORDS[response[0]]
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(
+                            f"Pump {pump_id} status: {decoded.status.value} "
+                            f"(wire {decoded.wire_format})"
                         )
 
-                    status = GilbarcoTwoWireProtocol.status_code_to_enum(status_code)
-                    self.logger.info(
-                        f"Pump {pump_id} status: {status.value} (code 0x{status_code:X})"
-                    )
-
-                    # Update cache
-                    self.pump_last_status[pump_address] = status
-                    self.pump_last_update[pump_address] = datetime.now()
-
-                    # Calculate wire format
-                    pump_nibble = GilbarcoTwoWireProtocol.pump_id_to_nibble(
-                        response_pump_id
-                    )
-                    wire_byte = (status_code << 4) | pump_nibble
+                    if decoded.pump_id != pump_address:
+                        self.logger.warning(
+                            f"Pump ID mismatch: expected {pump_address}, got {decoded.pump_id}"
+                        )
 
-                    return PumpStatusResponse(
-                        pump_id=pump_id,
-                        status=status,
-                        last_updated=self.pump_last_update[pump_address],
-                        error_message=(
+                    return StatusRecord(
+                        pump_id,
+                        decoded.status,
+                        decoded.raw_status_code,
+                        decoded.wire_format,
+                        (
                             None
-                            if status != PumpStatus.ERROR
-                            else f"Data error (code 0x{status_code:X})"
+                            if decoded.status != PumpStatus.ERROR
+                            else f"Data error (code {decoded.raw_status_code})"
                         ),
-                        raw_status_code=f"0x{status_code:X}",
-                        wire_format=f"0x{wire_byte:02X}",
                     )
 
                 except ValueError as e:
                     self.logger.error(
                         f"Invalid status response for pump {pump_id}: {str(e)}"
                     )
-                    return PumpStatusResponse(
-                        pump_id=pump_id,
-                        status=PumpStatus.ERROR,
-                        last_updated=datetime.now(),
+                    return StatusRecord(
+                        pump_id,
+                        PumpStatus.ERROR,
                         error_message=f"Invalid response: {str(e)}",
-                        raw_status_code=None,
-                        wire_format=None,
                     )
 
             # No response
-            self.logger.warning(f"No valid response from pump {pump_id}")
-            return PumpStatusResponse(
-                pump_id=pump_id,
-                status=PumpStatus.OFFLINE,
-                last_updated=datetime.now(),
-                error_message="No response from pump",
-                raw_status_code=None,
-                wire_format=None,
+            self.logger.debug(f"No valid response from pump {pump_id}")
+            return StatusRecord(
+                pump_id, PumpStatus.OFFLINE, error_message="No response from pump"
             )
 
         except Exception as e:
             self.logger.error(
                 f"Error getting status for pump {pump_id}: {str(e)}", exc_info=True
             )
-            return PumpStatusResponse(
-                pump_id=pump_id,
-                status=PumpStatus.ERROR,
-                last_updated=datetime.now(),
-                error_message=f"Exception: {str(e)}",
-                raw_status_code=None,
-                wire_format=None,
+            return StatusRecord(
+                pump_id, PumpStatus.ERROR, error_message=f"Exception: {str(e)}"
             )
 
     def authorize_pump(self, pump_address: int, pump_id: int) -> bool:
@@ -705,29 +1816,18 @@ class TwoWireManager:
             command = GilbarcoTwoWireProtocol.build_authorize_command(pump_address)
             self.logger.debug(f"Built authorize command: {command.hex().upper()}")
 
-            with self.lock:
-                self.connection.send_command(command, expect_response=False)
+            self.worker.call(
+                self.connection.send_command, command, expect_response=False
+            )
 
             self.logger.info(f"Authorize command sent to pump {pump_id}")
 
             # Verify authorization
-            time.sleep(0.1)
-            status_response = self.get_pump_status(pump_address, pump_id)
-            authorized = status_response.status in [
-                PumpStatus.AUTHORIZED,
-                PumpStatus.DISPENSING,
-            ]
-
-            if authorized:
-                self.logger.info(
-                    f"Pump {pump_id} successfully authorized (status: {status_response.status.value})"
-                )
-            else:
-                self.logger.warning(
-                    f"Pump {pump_id} authorization may have failed (status: {status_response.status.value})"
-                )
-
-            return authorized
+            time.sleep(self.COMMAND_VERIFY_DELAY)
+            status_response = self.submit_pump_status(
+                pump_address, pump_id, lane=Lane.CONTROL
+            ).result()
+            return self._check_authorized(pump_id, status_response)
 
         except Exception as e:
             self.logger.error(
@@ -743,86 +1843,866 @@ class TwoWireManager:
             command = GilbarcoTwoWireProtocol.build_stop_command(pump_address)
             self.logger.debug(f"Built stop command: {command.hex().upper()}")
 
-            with self.lock:
-                self.connection.send_command(command, expect_response=False)
+            self.worker.call(
+                self.connection.send_command,
+                command,
+                expect_response=False,
+                lane=Lane.EMERGENCY,
+            )
 
             self.logger.info(f"Stop command sent to pump {pump_id}")
 
             # Verify stop
-            time.sleep(0.1)
-            status_response = self.get_pump_status(pump_address, pump_id)
-            stopped = status_response.status in [PumpStatus.STOPPED, PumpStatus.IDLE]
-
-            if stopped:
-                self.logger.info(
-                    f"Pump {pump_id} successfully stopped (status: {status_response.status.value})"
-                )
-            else:
-                self.logger.warning(
-                    f"Pump {pump_id} stop may have failed (status: {status_response.status.value})"
-                )
-
-            return stopped
+            time.sleep(self.COMMAND_VERIFY_DELAY)
+            status_response = self.submit_pump_status(
+                pump_address, pump_id, lane=Lane.EMERGENCY
+            ).result()
+            return self._check_stopped(pump_id, status_response)
 
         except Exception as e:
             self.logger.error(f"Error stopping pump {pump_id}: {str(e)}", exc_info=True)
             return False
 
+    def preset_and_authorize(
+        self, pump_address: int, pump_id: int, block: bytes
+    ) -> PresetResponse:
+        """
+        Send a preset block, authorize the pump and confirm it, in one line job
+
+        The whole sequence runs as a single CONTROL job, so no other traffic
+        can come between the preset and its authorization (section 4.8.2
+        allows only status, stop and authorize after a preset) and nothing is
+        queued behind other work halfway through.
+        """
+        return self.submit_preset(pump_address, pump_id, block).result()
+
+    def submit_preset(self, pump_address: int, pump_id: int, block: bytes) -> Future:
+        """Queue a preset and authorize; see preset_and_authorize"""
+        live_status = self.live_status.get(pump_address)
+        if pump_address in self.preset_pending:
+            rejected = "Preset transaction pending"
+        elif live_status and live_status.status not in self.DATA_BLOCK_STATUSES:
+            rejected = f"Pump is {live_status.status.value}"
+        else:
+            return self.worker.submit(
+                self._run_preset, pump_address, pump_id, block, lane=Lane.CONTROL
+            )
+
+        future: Future = Future()
+        future.set_result(
+            self._preset_response(pump_id, False, live_status, rejected, 0.0)
+        )
+        return future
+
+    def _run_preset(
+        self, pump_address: int, pump_id: int, block: bytes
+    ) -> PresetResponse:
+        """Preset, authorize and confirm a pump (runs on the line worker)"""
+        started_at = time.monotonic()
+        status_response = None
+        message = "Preset not sent"
+
+        for attempt in range(1, self.DATA_BLOCK_ATTEMPTS + 1):
+            if not self.connection.send_data_to_pump(pump_address, block):
+                message = "Pump did not accept data next"
+            else:
+                time.sleep(GilbarcoTwoWireProtocol.DATA_BLOCK_SETTLE_MS / 1000.0)
+                status_response = self.get_pump_status(pump_address, pump_id)
+                if status_response.status in self.DATA_BLOCK_STATUSES:
+                    break
+                message = f"Pump reported {status_response.status.value}"
+            self.logger.warning(
+                f"Preset attempt {attempt} for pump {pump_id} failed: {message}"
+            )
+        else:
+            return self._preset_response(
+                pump_id,
+                False,
+                status_response,
+                message,
+                time.monotonic() - started_at,
+            )
+
+        self.preset_pending.add(pump_address)
+        command = GilbarcoTwoWireProtocol.build_authorize_command(pump_address)
+        self.connection.send_command(command, expect_response=False)
+
+        # Poll straight away until the pump reports the authorization
+        deadline = time.monotonic() + self.COMMAND_VERIFY_DELAY
+        while True:
+            status_response = self.get_pump_status(pump_address, pump_id)
+            authorized = status_response.status in (
+                PumpStatus.AUTHORIZED,
+                PumpStatus.DISPENSING,
+            )
+            if authorized or time.monotonic() >= deadline:
+                break
+
+        duration = time.monotonic() - started_at
+        if authorized:
+            self.logger.info(
+                f"Pump {pump_id} preset and authorized in {duration * 1000:.0f} ms"
+            )
+            return self._preset_response(
+                pump_id,
+                True,
+                status_response,
+                "Preset accepted, pump authorized",
+                duration,
+            )
+
+        self.logger.warning(
+            f"Pump {pump_id} accepted the preset but authorization could not be "
+            f"confirmed (status: {status_response.status.value})"
+        )
+        return self._preset_response(
+            pump_id,
+            False,
+            status_response,
+            "Preset accepted but authorization not confirmed",
+            duration,
+        )
+
+    @staticmethod
+    def _preset_response(
+        pump_id: int,
+        success: bool,
+        status_response: Optional[StatusRecord],
+        message: str,
+        duration: float,
+    ) -> PresetResponse:
+        return PresetResponse(
+            pump_id=pump_id,
+            success=success,
+            status=status_response.status if status_response else None,
+            message=message,
+            duration=duration,
+            timestamp=datetime.now(),
+        )
+
+    def _check_authorized(self, pump_id: int, status_response: StatusRecord) -> bool:
+        """Check the status read back after an authorize command"""
+        authorized = status_response.status in [
+            PumpStatus.AUTHORIZED,
+            PumpStatus.DISPENSING,
+        ]
+
+        if authorized:
+            self.logger.info(
+                f"Pump {pump_id} successfully authorized (status: {status_response.status.value})"
+            )
+        else:
+            self.logger.warning(
+                f"Pump {pump_id} authorization may have failed (status: {status_response.status.value})"
+            )
+
+        return authorized
+
+    def _check_stopped(self, pump_id: int, status_response: StatusRecord) -> bool:
+        """Check the status read back after a stop command"""
+        stopped = status_response.status in [PumpStatus.STOPPED, PumpStatus.IDLE]
+
+        if stopped:
+            self.logger.info(
+                f"Pump {pump_id} successfully stopped (status: {status_response.status.value})"
+            )
+        else:
+            self.logger.warning(
+                f"Pump {pump_id} stop may have failed (status: {status_response.status.value})"
+            )
+
+        return stopped
+
     def get_transaction_data(
         self, pump_address: int, pump_id: int
     ) -> Optional[TransactionData]:
-        """Get transaction data from a specific pump"""
+        """
+        Get transaction data from a specific pump
+
+        A corrupt or truncated block is detected while it is being received and
+        the request is retried straight away, up to DATA_REQUEST_ATTEMPTS times.
+        """
         try:
             self.logger.info(f"Requesting transaction data for pump {pump_id}")
 
             command = GilbarcoTwoWireProtocol.build_transaction_request(pump_address)
-            self.logger.debug(
-                f"Built transaction request for pump {pump_address}: {command.hex().upper()}"
+            decoder = GilbarcoTwoWireProtocol.transaction_decoder()
+
+            if not self._request_data_block(
+                command, decoder, pump_id, "Transaction data"
+            ):
+                return None
+
+            transaction_data = GilbarcoTwoWireProtocol.parse_transaction_fields(
+                decoder.fields
+            )
+            self.logger.info(
+                f"Transaction data for pump {pump_id}: "
+                f"volume={transaction_data.get('volume')} "
+                f"ppu={transaction_data.get('ppu')} "
+                f"money={transaction_data.get('money')} "
+                f"grade={transaction_data.get('grade')}"
             )
 
-            with self.lock:
-                response = self.connection.send_command_with_data_response(command)
+            return TransactionData(
+                pump_id=pump_id,
+                volume=transaction_data.get("volume"),
+                price_per_unit=transaction_data.get("ppu"),
+                total_amount=transaction_data.get("money"),
+                grade=transaction_data.get("grade"),
+                timestamp=datetime.now(),
+            )
+
+        except Exception as e:
+            self.logger.error(
+                f"Error getting transaction data for pump {pump_id}: {str(e)}",
+                exc_info=True,
+            )
+            return None
+
+    def poll_transaction(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[TransactionData]:
+        """
+        Capture the sale of a pump that has just reached COMPLETE
+
+        Called by the poller after each status poll. The transaction is read
+        once per sale in the CONTROL lane, ahead of routine polling, and kept
+        in the transaction store, so it survives the pump being re-authorized
+        and clients never have to read it over the line. A failed read is
+        retried on the next polls while the pump stays COMPLETE, up to
+        TRANSACTION_CAPTURE_ATTEMPTS times.
+
+        Catch-up reads after a sale ended unseen are made in whatever state
+        the pump is in; they are only stored if they hold fuel and differ from
+        the last sale captured.
+        """
+        if pump_address not in self.transaction_capture_pending:
+            return None
+        catch_up = pump_address in self.transaction_catch_up
+        live_status = self.live_status.get(pump_address)
+        if not catch_up and (
+            not live_status or live_status.status != PumpStatus.COMPLETE
+        ):
+            return None
+
+        transaction = self.get_transaction_data(pump_address, pump_id)
+        if transaction is None:
+            attempts = self.transaction_capture_pending.get(pump_address, 0) + 1
+            if attempts < self.TRANSACTION_CAPTURE_ATTEMPTS:
+                self.transaction_capture_pending[pump_address] = attempts
+            else:
+                self.transaction_capture_pending.pop(pump_address, None)
+                self.transaction_catch_up.discard(pump_address)
+                self.logger.error(
+                    f"Giving up capturing the transaction of pump {pump_id} "
+                    f"after {attempts} attempts"
+                )
+            return None
+
+        self.transaction_capture_pending.pop(pump_address, None)
+        if catch_up:
+            self.transaction_catch_up.discard(pump_address)
+            if not self._is_new_sale(pump_address, transaction):
+                self.logger.info(f"Catch-up read of pump {pump_id} found no new sale")
+                return None
+        else:
+            self.transaction_captured.add(pump_address)
+        stored = self.transaction_store.add(transaction, self.com_port, pump_address)
+        self.logger.info(f"Captured transaction {stored.sequence} of pump {pump_id}")
+        return stored
+
+    def _is_new_sale(self, pump_address: int, transaction: TransactionData) -> bool:
+        """Whether a transaction holds fuel and is not the last one captured"""
+        if not transaction.volume and not transaction.total_amount:
+            return False
 
+        latest = self.transaction_store.latest(
+            self.com_port, pump_address, transaction.pump_id
+        )
+        return latest is None or (
+            latest.volume,
+            latest.total_amount,
+            latest.price_per_unit,
+            latest.grade,
+        ) != (
+            transaction.volume,
+            transaction.total_amount,
+            transaction.price_per_unit,
+            transaction.grade,
+        )
+
+    def _request_data_block(
+        self,
+        command: bytes,
+        decoder: DataBlockDecoder,
+        pump_id: int,
+        description: str,
+        lane: Lane = Lane.CONTROL,
+    ) -> bool:
+        """
+        Send a data request and decode the response block into `decoder`
+
+        A corrupt or truncated block is detected while it is being received and
+        the request is retried straight away, up to DATA_REQUEST_ATTEMPTS times.
+        """
+        for attempt in range(1, self.DATA_REQUEST_ATTEMPTS + 1):
+            response = self.worker.call(
+                self.connection.send_command_with_data_response,
+                command,
+                decoder,
+                lane=lane,
+            )
             if response:
-                self.logger.info(f"Received transaction data block from pump {pump_id}")
+                return True
+            self.logger.warning(
+                f"{description} attempt {attempt} for pump {pump_id} failed: {decoder.error}"
+            )
+        return False
+
+    def get_pump_totals(self, pump_address: int, pump_id: int) -> Optional[PumpTotals]:
+        """
+        Read a pump's electronic totals per grade and keep them as its snapshot
 
-                transaction_data = GilbarcoTwoWireProtocol.parse_transaction_data(
-                    response
+        Totals are only answered in OFF, CALL, EOT and STOP, so the request is
+        not sent while the pump is known to be authorized or dispensing. The
+        previous snapshot is kept for get_totals_delta.
+        """
+        try:
+            live_status = self.live_status.get(pump_address)
+            if live_status and live_status.status in (
+                PumpStatus.AUTHORIZED,
+                PumpStatus.DISPENSING,
+            ):
+                self.logger.info(
+                    f"Not reading totals of pump {pump_id} while {live_status.status.value}"
                 )
+                return None
 
-                if transaction_data:
-                    self.logger.info(
-                        f"Successfully parsed transaction data for pump {pump_id}:"
+            command = GilbarcoTwoWireProtocol.build_totals_request(pump_address)
+            decoder = GilbarcoTwoWireProtocol.totals_decoder()
+
+            if not self._request_data_block(
+                command, decoder, pump_id, "Pump totals", lane=Lane.BACKGROUND
+            ):
+                return None
+
+            totals = PumpTotals(
+                pump_id=pump_id,
+                grades=[
+                    GradeTotals(**grade)
+                    for grade in GilbarcoTwoWireProtocol.parse_totals_fields(
+                        decoder.fields
                     )
-                    self.logger.info(f"  - Volume: {transaction_data.get('volume')}")
-                    self.logger.info(f"  - PPU: {transaction_data.get('ppu')}")
-                    self.logger.info(f"  - Money: {transaction_data.get('money')}")
-                    self.logger.info(f"  - Grade: {transaction_data.get('grade')}")
+                ],
+                timestamp=datetime.now(),
+            )
 
-                    return TransactionData(
+            previous = self.totals.get(pump_address)
+            if previous:
+                self.previous_totals[pump_address] = previous
+            self.totals[pump_address] = totals
+
+            prices = self.prices.setdefault(pump_address, {})
+            for grade in totals.grades:
+                if grade.ppu_level_1 is not None:
+                    prices[(grade.grade, 1)] = grade.ppu_level_1
+                if grade.ppu_level_2 is not None:
+                    prices[(grade.grade, 2)] = grade.ppu_level_2
+
+            self.logger.info(
+                f"Read totals for pump {pump_id}: {len(totals.grades)} grade(s)"
+            )
+            return totals
+
+        except Exception as e:
+            self.logger.error(
+                f"Error getting totals for pump {pump_id}: {str(e)}", exc_info=True
+            )
+            return None
+
+    def submit_pump_totals(self, pump_address: int, pump_id: int) -> Future:
+        """Queue a totals read in the background lane"""
+        return self.submit_background(self.get_pump_totals, pump_address, pump_id)
+
+    def get_totals_snapshot(self, pump_address: int) -> Optional[PumpTotals]:
+        """Get the last totals read from a pump without touching the line"""
+        return self.totals.get(pump_address)
+
+    def get_totals_delta(self, pump_address: int) -> Optional[PumpTotalsDelta]:
+        """Difference between a pump's last two totals snapshots"""
+        previous = self.previous_totals.get(pump_address)
+        latest = self.totals.get(pump_address)
+        if not previous or not latest:
+            return None
+        return self.compute_totals_delta(previous, latest)
+
+    @classmethod
+    def compute_totals_delta(
+        cls, older: PumpTotals, newer: PumpTotals
+    ) -> PumpTotalsDelta:
+        """Volume and money dispensed per grade between two totals snapshots"""
+        older_grades = {grade.grade: grade for grade in older.grades}
+        deltas = []
+
+        for grade in newer.grades:
+            before = older_grades.get(grade.grade)
+            volume = grade.volume - (before.volume if before else 0.0)
+            money = grade.money - (before.money if before else 0.0)
+            if volume < 0:
+                volume += cls.TOTALS_ROLLOVER
+            if money < 0:
+                money += cls.TOTALS_ROLLOVER
+            deltas.append(
+                GradeTotalsDelta(
+                    grade=grade.grade, volume=round(volume, 2), money=round(money, 2)
+                )
+            )
+
+        return PumpTotalsDelta(
+            pump_id=newer.pump_id,
+            grades=deltas,
+            from_timestamp=older.timestamp,
+            to_timestamp=newer.timestamp,
+        )
+
+    def diff_prices(
+        self, pump_address: int, price_book: Dict[Tuple[int, int], float]
+    ) -> List[Tuple[int, int]]:
+        """(grade, level) keys of `price_book` the pump is not known to have"""
+        known = self.prices.get(pump_address, {})
+        return [
+            key
+            for key, price in price_book.items()
+            if key not in known or abs(known[key] - price) > 0.0005
+        ]
+
+    def change_prices(
+        self,
+        changes: Dict[int, List[Tuple[int, int]]],
+        price_book: Dict[Tuple[int, int], float],
+        blocks: Dict[Tuple[int, int], bytes],
+    ) -> List[PumpPriceChange]:
+        """
+        Send price change blocks to pumps on this line and verify them
+
+        `changes` maps each address to the (grade, level) keys it needs, and
+        `blocks` holds the encoded data block for each key; blocks carry no
+        pump address, so one encoding serves every pump.
+
+        A pump reports a bad block on its next status request, so each pump
+        takes one block per round: the round's blocks for all pumps are queued
+        back to back in the CONTROL lane, and once the 68 ms settle time has
+        passed every pump's status is read back. A block that is refused or
+        answered with a data error is sent again in the next round, up to
+        DATA_BLOCK_ATTEMPTS times. Pumps with a preset pending are skipped.
+        """
+        results: List[PumpPriceChange] = []
+        pending: Dict[int, List[Tuple[int, int]]] = {}
+        confirmed: Dict[int, List[Tuple[int, int]]] = {}
+        failed: Dict[int, List[Tuple[int, int]]] = {}
+        attempts: Dict[int, int] = {}
+        message: Dict[int, str] = {}
+
+        for pump_address, keys in changes.items():
+            pump_id = self.pumps.get(pump_address)
+            if pump_id is None or not keys:
+                continue
+            live_status = self.live_status.get(pump_address)
+            if pump_address in self.preset_pending:
+                skipped = "Preset transaction pending"
+            elif live_status and live_status.status not in self.DATA_BLOCK_STATUSES:
+                skipped = f"Pump is {live_status.status.value}"
+            else:
+                skipped = None
+            if skipped:
+                results.append(
+                    PumpPriceChange(
                         pump_id=pump_id,
-                        volume=transaction_data.get("volume"),
-                        price_per_unit=transaction_data.get("ppu"),
-                        total_amount=transaction_data.get("money"),
-                        grade=transaction_data.get("grade"),
-                        timestamp=datetime.now(),
+                        status=PriceChangeStatus.SKIPPED,
+                        failed=self._grade_prices(keys, price_book),
+                        message=skipped,
                     )
+                )
+                continue
+            pending[pump_address] = list(keys)
+            confirmed[pump_address] = []
+            attempts[pump_address] = 0
+
+        while pending:
+            self.data_verify_pending.update(pending)
+            sent = {
+                pump_address: self.worker.submit(
+                    self.connection.send_data_to_pump,
+                    pump_address,
+                    blocks[keys[0]],
+                    lane=Lane.CONTROL,
+                )
+                for pump_address, keys in pending.items()
+            }
+            accepted = [
+                pump_address for pump_address, future in sent.items() if future.result()
+            ]
+            if accepted:
+                time.sleep(GilbarcoTwoWireProtocol.DATA_BLOCK_SETTLE_MS / 1000.0)
+
+            verify = {
+                pump_address: self.submit_pump_status(
+                    pump_address, self.pumps[pump_address], lane=Lane.CONTROL
+                )
+                for pump_address in accepted
+            }
+            for pump_address in list(pending):
+                key = pending[pump_address][0]
+                if pump_address in verify:
+                    status = verify[pump_address].result().status
+                    self.data_verify_pending.discard(pump_address)
+                    if status not in (PumpStatus.ERROR, PumpStatus.OFFLINE):
+                        self.prices.setdefault(pump_address, {})[key] = price_book[key]
+                        confirmed[pump_address].append(key)
+                        attempts[pump_address] = 0
+                        pending[pump_address].pop(0)
+                        if not pending[pump_address]:
+                            del pending[pump_address]
+                        continue
+                    message[pump_address] = f"Pump reported {status.value}"
                 else:
-                    self.logger.warning(
-                        f"Failed to parse transaction data for pump {pump_id}"
-                    )
+                    self.data_verify_pending.discard(pump_address)
+                    message[pump_address] = "Pump did not accept data next"
+
+                attempts[pump_address] += 1
+                self.logger.warning(
+                    f"Price change attempt {attempts[pump_address]} for pump "
+                    f"{self.pumps[pump_address]} failed: {message[pump_address]}"
+                )
+                if attempts[pump_address] >= self.DATA_BLOCK_ATTEMPTS:
+                    failed[pump_address] = pending.pop(pump_address)
+
+        for pump_address, keys in confirmed.items():
+            pump_id = self.pumps[pump_address]
+            not_changed = failed.get(pump_address, [])
+            results.append(
+                PumpPriceChange(
+                    pump_id=pump_id,
+                    status=(
+                        PriceChangeStatus.FAILED
+                        if not_changed
+                        else PriceChangeStatus.UPDATED
+                    ),
+                    changed=self._grade_prices(keys, price_book),
+                    failed=self._grade_prices(not_changed, price_book),
+                    message=message.get(pump_address) if not_changed else None,
+                )
+            )
+            if not_changed:
+                self.logger.error(
+                    f"Price change failed on pump {pump_id}: {message.get(pump_address)}"
+                )
+            else:
+                self.logger.info(f"Changed {len(keys)} price(s) on pump {pump_id}")
+
+        return results
+
+    @staticmethod
+    def _grade_prices(
+        keys: List[Tuple[int, int]], price_book: Dict[Tuple[int, int], float]
+    ) -> List[GradePrice]:
+        return [
+            GradePrice(grade=grade, level=level, price=price_book[(grade, level)])
+            for grade, level in keys
+        ]
+
+    def get_special_function(
+        self,
+        pump_address: int,
+        pump_id: int,
+        code: int,
+        message: bytes = b"",
+        refresh: bool = False,
+    ):
+        """
+        Read special function data from a pump, through the per-pump cache
+
+        Returns the result model for `code`, or None if the pump does not
+        support the function or could not be read.
+        """
+        return self.submit_special_function(
+            pump_address, pump_id, code, message, refresh
+        ).result()
+
+    def submit_special_function(
+        self,
+        pump_address: int,
+        pump_id: int,
+        code: int,
+        message: bytes = b"",
+        refresh: bool = False,
+    ) -> Future:
+        """
+        Queue a special function read in the background lane
+
+        Cached results are returned without touching the line until their TTL
+        runs out, the pump goes OFFLINE, or invalidate_special_functions is
+        called. A Null block (function not supported) is cached too, since the
+        protocol says resending is pointless.
+        """
+        if not refresh:
+            hit, value = self.special_functions.get((pump_address, code, message))
+            if hit:
+                future: Future = Future()
+                future.set_result(value)
+                return future
+
+        return self.submit_background(
+            self._read_special_function, pump_address, pump_id, code, message
+        )
+
+    def invalidate_special_functions(self, pump_address: int) -> int:
+        """Drop a pump's cached special function data"""
+        return self.special_functions.invalidate(pump_address)
+
+    @staticmethod
+    def special_function_ttl(code: int) -> float:
+        """How long a special function result stays cached"""
+        if code == GilbarcoTwoWireProtocol.SF_VERSION:
+            return Config.VERSION_CACHE_TTL
+        if code == GilbarcoTwoWireProtocol.SF_MISC_PUMP_DATA:
+            return Config.PUMP_DATA_CACHE_TTL
+        return Config.CONFIGURATION_CACHE_TTL
+
+    def _read_special_function(
+        self, pump_address: int, pump_id: int, code: int, message: bytes
+    ):
+        """Send a special function and parse its response (runs on the line worker)"""
+        try:
+            live_status = self.live_status.get(pump_address)
+            if live_status and live_status.status not in self.SPECIAL_FUNCTION_STATUSES:
+                self.logger.info(
+                    f"Not sending special function {code:03X} to pump {pump_id} "
+                    f"while {live_status.status.value}"
+                )
+                return None
+            if (
+                pump_address in self.preset_pending
+                or pump_address in self.data_verify_pending
+            ):
+                # No data block may be sent while one is being checked (3.4.3)
+                self.logger.info(
+                    f"Not sending special function {code:03X} to pump {pump_id} "
+                    f"while a data block is pending"
+                )
+                return None
+
+            block = GilbarcoTwoWireProtocol.build_special_function_block(code, message)
+            decoder = GilbarcoTwoWireProtocol.special_function_decoder(
+                pump_address, code
+            )
+            for attempt in range(1, self.DATA_REQUEST_ATTEMPTS + 1):
+                if self.connection.send_special_function(pump_address, block, decoder):
+                    break
+                self.logger.warning(
+                    f"Special function {code:03X} attempt {attempt} for pump "
+                    f"{pump_id} failed: {decoder.error}"
+                )
             else:
-                self.logger.warning(f"No transaction data response from pump {pump_id}")
+                return None
+
+            if decoder.is_null:
+                self.logger.info(
+                    f"Pump {pump_id} does not support special function {code:03X}"
+                )
+                result = None
+            else:
+                parser, model = self.SPECIAL_FUNCTIONS[code]
+                result = model(
+                    pump_id=pump_id,
+                    timestamp=datetime.now(),
+                    **parser(decoder.digits),
+                )
+
+            self.special_functions.put(
+                (pump_address, code, message), result, self.special_function_ttl(code)
+            )
+            return result
+
+        except ValueError as e:
+            self.logger.warning(
+                f"Invalid special function {code:03X} response from pump {pump_id}: {str(e)}"
+            )
+            return None
+
+    def poll_extended_status(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[ExtendedStatusRecord]:
+        """
+        Refresh the extended status of a CALLING or AUTHORIZED pump
+
+        Called by the poller after each status poll. The read is made when the
+        pump has just entered one of these states and then at most every
+        EXTENDED_STATUS_INTERVAL, so nozzle, grade and push-to-start changes
+        come with the status instead of needing follow-up requests. Special
+        functions are not answered while BUSY, so DISPENSING pumps are left to
+        the real-time money feed. Pumps answering with a Null block, or not
+        answering EXTENDED_STATUS_ATTEMPTS reads in a row (section 4.9), are
+        not asked again until they have been OFFLINE. No read is made while
+        a preset or price block is pending (section 3.4.3), and reads are
+        skipped once the line has used up its EXTENDED_STATUS_LINE_SHARE.
+        """
+        live_status = self.live_status.get(pump_address)
+        if (
+            not live_status
+            or live_status.status not in self.EXTENDED_STATUS_STATUSES
+            or pump_address in self.extended_status_unsupported
+            or pump_address in self.preset_pending
+            or pump_address in self.data_verify_pending
+        ):
+            return None
+
+        if (
+            pump_address in self.extended_status
+            and time.monotonic() - self.extended_status_at.get(pump_address, 0.0)
+            < Config.EXTENDED_STATUS_INTERVAL
+        ):
+            return None
+
+        if self.extended_status_budget.time_until_available() > 0:
+            self.extended_status_budget.defer()
+            return None
+
+        return self.worker.call(
+            self._read_extended_status, pump_address, pump_id, lane=Lane.POLL
+        )
+
+    def _read_extended_status(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[ExtendedStatusRecord]:
+        """Read and publish a pump's extended status (runs on the line worker)"""
+        if (
+            pump_address in self.preset_pending
+            or pump_address in self.data_verify_pending
+        ):
+            return None
+
+        code = GilbarcoTwoWireProtocol.SF_EXTENDED_STATUS
+        decoder = GilbarcoTwoWireProtocol.special_function_decoder(pump_address, code)
+        started_at = time.monotonic()
+        self.extended_status_at[pump_address] = started_at
+        try:
+            received = self.connection.send_special_function(
+                pump_address,
+                GilbarcoTwoWireProtocol.build_special_function_block(code),
+                decoder,
+            )
+        finally:
+            self.extended_status_budget.charge(time.monotonic() - started_at)
+
+        if not received:
+            if not decoder.block:
+                # No DATA NEXT or no response at all
+                silent = self.extended_status_silent.get(pump_address, 0) + 1
+                self.extended_status_silent[pump_address] = silent
+                if silent >= self.EXTENDED_STATUS_ATTEMPTS:
+                    self.logger.info(
+                        f"Pump {pump_id} does not answer extended status requests"
+                    )
+                    self.extended_status_unsupported.add(pump_address)
+            return None
 
+        self.extended_status_silent.pop(pump_address, None)
+        if decoder.is_null:
+            self.logger.info(f"Pump {pump_id} does not support extended status")
+            self.extended_status_unsupported.add(pump_address)
             return None
 
+        try:
+            extended = ExtendedStatusRecord(
+                **GilbarcoTwoWireProtocol.parse_extended_status(decoder.digits)
+            )
+        except ValueError as e:
+            self.logger.warning(
+                f"Invalid extended status response from pump {pump_id}: {str(e)}"
+            )
+            return None
+
+        self.extended_status[pump_address] = extended
+        live_status = self.live_status.get(pump_address)
+        if live_status and live_status.status in self.EXTENDED_STATUS_STATUSES:
+            live_status.extended = extended
+        return extended
+
+    def get_real_time_money(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[RealTimeMoneyRecord]:
+        """
+        Read the running sale amount of a pump and publish it
+
+        Only the latest reading per pump is kept. Pumps answer command 6 only
+        while BUSY (DISPENSING).
+        """
+        try:
+            command = GilbarcoTwoWireProtocol.build_real_time_money_request(
+                pump_address
+            )
+            response = self.worker.call(
+                self._send_budgeted,
+                self.real_time_budget,
+                command,
+                response_length=GilbarcoTwoWireProtocol.REAL_TIME_MONEY_LENGTH,
+                lane=Lane.POLL,
+            )
+            if not response:
+                self.logger.debug(f"No real-time money response from pump {pump_id}")
+                return None
+
+            money = GilbarcoTwoWireProtocol.parse_real_time_money(response)
+            reading = RealTimeMoneyRecord(pump_id, money)
+            self.real_time_money[pump_address] = reading
+            return reading
+
+        except ValueError as e:
+            self.logger.warning(
+                f"Invalid real-time money response from pump {pump_id}: {str(e)}"
+            )
+            return None
         except Exception as e:
             self.logger.error(
-                f"Error getting transaction data for pump {pump_id}: {str(e)}",
+                f"Error getting real-time money for pump {pump_id}: {str(e)}",
                 exc_info=True,
             )
             return None
 
+    def poll_real_time_money(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[RealTimeMoneyRecord]:
+        """
+        Refresh real-time money for a dispensing pump, within the line's budget
+
+        Called by the poller after each status poll. Requests are skipped while
+        the pump is not dispensing or while the line has used up its
+        REAL_TIME_MONEY_LINE_SHARE, so the feed never crowds out status polling.
+        """
+        live_status = self.live_status.get(pump_address)
+        if not live_status or live_status.status != PumpStatus.DISPENSING:
+            return None
+        if self.real_time_budget.time_until_available() > 0:
+            self.real_time_budget.defer()
+            return None
+        return self.get_real_time_money(pump_address, pump_id)
+
+    def get_latest_real_time_money(
+        self, pump_address: int
+    ) -> Optional[RealTimeMoneyRecord]:
+        """Get the latest real-time money reading without touching the line"""
+        return self.real_time_money.get(pump_address)
+
+    def _send_budgeted(self, budget: LineBudget, command: bytes, **kwargs):
+        """Send a command on the line and charge its line time to `budget`"""
+        started_at = time.monotonic()
+        try:
+            return self.connection.send_command(command, **kwargs)
+        finally:
+            budget.charge(time.monotonic() - started_at)
+
     def stop_all_pumps(self) -> bool:
         """Send all-stop command to all pumps on this line"""
         try:
@@ -833,8 +2713,12 @@ class TwoWireManager:
             command = GilbarcoTwoWireProtocol.build_all_stop_command()
             self.logger.debug(f"Built all-stop command: {command.hex().upper()}")
 
-            with self.lock:
-                self.connection.send_command(command, expect_response=False)
+            self.worker.call(
+                self.connection.send_command,
+                command,
+                expect_response=False,
+                lane=Lane.EMERGENCY,
+            )
 
             self.logger.info("All-stop command sent to all pumps")
             return True
@@ -845,6 +2729,87 @@ class TwoWireManager:
             )
             return False
 
+    # Asyncio interface
+    #
+    # The line worker owns the serial port, so these coroutines never touch the
+    # port themselves: they queue the exchange on the worker and await its
+    # Future. The event loop is never blocked by serial I/O.
+
+    async def async_get_pump_status(
+        self, pump_address: int, pump_id: int
+    ) -> StatusRecord:
+        """Awaitable version of get_pump_status"""
+        return await asyncio.wrap_future(self.submit_pump_status(pump_address, pump_id))
+
+    async def async_authorize_pump(self, pump_address: int, pump_id: int) -> bool:
+        """Awaitable version of authorize_pump"""
+        try:
+            self.logger.info(f"Authorizing pump {pump_id} (address {pump_address})")
+
+            command = GilbarcoTwoWireProtocol.build_authorize_command(pump_address)
+            await asyncio.wrap_future(
+                self.worker.submit(
+                    self.connection.send_command, command, expect_response=False
+                )
+            )
+
+            self.logger.info(f"Authorize command sent to pump {pump_id}")
+
+            # Verify authorization without holding the line while we wait
+            await asyncio.sleep(self.COMMAND_VERIFY_DELAY)
+            status_response = await asyncio.wrap_future(
+                self.submit_pump_status(pump_address, pump_id, lane=Lane.CONTROL)
+            )
+            return self._check_authorized(pump_id, status_response)
+
+        except Exception as e:
+            self.logger.error(
+                f"Error authorizing pump {pump_id}: {str(e)}", exc_info=True
+            )
+            return False
+
+    async def async_stop_pump(self, pump_address: int, pump_id: int) -> bool:
+        """Awaitable version of stop_pump"""
+        try:
+            self.logger.info(f"Stopping pump {pump_id} (address {pump_address})")
+
+            command = GilbarcoTwoWireProtocol.build_stop_command(pump_address)
+            await asyncio.wrap_future(
+                self.worker.submit(
+                    self.connection.send_command,
+                    command,
+                    expect_response=False,
+                    lane=Lane.EMERGENCY,
+                )
+            )
+
+            self.logger.info(f"Stop command sent to pump {pump_id}")
+
+            # Verify stop without holding the line while we wait
+            await asyncio.sleep(self.COMMAND_VERIFY_DELAY)
+            status_response = await asyncio.wrap_future(
+                self.submit_pump_status(pump_address, pump_id, lane=Lane.EMERGENCY)
+            )
+            return self._check_stopped(pump_id, status_response)
+
+        except Exception as e:
+            self.logger.error(f"Error stopping pump {pump_id}: {str(e)}", exc_info=True)
+            return False
+
+    async def async_get_transaction_data(
+        self, pump_address: int, pump_id: int
+    ) -> Optional[TransactionData]:
+        """Awaitable version of get_transaction_data"""
+        return await asyncio.wrap_future(
+            self.worker.submit(self.get_transaction_data, pump_address, pump_id)
+        )
+
+    async def async_stop_all_pumps(self) -> bool:
+        """Awaitable version of stop_all_pumps"""
+        return await asyncio.wrap_future(
+            self.worker.submit(self.stop_all_pumps, lane=Lane.EMERGENCY)
+        )
+
 
 class TwoWireManagerRegistry:
     """
@@ -882,6 +2847,23 @@ class TwoWireManagerRegistry:
                     "is_connected": manager.connection.is_connected,
                     "baudrate": manager.connection.baudrate,
                     "timeout": manager.connection.timeout,
+                    "is_polling": manager.is_polling,
+                    "polls": manager.poller.polls,
+                    "poll_schedule": manager.poller.get_schedule(),
+                    "lanes": manager.worker.get_lane_stats(),
+                    "background_budget": manager.worker.get_background_stats(),
+                    "real_time_money_budget": manager.real_time_budget.to_dict(),
+                    "extended_status_budget": manager.extended_status_budget.to_dict(),
+                    "special_function_cache": manager.special_functions.to_dict(),
+                    "transactions_pending": list(manager.transaction_capture_pending),
+                    "state_machines": {
+                        address: machine.to_dict()
+                        for address, machine in manager.state_machines.items()
+                    },
+                    "breakers": {
+                        address: breaker.to_dict()
+                        for address, breaker in manager.breakers.items()
+                    },
                 }
                 for port, manager in cls._managers.items()
             }
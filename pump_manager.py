@@ -1,13 +1,39 @@
 import serial.tools.list_ports
 import logging
 import asyncio
+import functools
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-
-from models import PumpInfo, PumpStatusResponse, PumpDiscoveryResult, TransactionData
-from pump_controller import TwoWireManagerRegistry, TwoWireManager
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from models import (
+    PumpInfo,
+    PumpStatusResponse,
+    PumpDiscoveryResult,
+    TransactionData,
+    PumpTotals,
+    PumpTotalsDelta,
+    RealTimeMoney,
+    GradePrice,
+    PriceChangeResult,
+    PriceChangeStatus,
+    PumpPriceChange,
+    PresetRequest,
+    PresetResponse,
+    PresetType,
+    PumpVersion,
+    PumpMiscData,
+    PumpConfiguration,
+)
+from pump_controller import (
+    GilbarcoTwoWireProtocol,
+    TwoWireManagerRegistry,
+    TwoWireManager,
+)
+from pump_state import StatusRecord
+from transaction_store import TransactionStore
+from config import Config
 
 
 class PumpManager:
@@ -19,6 +45,11 @@ class PumpManager:
         self._next_pump_id = 1
         self.executor = ThreadPoolExecutor(max_workers=10)
         self.logger = logging.getLogger("PumpManager")
+        self.price_book: Dict[Tuple[int, int], float] = {}  # (grade, level) -> PPU
+        self.status_listeners: List[Callable[[int, StatusRecord], None]] = []
+        self.transactions = TransactionStore(
+            Config.TRANSACTION_STORE_PATH or None, Config.TRANSACTION_MEMORY_SIZE
+        )
         self._cascade_config = {
             "com_ports": None,
             "address_range": (1, 16),
@@ -142,6 +173,8 @@ class PumpManager:
             if manager.connect():
                 self.logger.debug(f"Connected to {pump_info.com_port}")
 
+                # Retry back to back: the line turnaround is enforced by the
+                # connection, so a sleep only delays the next address
                 for attempt in range(3):
                     try:
                         status_response = manager.get_pump_status(
@@ -160,8 +193,6 @@ class PumpManager:
                         self.logger.debug(
                             f"Status attempt {attempt + 1} failed: {str(e)}"
                         )
-
-                    time.sleep(0.1)
             else:
                 self.logger.debug(f"Failed to connect to {pump_info.com_port}")
 
@@ -202,17 +233,65 @@ class PumpManager:
         for pump_info in discovery_result.discovered_pumps:
             self.pumps[pump_info.pump_id] = pump_info
 
-            if pump_info.com_port not in self.managers:
-                manager = TwoWireManagerRegistry.get_manager(pump_info.com_port)
-                self.managers[pump_info.com_port] = manager
+            manager = self._get_manager(pump_info.com_port)
+            manager.add_pump(pump_info.address, pump_info.pump_id)
 
             self.logger.info(f"Auto-added pump {pump_info.pump_id} to management")
 
+        for manager in self.managers.values():
+            self._start_polling(manager)
+
         self.logger.info(
             f"Auto-discovery complete: {len(self.pumps)} pumps under management"
         )
         return discovery_result
 
+    def _get_manager(self, com_port: str) -> TwoWireManager:
+        """Get the manager for a COM port, registering it and its pumps if needed"""
+        manager = self.managers.get(com_port)
+        if not manager:
+            manager = TwoWireManagerRegistry.get_manager(com_port)
+            manager.transaction_store = self.transactions
+            for listener in self.status_listeners:
+                manager.add_status_listener(listener)
+            self.managers[com_port] = manager
+            for pump_info in self.pumps.values():
+                if pump_info.com_port == com_port:
+                    manager.add_pump(pump_info.address, pump_info.pump_id)
+        return manager
+
+    def add_status_listener(self, listener: Callable[[int, StatusRecord], None]):
+        """
+        Call `listener(pump_id, status)` on every status change of any pump
+
+        Changes are reported by the polling layer as they are seen, from the
+        line worker threads, so the listener must return quickly.
+        """
+        if listener not in self.status_listeners:
+            self.status_listeners.append(listener)
+        for manager in self.managers.values():
+            manager.add_status_listener(listener)
+
+    def remove_status_listener(self, listener: Callable[[int, StatusRecord], None]):
+        """Stop reporting status changes to a listener"""
+        if listener in self.status_listeners:
+            self.status_listeners.remove(listener)
+        for manager in self.managers.values():
+            manager.remove_status_listener(listener)
+
+    def _start_polling(self, manager: TwoWireManager):
+        """Start continuous status polling on a line if enabled and it has pumps"""
+        if Config.STATUS_POLLING and manager.pumps:
+            manager.start_polling()
+
+    def _get_live_status(
+        self, manager: TwoWireManager, pump_info: PumpInfo
+    ) -> Optional[StatusRecord]:
+        """Get a pump's status from the live table if its line is being polled"""
+        if not manager.is_polling:
+            return None
+        return manager.get_live_status(pump_info.address)
+
     def get_pump_info(self, pump_id: int) -> Optional[PumpInfo]:
         """Get pump info for a specific pump"""
         return self.pumps.get(pump_id)
@@ -222,33 +301,51 @@ class PumpManager:
         return list(self.pumps.values())
 
     def get_pump_status(self, pump_id: int) -> Optional[PumpStatusResponse]:
-        """Get status of a specific pump"""
+        """
+        Get status of a specific pump
+
+        Served from the live status table when the pump's line is being polled;
+        `last_updated` then tells how fresh the reading is. Otherwise the pump
+        is polled on demand.
+        """
         if pump_id not in self.pumps:
             return None
 
         try:
             pump_info = self.pumps[pump_id]
-            manager = self.managers.get(pump_info.com_port)
-            if not manager:
-                manager = TwoWireManagerRegistry.get_manager(pump_info.com_port)
-                self.managers[pump_info.com_port] = manager
+            manager = self._get_manager(pump_info.com_port)
 
-            return manager.get_pump_status(pump_info.address, pump_id)
+            live_status = self._get_live_status(manager, pump_info)
+            if live_status:
+                return live_status.to_response()
+
+            return manager.get_pump_status(pump_info.address, pump_id).to_response()
         except Exception as e:
             self.logger.error(f"Error getting status for pump {pump_id}: {str(e)}")
             return None
 
-    def get_transaction_data(self, pump_id: int) -> Optional[TransactionData]:
-        """Get transaction data for a specific pump"""
+    def get_transaction_data(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[TransactionData]:
+        """
+        Get transaction data for a specific pump
+
+        Returns the last captured sale unless `refresh` is set or none has been
+        captured yet, in which case the transaction is read from the pump.
+        """
         if pump_id not in self.pumps:
             return None
 
         try:
             pump_info = self.pumps[pump_id]
-            manager = self.managers.get(pump_info.com_port)
-            if not manager:
-                manager = TwoWireManagerRegistry.get_manager(pump_info.com_port)
-                self.managers[pump_info.com_port] = manager
+            manager = self._get_manager(pump_info.com_port)
+
+            if not refresh:
+                captured = self.transactions.latest(
+                    pump_info.com_port, pump_info.address, pump_id
+                )
+                if captured:
+                    return captured
 
             return manager.get_transaction_data(pump_info.address, pump_id)
         except Exception as e:
@@ -257,28 +354,558 @@ class PumpManager:
             )
             return None
 
+    def get_transactions(
+        self, pump_id: int, limit: int = 10
+    ) -> Optional[List[TransactionData]]:
+        """Get a pump's captured sales, newest first (None if the pump is unknown)"""
+        pump_info = self.pumps.get(pump_id)
+        if pump_info is None:
+            return None
+        return self.transactions.get_transactions(
+            pump_info.com_port, pump_info.address, pump_id, limit
+        )
+
     def get_all_pump_statuses(self) -> Dict[int, PumpStatusResponse]:
-        """Get status of all pumps (threaded for performance)"""
+        """
+        Get status of all pumps
+
+        Pumps on polled lines are answered from the live status table. Any
+        others are queued directly on their COM port's line worker, so every
+        line is swept in parallel without parking a thread per pump on the port.
+        """
+        results = {}
+        futures = []
+        for pump_id, pump_info in list(self.pumps.items()):
+            manager = self._get_manager(pump_info.com_port)
+
+            live_status = self._get_live_status(manager, pump_info)
+            if live_status:
+                results[pump_id] = live_status.to_response()
+                continue
+
+            future = manager.submit_pump_status(pump_info.address, pump_id)
+            futures.append((pump_id, future))
+
+        for pump_id, future in futures:
+            try:
+                status = future.result(timeout=5.0)
+                if status:
+                    results[pump_id] = status.to_response()
+            except Exception as e:
+                self.logger.error(f"Error getting status for pump {pump_id}: {str(e)}")
+
+        return results
+
+    def get_pump_totals(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpTotals]:
+        """
+        Get a pump's electronic totals
+
+        Returns the last snapshot unless `refresh` is set or there is none yet,
+        in which case the totals are read in the line's background lane.
+        """
+        if pump_id not in self.pumps:
+            return None
+
+        try:
+            pump_info = self.pumps[pump_id]
+            manager = self._get_manager(pump_info.com_port)
+
+            if not refresh:
+                snapshot = manager.get_totals_snapshot(pump_info.address)
+                if snapshot:
+                    return snapshot
+
+            return manager.submit_pump_totals(pump_info.address, pump_id).result()
+        except Exception as e:
+            self.logger.error(f"Error getting totals for pump {pump_id}: {str(e)}")
+            return None
 
-        def get_status(pump_id):
-            return pump_id, self.get_pump_status(pump_id)
+    def get_all_totals(self) -> Dict[int, PumpTotals]:
+        """Get the last totals snapshot of every pump that has one"""
+        results = {}
+        for pump_id, pump_info in list(self.pumps.items()):
+            manager = self._get_manager(pump_info.com_port)
+            snapshot = manager.get_totals_snapshot(pump_info.address)
+            if snapshot:
+                results[pump_id] = snapshot
+        return results
 
+    def _submit_all_totals(self) -> List[Tuple[int, Future]]:
+        """Queue a totals read for every pump in its line's background lane"""
         futures = []
-        for pump_id in self.pumps.keys():
-            future = self.executor.submit(get_status, pump_id)
-            futures.append(future)
+        for pump_id, pump_info in list(self.pumps.items()):
+            manager = self._get_manager(pump_info.com_port)
+            futures.append(
+                (pump_id, manager.submit_pump_totals(pump_info.address, pump_id))
+            )
+        return futures
 
+    def collect_all_totals(self) -> Dict[int, PumpTotals]:
+        """
+        Read the totals of every pump, e.g. at shift close
+
+        Reads are queued in each line's background lane, so lines are read in
+        parallel and status polling keeps its freshness while they run. Pumps
+        that could not be read (busy, offline, corrupt data) are left out.
+        """
         results = {}
-        for future in futures:
+        for pump_id, future in self._submit_all_totals():
             try:
-                pump_id, status = future.result(timeout=5.0)
-                if status:
-                    results[pump_id] = status
+                totals = future.result()
+                if totals:
+                    results[pump_id] = totals
             except Exception as e:
-                self.logger.error(f"Error getting pump status: {str(e)}")
+                self.logger.error(f"Error getting totals for pump {pump_id}: {str(e)}")
 
+        self.logger.info(
+            f"Collected totals from {len(results)}/{len(self.pumps)} pumps"
+        )
         return results
 
+    def get_totals_delta(self, pump_id: int) -> Optional[PumpTotalsDelta]:
+        """Difference between a pump's last two totals snapshots, from memory"""
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return manager.get_totals_delta(pump_info.address)
+
+    def get_real_time_money(self, pump_id: int) -> Optional[RealTimeMoney]:
+        """
+        Get the running sale amount of a dispensing pump
+
+        Served from the latest reading when the pump's line is being polled,
+        otherwise read on demand.
+        """
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        if manager.is_polling:
+            reading = manager.get_latest_real_time_money(pump_info.address)
+        else:
+            reading = manager.get_real_time_money(pump_info.address, pump_id)
+        return reading.to_response() if reading else None
+
+    def get_price_book(self) -> List[GradePrice]:
+        """Prices last pushed to the pumps"""
+        return [
+            GradePrice(grade=grade, level=level, price=price)
+            for (grade, level), price in sorted(self.price_book.items())
+        ]
+
+    def _plan_price_change(
+        self, prices: List[GradePrice], pump_ids: Optional[List[int]] = None
+    ) -> Tuple[Dict, Dict, List[Tuple[TwoWireManager, Dict]], List[PumpPriceChange]]:
+        """
+        Work out which pumps need which prices and encode the blocks up front
+
+        Returns the price book, the encoded block per (grade, level), the
+        changes per line and a result for every pump that needs no change.
+        """
+        price_book = {(price.grade, price.level): price.price for price in prices}
+        blocks = {
+            (grade, level): GilbarcoTwoWireProtocol.build_price_change_block(
+                grade, price, level
+            )
+            for (grade, level), price in price_book.items()
+        }
+
+        lines: Dict[str, Dict[int, List[Tuple[int, int]]]] = {}
+        unchanged = []
+        for pump_id in pump_ids or list(self.pumps.keys()):
+            pump_info = self.pumps.get(pump_id)
+            if not pump_info:
+                continue
+
+            manager = self._get_manager(pump_info.com_port)
+            keys = manager.diff_prices(pump_info.address, price_book)
+            if keys:
+                lines.setdefault(pump_info.com_port, {})[pump_info.address] = keys
+            else:
+                unchanged.append(
+                    PumpPriceChange(pump_id=pump_id, status=PriceChangeStatus.UNCHANGED)
+                )
+
+        plans = [
+            (self._get_manager(com_port), changes)
+            for com_port, changes in lines.items()
+        ]
+        return price_book, blocks, plans, unchanged
+
+    def _price_change_result(
+        self,
+        price_book: Dict[Tuple[int, int], float],
+        results: List[PumpPriceChange],
+        started_at: float,
+    ) -> PriceChangeResult:
+        # A price goes into the book only if no pump failed or skipped it
+        not_applied = {
+            (price.grade, price.level) for result in results for price in result.failed
+        }
+        self.price_book.update(
+            (key, price) for key, price in price_book.items() if key not in not_applied
+        )
+        results.sort(key=lambda result: result.pump_id)
+        updated = sum(
+            1 for result in results if result.status == PriceChangeStatus.UPDATED
+        )
+        duration = time.time() - started_at
+        self.logger.info(
+            f"Price change: {updated}/{len(results)} pumps updated in {duration:.2f}s"
+        )
+        return PriceChangeResult(
+            pumps=results, duration=duration, timestamp=datetime.now()
+        )
+
+    def change_prices(
+        self, prices: List[GradePrice], pump_ids: Optional[List[int]] = None
+    ) -> PriceChangeResult:
+        """
+        Push new prices to the pumps
+
+        Only pumps whose known prices differ are sent blocks. Every line runs
+        its price changes at the same time, so a station-wide change takes
+        about as long as the busiest line.
+        """
+        started_at = time.time()
+        price_book, blocks, plans, results = self._plan_price_change(prices, pump_ids)
+
+        futures = [
+            self.executor.submit(manager.change_prices, changes, price_book, blocks)
+            for manager, changes in plans
+        ]
+        for future in futures:
+            results.extend(future.result())
+
+        return self._price_change_result(price_book, results, started_at)
+
+    def _build_preset_block(self, preset: PresetRequest) -> bytes:
+        """Encode a preset request; raises ValueError if the pump cannot take it"""
+        return GilbarcoTwoWireProtocol.build_preset_block(
+            volume=preset.preset_type == PresetType.VOLUME,
+            amount=preset.amount,
+            grades=preset.grades,
+            level=preset.level,
+            money_digits=Config.PRESET_MONEY_DIGITS,
+        )
+
+    def preset_pump(
+        self, pump_id: int, preset: PresetRequest
+    ) -> Optional[PresetResponse]:
+        """
+        Preset a pump and authorize it in one go
+
+        Returns None if the pump is not managed; raises ValueError for a preset
+        the protocol cannot express.
+        """
+        if pump_id not in self.pumps:
+            return None
+
+        block = self._build_preset_block(preset)
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return manager.preset_and_authorize(pump_info.address, pump_id, block)
+
+    def _submit_special_function(
+        self, pump_id: int, code: int, message: bytes = b"", refresh: bool = False
+    ) -> Optional[Future]:
+        """Queue a cached special function read; None if the pump is not managed"""
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return manager.submit_special_function(
+            pump_info.address, pump_id, code, message, refresh
+        )
+
+    @staticmethod
+    def _configuration_message(code: int) -> bytes:
+        """Data words carrying a configuration command code (2 digits)"""
+        if not 0 <= code <= 99:
+            raise ValueError(f"Invalid configuration code: {code}")
+        return bytes([0xE0 | code // 10, 0xE0 | code % 10])
+
+    def get_pump_version(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpVersion]:
+        """Get a pump's software version data, from cache unless `refresh`"""
+        future = self._submit_special_function(
+            pump_id, GilbarcoTwoWireProtocol.SF_VERSION, refresh=refresh
+        )
+        return future.result() if future else None
+
+    def get_pump_misc_data(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpMiscData]:
+        """Get a pump's miscellaneous data, from cache unless `refresh`"""
+        future = self._submit_special_function(
+            pump_id, GilbarcoTwoWireProtocol.SF_MISC_PUMP_DATA, refresh=refresh
+        )
+        return future.result() if future else None
+
+    def get_pump_configuration(
+        self, pump_id: int, code: int, refresh: bool = False
+    ) -> Optional[PumpConfiguration]:
+        """Get one configuration item of a pump, from cache unless `refresh`"""
+        future = self._submit_special_function(
+            pump_id,
+            GilbarcoTwoWireProtocol.SF_CONFIGURATION,
+            self._configuration_message(code),
+            refresh,
+        )
+        return future.result() if future else None
+
+    def invalidate_special_functions(self, pump_id: int) -> Optional[int]:
+        """Drop a pump's cached special function data; None if not managed"""
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return manager.invalidate_special_functions(pump_info.address)
+
+    # Asyncio interface used by the API handlers
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call (discovery, port open/close) off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def async_get_pump_status(self, pump_id: int) -> Optional[PumpStatusResponse]:
+        """Awaitable version of get_pump_status"""
+        record = await self._async_get_status_record(pump_id)
+        return record.to_response() if record else None
+
+    async def _async_get_status_record(self, pump_id: int) -> Optional[StatusRecord]:
+        """A pump's live status record, or a fresh poll if its line is not polled"""
+        if pump_id not in self.pumps:
+            return None
+
+        try:
+            pump_info = self.pumps[pump_id]
+            manager = self._get_manager(pump_info.com_port)
+
+            live_status = self._get_live_status(manager, pump_info)
+            if live_status:
+                return live_status
+
+            return await manager.async_get_pump_status(pump_info.address, pump_id)
+        except Exception as e:
+            self.logger.error(f"Error getting status for pump {pump_id}: {str(e)}")
+            return None
+
+    async def async_get_status_records(self) -> Dict[int, StatusRecord]:
+        """
+        Status records of all pumps, with the time of the poll they came from
+
+        Like async_get_all_pump_statuses, but without building the API models,
+        for consumers that also get StatusRecords from status listeners.
+        """
+        pump_ids = list(self.pumps.keys())
+        records = await asyncio.gather(
+            *(self._async_get_status_record(pump_id) for pump_id in pump_ids)
+        )
+        return {
+            pump_id: record
+            for pump_id, record in zip(pump_ids, records)
+            if record is not None
+        }
+
+    async def async_get_transaction_data(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[TransactionData]:
+        """Awaitable version of get_transaction_data"""
+        if pump_id not in self.pumps:
+            return None
+
+        try:
+            pump_info = self.pumps[pump_id]
+            manager = self._get_manager(pump_info.com_port)
+
+            if not refresh:
+                captured = self.transactions.latest(
+                    pump_info.com_port, pump_info.address, pump_id
+                )
+                if captured:
+                    return captured
+
+            return await manager.async_get_transaction_data(pump_info.address, pump_id)
+        except Exception as e:
+            self.logger.error(
+                f"Error getting transaction data for pump {pump_id}: {str(e)}"
+            )
+            return None
+
+    async def async_get_all_pump_statuses(self) -> Dict[int, PumpStatusResponse]:
+        """Awaitable version of get_all_pump_statuses"""
+        pump_ids = list(self.pumps.keys())
+        statuses = await asyncio.gather(
+            *(self.async_get_pump_status(pump_id) for pump_id in pump_ids)
+        )
+        return {
+            pump_id: status
+            for pump_id, status in zip(pump_ids, statuses)
+            if status is not None
+        }
+
+    async def async_get_pump_totals(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpTotals]:
+        """Awaitable version of get_pump_totals"""
+        if pump_id not in self.pumps:
+            return None
+
+        try:
+            pump_info = self.pumps[pump_id]
+            manager = self._get_manager(pump_info.com_port)
+
+            if not refresh:
+                snapshot = manager.get_totals_snapshot(pump_info.address)
+                if snapshot:
+                    return snapshot
+
+            return await asyncio.wrap_future(
+                manager.submit_pump_totals(pump_info.address, pump_id)
+            )
+        except Exception as e:
+            self.logger.error(f"Error getting totals for pump {pump_id}: {str(e)}")
+            return None
+
+    async def async_collect_all_totals(self) -> Dict[int, PumpTotals]:
+        """Awaitable version of collect_all_totals"""
+        submitted = self._submit_all_totals()
+        outcomes = await asyncio.gather(
+            *(asyncio.wrap_future(future) for _, future in submitted),
+            return_exceptions=True,
+        )
+
+        results = {}
+        for (pump_id, _), outcome in zip(submitted, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Error getting totals for pump {pump_id}: {outcome}")
+            elif outcome:
+                results[pump_id] = outcome
+
+        self.logger.info(
+            f"Collected totals from {len(results)}/{len(self.pumps)} pumps"
+        )
+        return results
+
+    async def stream_real_time_money(
+        self, pump_ids: Optional[List[int]] = None, interval: Optional[float] = None
+    ) -> AsyncIterator[RealTimeMoney]:
+        """
+        Yield new real-time money readings as the poller publishes them
+
+        Readings are conflated: only the latest value per pump is looked at
+        every `interval` seconds, so a slow client skips intermediate amounts
+        instead of building up a backlog. Nothing is sent on the line here.
+        """
+        interval = interval or Config.REAL_TIME_STREAM_INTERVAL
+        last_sent: Dict[int, int] = {}  # pump_id -> read time of the last reading
+
+        while True:
+            for pump_id in pump_ids or list(self.pumps.keys()):
+                pump_info = self.pumps.get(pump_id)
+                if not pump_info:
+                    continue
+
+                manager = self._get_manager(pump_info.com_port)
+                reading = manager.get_latest_real_time_money(pump_info.address)
+                if reading and last_sent.get(pump_id) != reading.read_ns:
+                    last_sent[pump_id] = reading.read_ns
+                    yield reading.to_response()
+
+            await asyncio.sleep(interval)
+
+    async def async_change_prices(
+        self, prices: List[GradePrice], pump_ids: Optional[List[int]] = None
+    ) -> PriceChangeResult:
+        """Awaitable version of change_prices"""
+        started_at = time.time()
+        price_book, blocks, plans, results = self._plan_price_change(prices, pump_ids)
+
+        line_results = await asyncio.gather(
+            *(
+                self.run_blocking(manager.change_prices, changes, price_book, blocks)
+                for manager, changes in plans
+            )
+        )
+        for line_result in line_results:
+            results.extend(line_result)
+
+        return self._price_change_result(price_book, results, started_at)
+
+    async def async_preset_pump(
+        self, pump_id: int, preset: PresetRequest
+    ) -> Optional[PresetResponse]:
+        """Awaitable version of preset_pump"""
+        if pump_id not in self.pumps:
+            return None
+
+        block = self._build_preset_block(preset)
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return await asyncio.wrap_future(
+            manager.submit_preset(pump_info.address, pump_id, block)
+        )
+
+    async def async_get_pump_version(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpVersion]:
+        """Awaitable version of get_pump_version"""
+        future = self._submit_special_function(
+            pump_id, GilbarcoTwoWireProtocol.SF_VERSION, refresh=refresh
+        )
+        return await asyncio.wrap_future(future) if future else None
+
+    async def async_get_pump_misc_data(
+        self, pump_id: int, refresh: bool = False
+    ) -> Optional[PumpMiscData]:
+        """Awaitable version of get_pump_misc_data"""
+        future = self._submit_special_function(
+            pump_id, GilbarcoTwoWireProtocol.SF_MISC_PUMP_DATA, refresh=refresh
+        )
+        return await asyncio.wrap_future(future) if future else None
+
+    async def async_get_pump_configuration(
+        self, pump_id: int, code: int, refresh: bool = False
+    ) -> Optional[PumpConfiguration]:
+        """Awaitable version of get_pump_configuration"""
+        future = self._submit_special_function(
+            pump_id,
+            GilbarcoTwoWireProtocol.SF_CONFIGURATION,
+            self._configuration_message(code),
+            refresh,
+        )
+        return await asyncio.wrap_future(future) if future else None
+
+    async def async_authorize_pump(self, pump_id: int) -> Optional[bool]:
+        """Authorize a pump; returns None if the pump is not managed"""
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return await manager.async_authorize_pump(pump_info.address, pump_id)
+
+    async def async_stop_pump(self, pump_id: int) -> Optional[bool]:
+        """Stop a pump; returns None if the pump is not managed"""
+        if pump_id not in self.pumps:
+            return None
+
+        pump_info = self.pumps[pump_id]
+        manager = self._get_manager(pump_info.com_port)
+        return await manager.async_stop_pump(pump_info.address, pump_id)
+
     def connect_all_ports(self) -> Dict[str, bool]:
         """Connect to all COM ports used by managed pumps"""
         results = {}
@@ -287,12 +914,11 @@ class PumpManager:
         com_ports = set(pump_info.com_port for pump_info in self.pumps.values())
 
         for com_port in com_ports:
-            manager = self.managers.get(com_port)
-            if not manager:
-                manager = TwoWireManagerRegistry.get_manager(com_port)
-                self.managers[com_port] = manager
+            manager = self._get_manager(com_port)
 
             success = manager.connect()
+            if success:
+                self._start_polling(manager)
             results[com_port] = success
             self.logger.info(
                 f"COM port {com_port}: {'Connected' if success else 'Failed to connect'}"
@@ -308,12 +934,11 @@ class PumpManager:
 
     def connect_port(self, com_port: str) -> bool:
         """Connect to a specific COM port"""
-        manager = self.managers.get(com_port)
-        if not manager:
-            manager = TwoWireManagerRegistry.get_manager(com_port)
-            self.managers[com_port] = manager
+        manager = self._get_manager(com_port)
 
         success = manager.connect()
+        if success:
+            self._start_polling(manager)
         self.logger.info(
             f"COM port {com_port}: {'Connected' if success else 'Failed to connect'}"
         )
@@ -341,4 +966,5 @@ class PumpManager:
         self.logger.info("Shutting down pump manager...")
         self.disconnect_all_ports()
         self.executor.shutdown(wait=True)
+        self.transactions.close()
         self.logger.info("Pump manager shutdown complete")
@@ -1,22 +1,73 @@
 import logging
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
+from alert_dispatcher import AlertDispatcher
+from history_store import HOUR, StatusHistoryStore
 from pump_manager import PumpManager
+from pump_state import StatusRecord, monotonic_ns_to_datetime
+from status_history import StatusHistory
 from models import PumpInfo, PumpStatus
+from config import Config
 
 
 class PumpMonitor:
-    """Monitors pump status and provides alerts/notifications"""
+    """
+    Monitors pump status and provides alerts/notifications
     
-    def __init__(self, pump_manager: PumpManager, check_interval: int = 30):
+    Alert rules run on the status changes reported by the polling layer, as
+    soon as they are seen, so monitoring adds no line traffic of its own.
+    Every `check_interval` the current statuses are sampled as well, for
+    lines without a poller; for polled lines this only reads the live status
+    table.
+    
+    Each pump's entry time into its current state is kept, and states with a
+    duration rule (STUCK dispensing, LONG_CALLING) get a deadline in a single
+    heap for the whole fleet. A deadline whose pump has left the state since
+    is dropped when it comes up, so the cost per change is O(log n) and does
+    not depend on history length.
+    
+    Alerts are handed to an AlertDispatcher, which suppresses repeats per
+    pump and alert type and runs the callbacks on its own workers, so the
+    monitoring loop never waits on a consumer.
+    
+    Status transitions also go to a StatusHistoryStore on disk, which
+    `get_pump_history` reads, so history covers months and survives restarts;
+    the in-memory StatusHistory of each pump only keeps the recent samples.
+    Reads from the store wait on its database, so code on the event loop
+    uses `async_get_pump_history` and `async_get_pump_rollups` instead.
+    """
+    
+    def __init__(
+        self,
+        pump_manager: PumpManager,
+        check_interval: int = 30,
+        history_store: Optional[StatusHistoryStore] = None
+    ):
         self.pump_manager = pump_manager
         self.check_interval = check_interval
         self.monitoring = False
-        self.status_history: Dict[int, List[Dict]] = {}
+        self.status_history: Dict[int, StatusHistory] = {}
+        if history_store is None and Config.HISTORY_STORE_PATH:
+            history_store = StatusHistoryStore(Config.HISTORY_STORE_PATH)
+        self.history_store = history_store
         self.alert_callbacks = []
+        self.alert_dispatcher = AlertDispatcher(self.alert_callbacks)
         self.logger = logging.getLogger("PumpMonitor")
+        self._events: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # State -> (alert type, seconds a pump may stay in it)
+        self.duration_rules: Dict[PumpStatus, Tuple[str, float]] = {
+            PumpStatus.DISPENSING: ("STUCK", Config.STUCK_DISPENSING_TIMEOUT),
+            PumpStatus.CALLING: ("LONG_CALLING", Config.LONG_CALLING_TIMEOUT),
+        }
+        # pump_id -> (current state, monotonic time it was entered)
+        self.state_entered: Dict[int, Tuple[PumpStatus, float]] = {}
+        self._deadlines: List[Tuple[float, int, float]] = []  # (due, pump_id, entered)
+        self._last_poll_ns: Dict[int, int] = {}  # pump_id -> poll time last processed
     
     def add_alert_callback(self, callback):
         """Add callback function for alerts"""
@@ -27,44 +78,138 @@ class PumpMonitor:
         self.monitoring = True
         self.logger.info("Starting pump monitoring...")
         
-        while self.monitoring:
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+        self.alert_dispatcher.start()
+        self.pump_manager.add_status_listener(self._on_status_change)
+        try:
             await self._check_all_pumps()
-            await asyncio.sleep(self.check_interval)
+            next_check = time.monotonic() + self.check_interval
+            
+            while self.monitoring:
+                wake_at = next_check
+                if self._deadlines:
+                    wake_at = min(wake_at, self._deadlines[0][0])
+                try:
+                    pump_id, status = await asyncio.wait_for(
+                        self._events.get(), max(0.0, wake_at - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    await self._check_deadlines()
+                    if time.monotonic() >= next_check:
+                        await self._check_all_pumps()
+                        next_check = time.monotonic() + self.check_interval
+                    continue
+                
+                if pump_id is None:
+                    # Woken up by stop_monitoring
+                    break
+                await self._process_status(pump_id, status)
+        finally:
+            self.pump_manager.remove_status_listener(self._on_status_change)
+            self._events = None
+            await self.alert_dispatcher.stop()
+            if self.history_store is not None:
+                self.history_store.flush()
     
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring = False
+        if self._events is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, (None, None))
         self.logger.info("Stopping pump monitoring...")
     
+    def _on_status_change(self, pump_id: int, status: StatusRecord):
+        """Status listener: runs on a line worker thread, hands the change to the loop"""
+        events, loop = self._events, self._loop
+        if events is not None and loop is not None:
+            loop.call_soon_threadsafe(events.put_nowait, (pump_id, status))
+    
     async def _check_all_pumps(self):
         """Check status of all pumps"""
         try:
-            statuses = self.pump_manager.get_all_pump_statuses()
+            # Lines without a poller are read on their line workers, not here
+            statuses = await self.pump_manager.async_get_status_records()
             
             for pump_id, status in statuses.items():
-                self._update_status_history(pump_id, status)
-                await self._check_for_alerts(pump_id, status)
+                await self._process_status(pump_id, status)
                 
         except Exception as e:
             self.logger.error(f"Error during pump monitoring: {str(e)}")
     
-    def _update_status_history(self, pump_id: int, status):
+    async def _process_status(self, pump_id: int, status: StatusRecord):
+        """Record a status change or sample and run the alert rules on it"""
+        if status.updated_ns <= self._last_poll_ns.get(pump_id, -1):
+            # Already seen, or older than a poll already processed (a change
+            # event that was queued while the pumps were being sampled)
+            return
+        self._last_poll_ns[pump_id] = status.updated_ns
+        
+        self._update_status_history(pump_id, status)
+        self._update_state_entered(pump_id, status)
+        await self._check_for_alerts(pump_id, status)
+    
+    def _update_state_entered(self, pump_id: int, status: StatusRecord):
+        """Note when a pump entered a new state and schedule its duration rule"""
+        current = self.state_entered.get(pump_id)
+        if current is not None and current[0] == status.status:
+            return
+        
+        # Entered at the poll that saw it, not when the monitor got to it
+        entered = status.updated_ns / 1e9
+        self.state_entered[pump_id] = (status.status, entered)
+        
+        rule = self.duration_rules.get(status.status)
+        if rule is not None:
+            heapq.heappush(self._deadlines, (entered + rule[1], pump_id, entered))
+    
+    async def _check_deadlines(self):
+        """Alert on every pump that has overstayed a state with a duration rule"""
+        now = time.monotonic()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, pump_id, entered = heapq.heappop(self._deadlines)
+            current = self.state_entered.get(pump_id)
+            if current is None or current[1] != entered:
+                # The pump has left that state since
+                continue
+            
+            alert_type, timeout = self.duration_rules[current[0]]
+            await self._send_alert(
+                pump_id,
+                alert_type,
+                f"Pump {pump_id} has been {current[0].value} for more than "
+                f"{timeout / 60:g} minutes"
+            )
+    
+    def get_state_duration(self, pump_id: int) -> Optional[float]:
+        """Seconds a pump has been in its current state"""
+        current = self.state_entered.get(pump_id)
+        if current is None:
+            return None
+        return time.monotonic() - current[1]
+    
+    def _update_status_history(self, pump_id: int, status: StatusRecord):
         """Update status history for a pump"""
-        if pump_id not in self.status_history:
-            self.status_history[pump_id] = []
+        history = self.status_history.get(pump_id)
+        if history is None:
+            history = StatusHistory(Config.STATUS_HISTORY_SIZE)
+            self.status_history[pump_id] = history
         
-        # Keep last 100 status updates
-        history = self.status_history[pump_id]
-        history.append({
-            "timestamp": datetime.now(),
-            "status": status.status,
-            "error_message": status.error_message
-        })
+        updated_ns = status.updated_ns
+        history.append(status.status, status.error_message, updated_ns)
         
-        if len(history) > 100:
-            history.pop(0)
+        pump_info = self.pump_manager.get_pump_info(pump_id)
+        if self.history_store is not None and pump_info is not None:
+            # Only transitions are kept; repeated samples are dropped there
+            self.history_store.record(
+                pump_info.com_port,
+                pump_info.address,
+                status.status,
+                status.error_message,
+                monotonic_ns_to_datetime(updated_ns).timestamp()
+            )
     
-    async def _check_for_alerts(self, pump_id: int, status):
+    async def _check_for_alerts(self, pump_id: int, status: StatusRecord):
         """Check for alert conditions"""
         # Alert on error status
         if status.status == PumpStatus.ERROR:
@@ -81,20 +226,9 @@ class PumpMonitor:
                 "OFFLINE",
                 f"Pump {pump_id} is offline"
             )
-        
-        # Alert on stuck status (same status for too long)
-        history = self.status_history.get(pump_id, [])
-        if len(history) >= 5:
-            recent_statuses = [h["status"] for h in history[-5:]]
-            if all(s == recent_statuses[0] for s in recent_statuses) and recent_statuses[0] == PumpStatus.DISPENSING:
-                await self._send_alert(
-                    pump_id,
-                    "STUCK",
-                    f"Pump {pump_id} has been dispensing for an unusually long time"
-                )
     
     async def _send_alert(self, pump_id: int, alert_type: str, message: str):
-        """Send alert to all registered callbacks"""
+        """Queue an alert for the registered callbacks (never waits on them)"""
         alert_data = {
             "pump_id": pump_id,
             "type": alert_type,
@@ -102,26 +236,81 @@ class PumpMonitor:
             "timestamp": datetime.now()
         }
         
-        self.logger.warning(f"ALERT: {message}")
-        
-        for callback in self.alert_callbacks:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(alert_data)
-                else:
-                    callback(alert_data)
-            except Exception as e:
-                self.logger.error(f"Error in alert callback: {str(e)}")
+        self.alert_dispatcher.publish(alert_data)
+    
+    def get_alert_stats(self) -> Dict:
+        """Alert delivery counters"""
+        return self.alert_dispatcher.to_dict()
     
     def get_pump_history(self, pump_id: int, hours: int = 24) -> List[Dict]:
-        """Get status history for a pump"""
-        if pump_id not in self.status_history:
-            return []
+        """Get status history for a pump (its transitions, with a history store)"""
+        if self.history_store is not None:
+            pump_info = self.pump_manager.get_pump_info(pump_id)
+            if pump_info is None:
+                return []
+            return self.history_store.get_transitions(
+                pump_info.com_port, pump_info.address, time.time() - hours * 3600
+            )
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        history = self.status_history[pump_id]
+        history = self.status_history.get(pump_id)
+        if history is None:
+            return []
         
+        cutoff_ns = time.monotonic_ns() - int(hours * 3600 * 1e9)
         return [
-            h for h in history 
-            if h["timestamp"] >= cutoff_time
+            {
+                "timestamp": monotonic_ns_to_datetime(timestamp_ns),
+                "status": status,
+                "error_message": error_message
+            }
+            for timestamp_ns, status, error_message in history.since(cutoff_ns)
         ]
+    
+    def get_pump_rollups(
+        self, pump_id: int, hours: int = 24 * 7, resolution: int = HOUR
+    ) -> List[Dict]:
+        """Time spent in each status per minute or hour bucket"""
+        pump_info = self.pump_manager.get_pump_info(pump_id)
+        if self.history_store is None or pump_info is None:
+            return []
+        return self.history_store.get_rollups(
+            pump_info.com_port,
+            pump_info.address,
+            resolution,
+            time.time() - hours * 3600
+        )
+    
+    async def async_get_pump_history(
+        self, pump_id: int, hours: int = 24
+    ) -> List[Dict]:
+        """Awaitable version of get_pump_history"""
+        if self.history_store is None:
+            # Recent samples only, from memory
+            return self.get_pump_history(pump_id, hours)
+        
+        pump_info = self.pump_manager.get_pump_info(pump_id)
+        if pump_info is None:
+            return []
+        return await self.history_store.async_get_transitions(
+            pump_info.com_port, pump_info.address, time.time() - hours * 3600
+        )
+    
+    async def async_get_pump_rollups(
+        self, pump_id: int, hours: int = 24 * 7, resolution: int = HOUR
+    ) -> List[Dict]:
+        """Awaitable version of get_pump_rollups"""
+        pump_info = self.pump_manager.get_pump_info(pump_id)
+        if self.history_store is None or pump_info is None:
+            return []
+        return await self.history_store.async_get_rollups(
+            pump_info.com_port,
+            pump_info.address,
+            resolution,
+            time.time() - hours * 3600
+        )
+    
+    def close(self):
+        """Write out and close the history store"""
+        if self.history_store is not None:
+            self.history_store.close()
+            self.history_store = None
@@ -0,0 +1,164 @@
+import heapq
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from models import PumpStatus
+
+if TYPE_CHECKING:
+    from pump_controller import TwoWireManager
+
+
+class PumpPoller:
+    """
+    Continuously polls every managed address on one line.
+
+    Each response is written into the manager's live status table, so API
+    reads are served from memory and the line load stays the same no matter
+    how many clients are asking. The 5 ms line turnaround (t2) required by the
+    protocol is enforced by the SerialConnection itself.
+
+    Polls are scheduled by due time rather than in a fixed round robin. Pumps
+    that are in an active state, or whose state changed recently, are due again
+    after ACTIVE_POLL_INTERVAL; the rest after IDLE_POLL_INTERVAL. A nozzle lift
+    or end of transaction on an active pump is therefore seen within one active
+    interval, and idle pumps no longer stretch the sweep on a full line.
+    Addresses whose circuit breaker is open are only polled when their
+    re-probe is due. A pump that has just reached COMPLETE has its sale
+    captured into the transaction store. A DISPENSING pump also has its
+    real-time money read after its status poll, within the line's real-time
+    money budget, and a CALLING or AUTHORIZED pump its extended status.
+    """
+
+    # States whose next change matters to the forecourt controller right away
+    ACTIVE_STATUSES = frozenset(
+        {PumpStatus.CALLING, PumpStatus.AUTHORIZED, PumpStatus.DISPENSING}
+    )
+
+    # How long to wait before retrying a line that could not be opened
+    RECONNECT_INTERVAL = 1.0
+    # Longest idle wait, so newly registered pumps are picked up promptly
+    IDLE_INTERVAL = 0.5
+
+    def __init__(self, manager: "TwoWireManager"):
+        self.manager = manager
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._schedule: List[Tuple[float, int]] = []  # heap of (due time, address)
+        self._scheduled: Set[int] = set()
+        self.polls = 0
+        self.logger = logging.getLogger(f"PumpPoller-{manager.com_port}")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the polling thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start polling the line"""
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"PumpPoller-{self.manager.com_port}",
+            daemon=True,
+        )
+        self._thread.start()
+        self.logger.info(f"[{self.manager.com_port}] Status polling started")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop polling the line"""
+        thread = self._thread
+        if thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread = None
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+        self.logger.info(f"[{self.manager.com_port}] Status polling stopped")
+
+    def poll_interval(self, pump_address: int) -> float:
+        """How long until an address should be polled again"""
+        breaker = self.manager.breakers.get(pump_address)
+        if breaker and breaker.is_open:
+            # Offline pump: only come back when its re-probe is due
+            return breaker.time_until_probe()
+
+        live_status = self.manager.get_live_status(pump_address)
+        if live_status is None or live_status.status in self.ACTIVE_STATUSES:
+            return Config.ACTIVE_POLL_INTERVAL
+
+        changed_at = self.manager.status_changed_at.get(pump_address)
+        if (
+            changed_at is not None
+            and time.monotonic() - changed_at < Config.RECENT_CHANGE_WINDOW
+        ):
+            return Config.ACTIVE_POLL_INTERVAL
+
+        return Config.IDLE_POLL_INTERVAL
+
+    def get_schedule(self) -> Dict[int, float]:
+        """Seconds until each scheduled address is next due (negative if late)"""
+        now = time.monotonic()
+        return {address: due - now for due, address in sorted(self._schedule)}
+
+    def _sync_schedule(self):
+        """Schedule newly registered addresses for an immediate poll"""
+        now = time.monotonic()
+        for pump_address in list(self.manager.pumps):
+            if pump_address not in self._scheduled:
+                self._scheduled.add(pump_address)
+                heapq.heappush(self._schedule, (now, pump_address))
+
+    def _run(self):
+        """Polling loop: poll whichever address is due next until stopped"""
+        self._schedule = []
+        self._scheduled = set()
+
+        while not self._stop_event.is_set():
+            self._sync_schedule()
+            if not self._schedule:
+                self._stop_event.wait(self.IDLE_INTERVAL)
+                continue
+
+            if not self.manager.connection.is_connected and not self.manager.connect():
+                self._stop_event.wait(self.RECONNECT_INTERVAL)
+                continue
+
+            due, pump_address = self._schedule[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                # Leave the line free for other jobs until the next poll is due
+                self._stop_event.wait(min(delay, self.IDLE_INTERVAL))
+                continue
+
+            heapq.heappop(self._schedule)
+            pump_id = self.manager.pumps.get(pump_address)
+            if pump_id is None:
+                # Address was removed from the line
+                self._scheduled.discard(pump_address)
+                continue
+
+            try:
+                self.manager.submit_pump_status(pump_address, pump_id).result()
+                if Config.TRANSACTION_CAPTURE:
+                    self.manager.poll_transaction(pump_address, pump_id)
+                if Config.REAL_TIME_MONEY:
+                    self.manager.poll_real_time_money(pump_address, pump_id)
+                if Config.EXTENDED_STATUS:
+                    self.manager.poll_extended_status(pump_address, pump_id)
+            except Exception as e:
+                self.logger.error(
+                    f"[{self.manager.com_port}] Poll of address {pump_address} failed: {str(e)}"
+                )
+
+            self.polls += 1
+            heapq.heappush(
+                self._schedule,
+                (time.monotonic() + self.poll_interval(pump_address), pump_address),
+            )
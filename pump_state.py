@@ -0,0 +1,245 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from models import ExtendedPumpStatus, PumpStatus, PumpStatusResponse, RealTimeMoney
+
+
+class TransitionKind(str, Enum):
+    """How an observed status change relates to the protocol transition table"""
+
+    EXPECTED = "EXPECTED"  # A documented transition, seen at any poll rate
+    SKIPPED = "SKIPPED"  # Documented, but only seen when a state was polled past
+    INVALID = "INVALID"  # Not in the transition table at all
+
+
+def monotonic_ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Wall-clock time of a time.monotonic_ns() reading"""
+    return datetime.now() - timedelta(
+        microseconds=(time.monotonic_ns() - timestamp_ns) // 1000
+    )
+
+
+class ExtendedStatusRecord:
+    """Decoded extended status (special function 010) as read by the poller"""
+
+    __slots__ = (
+        "price_level_needed",
+        "grade_needed",
+        "nozzle_out",
+        "push_to_start_needed",
+        "selected_grade",
+        "read_ns",
+    )
+
+    def __init__(
+        self,
+        price_level_needed: bool,
+        grade_needed: bool,
+        nozzle_out: bool,
+        push_to_start_needed: bool,
+        selected_grade: Optional[int] = None,
+    ):
+        self.price_level_needed = price_level_needed
+        self.grade_needed = grade_needed
+        self.nozzle_out = nozzle_out
+        self.push_to_start_needed = push_to_start_needed
+        self.selected_grade = selected_grade
+        self.read_ns = time.monotonic_ns()
+
+    def to_response(self) -> ExtendedPumpStatus:
+        return ExtendedPumpStatus(
+            price_level_needed=self.price_level_needed,
+            grade_needed=self.grade_needed,
+            nozzle_out=self.nozzle_out,
+            push_to_start_needed=self.push_to_start_needed,
+            selected_grade=self.selected_grade,
+            timestamp=monotonic_ns_to_datetime(self.read_ns),
+        )
+
+
+class RealTimeMoneyRecord:
+    """Running sale amount of a dispensing pump as read by the poller"""
+
+    __slots__ = ("pump_id", "money", "read_ns")
+
+    def __init__(self, pump_id: int, money: float):
+        self.pump_id = pump_id
+        self.money = money
+        self.read_ns = time.monotonic_ns()
+
+    def to_response(self) -> RealTimeMoney:
+        return RealTimeMoney(
+            pump_id=self.pump_id,
+            money=self.money,
+            timestamp=monotonic_ns_to_datetime(self.read_ns),
+        )
+
+
+class StatusRecord:
+    """
+    One status poll result, as kept in the live status table.
+
+    Built on every poll, so it is a plain slotted object holding the already
+    formatted strings of the decoded status word and a monotonic timestamp:
+    no validation, datetime or formatting. The PumpStatusResponse model is
+    only built from it at the API boundary (`to_response`).
+    """
+
+    __slots__ = (
+        "pump_id",
+        "status",
+        "raw_status_code",
+        "wire_format",
+        "error_message",
+        "updated_ns",
+        "extended",
+    )
+
+    def __init__(
+        self,
+        pump_id: int,
+        status: PumpStatus,
+        raw_status_code: Optional[str] = None,
+        wire_format: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ):
+        self.pump_id = pump_id
+        self.status = status
+        self.raw_status_code = raw_status_code
+        self.wire_format = wire_format
+        self.error_message = error_message
+        self.updated_ns = time.monotonic_ns()
+        self.extended: Optional[ExtendedStatusRecord] = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the poll"""
+        return (time.monotonic_ns() - self.updated_ns) / 1e9
+
+    def to_response(self) -> PumpStatusResponse:
+        return PumpStatusResponse(
+            pump_id=self.pump_id,
+            status=self.status,
+            last_updated=monotonic_ns_to_datetime(self.updated_ns),
+            error_message=self.error_message,
+            raw_status_code=self.raw_status_code,
+            wire_format=self.wire_format,
+            extended=self.extended.to_response() if self.extended else None,
+        )
+
+
+_I = PumpStatus.IDLE
+_C = PumpStatus.CALLING
+_A = PumpStatus.AUTHORIZED
+_D = PumpStatus.DISPENSING
+_E = PumpStatus.COMPLETE
+_S = PumpStatus.STOPPED
+
+# Pump status transition table (section 5.1.2). Transitions marked with an
+# asterisk in section 5.1.3 are only seen when status polling is too slow to
+# catch the state in between, and are SKIPPED; any pair not listed is INVALID.
+TRANSITIONS: Dict[Tuple[PumpStatus, PumpStatus], TransitionKind] = {
+    (_I, _C): TransitionKind.EXPECTED,  # 1 handle up
+    (_I, _A): TransitionKind.EXPECTED,  # 2 authorized while off
+    (_E, _I): TransitionKind.EXPECTED,  # 3 end of transaction received
+    (_C, _I): TransitionKind.EXPECTED,  # 5 handle down
+    (_A, _I): TransitionKind.EXPECTED,  # 6, 8 handle down or stopped
+    (_S, _I): TransitionKind.EXPECTED,  # 9 stopped, no longer calling
+    (_C, _A): TransitionKind.EXPECTED,  # 10 authorized, not ready
+    (_C, _D): TransitionKind.EXPECTED,  # 11 authorized and ready
+    (_C, _S): TransitionKind.EXPECTED,  # 12 stopped while calling
+    (_S, _C): TransitionKind.EXPECTED,  # 12 stopped, still calling
+    (_A, _C): TransitionKind.EXPECTED,  # 13 stopped, still calling
+    (_D, _C): TransitionKind.EXPECTED,  # 13, 14 no fuel dispensed
+    (_A, _D): TransitionKind.EXPECTED,  # 15 became ready
+    (_A, _S): TransitionKind.EXPECTED,  # stopped while authorized
+    (_D, _S): TransitionKind.EXPECTED,  # 18, 19 stopped while busy
+    (_D, _E): TransitionKind.EXPECTED,  # 20 customer ended the sale
+    (_S, _D): TransitionKind.EXPECTED,  # 22 re-authorized
+    (_S, _A): TransitionKind.EXPECTED,  # 22 re-authorized, not ready
+    (_S, _E): TransitionKind.EXPECTED,  # 23 ended while stopped
+    (_E, _C): TransitionKind.EXPECTED,  # 24 next customer
+    (_I, _E): TransitionKind.SKIPPED,  # 4* whole sale between polls
+    (_D, _I): TransitionKind.SKIPPED,  # 7* sale ended, COMPLETE not seen
+    (_A, _E): TransitionKind.SKIPPED,  # 16* dispensed and stopped unseen
+    (_C, _E): TransitionKind.SKIPPED,  # 17* dispensed and ended unseen
+    (_I, _D): TransitionKind.SKIPPED,  # CALL or AUTH not seen
+    (_I, _S): TransitionKind.SKIPPED,  # AUTH or BUSY not seen
+    (_E, _A): TransitionKind.SKIPPED,  # OFF or CALL of the next sale not seen
+    (_E, _D): TransitionKind.SKIPPED,  # next sale started unseen
+}
+
+# States a sale is still running in; leaving one of them for anything but
+# COMPLETE through an unexpected transition may have hidden a completed sale
+SALE_STATES = frozenset({_D, _S})
+
+
+class Transition(NamedTuple):
+    """An observed change of protocol state"""
+
+    previous: PumpStatus
+    status: PumpStatus
+    kind: TransitionKind
+
+    @property
+    def may_hide_sale(self) -> bool:
+        """Whether the pump may have completed a sale that was never seen"""
+        return (
+            self.kind != TransitionKind.EXPECTED
+            and self.previous in SALE_STATES
+            and self.status != PumpStatus.COMPLETE
+        )
+
+
+class PumpStateMachine:
+    """
+    Tracks one pump's protocol state and checks each change against the table.
+
+    ERROR and OFFLINE can come from and go to any state, so they are not
+    states of the machine: a change is checked from the last protocol state
+    seen before them. The SKIPPED and INVALID counts, relative to all
+    transitions, show whether the poll rate is high enough.
+    """
+
+    def __init__(self):
+        self.state: Optional[PumpStatus] = None
+        self.counts: Dict[TransitionKind, int] = {kind: 0 for kind in TransitionKind}
+        self.last_anomaly: Optional[Tuple[PumpStatus, PumpStatus]] = None
+        self._lock = threading.Lock()
+
+    def observe(self, status: PumpStatus) -> Optional[Transition]:
+        """
+        Feed an observed status; returns the transition it made
+
+        Returns None when the status is not a change of protocol state (the
+        same state again, the first state seen, ERROR or OFFLINE).
+        """
+        if status in (PumpStatus.ERROR, PumpStatus.OFFLINE):
+            return None
+
+        with self._lock:
+            previous, self.state = self.state, status
+            if previous is None or previous == status:
+                return None
+
+            kind = TRANSITIONS.get((previous, status), TransitionKind.INVALID)
+            self.counts[kind] += 1
+            if kind != TransitionKind.EXPECTED:
+                self.last_anomaly = (previous, status)
+            return Transition(previous, status, kind)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state.value if self.state else None,
+                "transitions": sum(self.counts.values()),
+                **{kind.value.lower(): count for kind, count in self.counts.items()},
+                "last_anomaly": (
+                    f"{self.last_anomaly[0].value} -> {self.last_anomaly[1].value}"
+                    if self.last_anomaly
+                    else None
+                ),
+            }
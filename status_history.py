@@ -0,0 +1,101 @@
+import threading
+import time
+from array import array
+from typing import List, Optional, Tuple
+
+from models import PumpStatus
+
+# Status codes stored in the history: index into this tuple
+_STATUSES: Tuple[PumpStatus, ...] = tuple(PumpStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
+class StatusHistory:
+    """
+    Fixed-capacity ring buffer of one pump's status samples.
+
+    Samples are kept in preallocated arrays of monotonic nanosecond timestamps
+    and one-byte status codes (error messages in a parallel list), so adding
+    one is O(1) and allocates nothing once the buffer is full: the oldest
+    sample is simply overwritten. A sample older than the latest one is
+    stored at the latest one's time, so timestamps never decrease and `since`
+    can find the start of a time range by binary search in O(log n).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._timestamps = array("q", bytes(8 * self.capacity))
+        self._codes = array("B", bytes(self.capacity))
+        self._errors: List[Optional[str]] = [None] * self.capacity
+        self._start = 0  # physical index of the oldest sample
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        status: PumpStatus,
+        error_message: Optional[str] = None,
+        timestamp_ns: Optional[int] = None,
+    ):
+        """Add a sample, overwriting the oldest one when full"""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        with self._lock:
+            if self._size:
+                # Keep the order `since` relies on for late, older samples
+                newest = (self._start + self._size - 1) % self.capacity
+                timestamp_ns = max(timestamp_ns, self._timestamps[newest])
+            if self._size < self.capacity:
+                index = (self._start + self._size) % self.capacity
+                self._size += 1
+            else:
+                index = self._start
+                self._start = (self._start + 1) % self.capacity
+            self._timestamps[index] = timestamp_ns
+            self._codes[index] = _STATUS_CODES[status]
+            self._errors[index] = error_message
+
+    def last(self, count: int) -> List[PumpStatus]:
+        """Statuses of the latest `count` samples, oldest first"""
+        with self._lock:
+            count = min(count, self._size)
+            first = self._start + self._size - count
+            return [
+                _STATUSES[self._codes[(first + i) % self.capacity]]
+                for i in range(count)
+            ]
+
+    def since(self, timestamp_ns: int) -> List[Tuple[int, PumpStatus, Optional[str]]]:
+        """Samples taken at or after a monotonic time, oldest first"""
+        with self._lock:
+            # Lower bound over the logical (oldest first) order
+            low, high = 0, self._size
+            while low < high:
+                middle = (low + high) // 2
+                if (
+                    self._timestamps[(self._start + middle) % self.capacity]
+                    < timestamp_ns
+                ):
+                    low = middle + 1
+                else:
+                    high = middle
+
+            samples = []
+            for i in range(low, self._size):
+                index = (self._start + i) % self.capacity
+                samples.append(
+                    (
+                        self._timestamps[index],
+                        _STATUSES[self._codes[index]],
+                        self._errors[index],
+                    )
+                )
+            return samples
+
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._size = 0
@@ -0,0 +1,228 @@
+import logging
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from models import TransactionData
+
+Location = Tuple[str, int]  # (com_port, address)
+
+
+class TransactionStore:
+    """
+    Completed sales, kept in memory and optionally in a SQLite file.
+
+    Sales are kept by the pump's location on the wire, (com_port, address),
+    since pump ids are handed out at discovery and may change on a restart
+    or rescan. Each stored transaction gets the next sequence number of its
+    location and is keyed by (com_port, address, sequence); the pump id of
+    the caller is only filled in when sales are read back. The latest
+    `memory_size` sales of every pump are served from memory and older ones
+    from the file. Without a path the store is memory-only. A failed write is
+    logged, and the sale stays available from memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_size: int = 50):
+        self.path = path
+        self.memory_size = memory_size
+        self._recent: Dict[Location, Deque[TransactionData]] = {}
+        self._sequences: Dict[Location, int] = {}  # location -> last sequence
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.write_errors = 0
+        self.logger = logging.getLogger("TransactionStore")
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        """Open the SQLite file and load each location's last sequence and sales"""
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            columns = [
+                row[1] for row in self._db.execute("PRAGMA table_info(transactions)")
+            ]
+            if "pump_id" in columns:
+                self._migrate_pump_id_table()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                " com_port TEXT NOT NULL,"
+                " address INTEGER NOT NULL,"
+                " sequence INTEGER NOT NULL,"
+                " volume REAL,"
+                " price_per_unit REAL,"
+                " total_amount REAL,"
+                " grade INTEGER,"
+                " timestamp TEXT NOT NULL,"
+                " PRIMARY KEY (com_port, address, sequence))"
+            )
+            self._db.commit()
+
+            rows = self._db.execute(
+                "SELECT com_port, address, MAX(sequence) FROM transactions"
+                " GROUP BY com_port, address"
+            ).fetchall()
+            for com_port, address, sequence in rows:
+                location = (com_port, address)
+                self._sequences[location] = sequence
+                recent = self._select(location, 0, self.memory_size)
+                self._recent[location] = deque(
+                    reversed(recent), maxlen=self.memory_size
+                )
+        except sqlite3.Error as e:
+            self.logger.error(
+                f"Cannot open transaction store {path}, keeping sales in memory only: {str(e)}"
+            )
+            self._db = None
+
+    def _migrate_pump_id_table(self):
+        """
+        Rekey a file written when sales were stored by pump id
+
+        Rows are renumbered per location in the order they were captured.
+        """
+        self.logger.info("Rekeying stored transactions by COM port and address")
+        with self._db:
+            self._db.execute(
+                "ALTER TABLE transactions RENAME TO transactions_by_pump_id"
+            )
+            self._db.execute(
+                "CREATE TABLE transactions ("
+                " com_port TEXT NOT NULL,"
+                " address INTEGER NOT NULL,"
+                " sequence INTEGER NOT NULL,"
+                " volume REAL,"
+                " price_per_unit REAL,"
+                " total_amount REAL,"
+                " grade INTEGER,"
+                " timestamp TEXT NOT NULL,"
+                " PRIMARY KEY (com_port, address, sequence))"
+            )
+            self._db.execute(
+                "INSERT INTO transactions SELECT com_port, address,"
+                " ROW_NUMBER() OVER (PARTITION BY com_port, address"
+                " ORDER BY timestamp, pump_id, sequence),"
+                " volume, price_per_unit, total_amount, grade, timestamp"
+                " FROM transactions_by_pump_id"
+                " WHERE com_port IS NOT NULL AND address IS NOT NULL"
+            )
+            self._db.execute("DROP TABLE transactions_by_pump_id")
+
+    def add(
+        self, transaction: TransactionData, com_port: str, address: int
+    ) -> TransactionData:
+        """Store a sale under its location's next sequence number and return it"""
+        pump_id = transaction.pump_id
+        location = (com_port, address)
+        with self._lock:
+            sequence = self._sequences.get(location, 0) + 1
+            stored = transaction.model_copy(update={"sequence": sequence})
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            com_port,
+                            address,
+                            sequence,
+                            stored.volume,
+                            stored.price_per_unit,
+                            stored.total_amount,
+                            stored.grade,
+                            stored.timestamp.isoformat(),
+                        ),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.write_errors += 1
+                    self.logger.error(
+                        f"Failed to write transaction {sequence} of pump {pump_id}: {str(e)}"
+                    )
+
+            self._sequences[location] = sequence
+            self._recent.setdefault(location, deque(maxlen=self.memory_size)).append(
+                stored
+            )
+            self.stored += 1
+            return stored
+
+    @staticmethod
+    def _for_pump(transaction: TransactionData, pump_id: int) -> TransactionData:
+        """A stored sale under the pump id its location has now"""
+        if transaction.pump_id == pump_id:
+            return transaction
+        return transaction.model_copy(update={"pump_id": pump_id})
+
+    def latest(
+        self, com_port: str, address: int, pump_id: int
+    ) -> Optional[TransactionData]:
+        """Most recent sale of a pump, or None if it has none"""
+        with self._lock:
+            recent = self._recent.get((com_port, address))
+            return self._for_pump(recent[-1], pump_id) if recent else None
+
+    def get_transactions(
+        self, com_port: str, address: int, pump_id: int, limit: int = 10
+    ) -> List[TransactionData]:
+        """A pump's most recent sales, newest first"""
+        location = (com_port, address)
+        with self._lock:
+            recent = self._recent.get(location, ())
+            if len(recent) >= limit or self._db is None:
+                return [
+                    self._for_pump(transaction, pump_id)
+                    for transaction in list(reversed(recent))[:limit]
+                ]
+            try:
+                return self._select(location, pump_id, limit)
+            except sqlite3.Error as e:
+                self.logger.error(
+                    f"Failed to read transactions of pump {pump_id}: {str(e)}"
+                )
+                return [
+                    self._for_pump(transaction, pump_id)
+                    for transaction in reversed(recent)
+                ]
+
+    def _select(
+        self, location: Location, pump_id: int, limit: int
+    ) -> List[TransactionData]:
+        """Read a location's most recent sales from the file, newest first"""
+        rows = self._db.execute(
+            "SELECT sequence, volume, price_per_unit, total_amount, grade, timestamp"
+            " FROM transactions WHERE com_port = ? AND address = ?"
+            " ORDER BY sequence DESC LIMIT ?",
+            (*location, limit),
+        ).fetchall()
+        return [
+            TransactionData(
+                pump_id=pump_id,
+                sequence=sequence,
+                volume=volume,
+                price_per_unit=price_per_unit,
+                total_amount=total_amount,
+                grade=grade,
+                timestamp=datetime.fromisoformat(timestamp),
+            )
+            for sequence, volume, price_per_unit, total_amount, grade, timestamp in rows
+        ]
+
+    def close(self):
+        """Close the SQLite file"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "durable": self._db is not None,
+                "pumps": len(self._sequences),
+                "stored": self.stored,
+                "write_errors": self.write_errors,
+            }
@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire after a per-entry TTL.
+
+    Used for pump data that almost never changes but is slow to read over the
+    line. A stored value of None is a valid entry (e.g. "not supported"), so
+    `get` reports hits separately from the value.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (expiry, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key; expired entries count as misses"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, ttl: float):
+        """Store a value for `ttl` seconds"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, match: Optional[Hashable] = None) -> int:
+        """
+        Drop entries, returning how many were dropped
+
+        With no argument everything is dropped. Otherwise tuple keys whose
+        first element equals `match`, and the key `match` itself, are dropped.
+        """
+        with self._lock:
+            if match is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+
+            keys = [
+                key
+                for key in self._entries
+                if key == match or (isinstance(key, tuple) and key[0] == match)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }